@@ -3,13 +3,20 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from sqlalchemy.orm import DeclarativeBase
 from .config import Config
+from .utils.db_routing import RoutingSession
 
 
 class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+# expire_on_commit=False: as entidades devolvidas após o commit já têm os
+# valores gravados, então serializá-las não dispara um novo SELECT.
+# RoutingSession envia as leituras @read_only para a réplica, se houver.
+db = SQLAlchemy(
+    model_class=Base,
+    session_options={"expire_on_commit": False, "class_": RoutingSession},
+)
 migrate = Migrate()
 
 
@@ -17,13 +24,46 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
+    from .utils import compression
+
+    # Registrada primeiro para rodar por último, depois dos demais after_request.
+    compression.init_app(app)
+
+    from . import monitoring
+
+    monitoring.init_app(app)
+
+    from .utils import db_routing
+
+    db_routing.init_app(app)
+
     db.init_app(app)
     migrate.init_app(app, db)
 
+    from .utils import db_utils
+
+    db_utils.init_app(app)
+
+    from .utils import rate_limit
+
+    rate_limit.init_app(app)
+
     from .api import api_bp
 
     app.register_blueprint(api_bp)
 
+    from .services import reference_index
+
+    reference_index.init_app(app)
+
+    from .services import job_service
+
+    job_service.init_app(app)
+
+    from . import commands
+
+    commands.init_app(app)
+
     from .models import Student, Event, Interaction, School, Formation
 
     @app.shell_context_processor
@@ -1,12 +1,20 @@
-from flask_restx import Api
-from flask import Blueprint
+import json
+import logging
+import os
 
+from flask_restx import Api
+from flask import Blueprint, abort, current_app, request
+from sqlalchemy import exc
+from werkzeug.utils import cached_property
 
 from .student_controller import ns as student_ns
 from .event_controller import ns as event_ns
 from .interaction_controller import ns as interaction_ns
 from .formation_controller import ns as formation_ns
 from .school_controller import ns as school_ns
+from .analytics_controller import ns as analytics_ns
+from .job_controller import ns as job_ns
+from .monitoring_controller import ns as monitoring_ns
 
 api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
 
@@ -19,8 +27,34 @@ authorizations = {
     }
 }
 
-api = Api(
-    api_bp,
+logger = logging.getLogger(__name__)
+
+
+class FileBackedApi(Api):
+    """Api que lê o swagger.json de SWAGGER_FILE, se existir, em vez de gerá-lo.
+
+    O arquivo é gerado no deploy com `flask docs generate`; sem ele, a
+    especificação é montada no primeiro acesso, como no flask-restx.
+    """
+
+    @cached_property
+    def __schema__(self):
+        path = current_app.config.get("SWAGGER_FILE")
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as spec:
+                    self._schema = json.load(spec)
+            except (OSError, ValueError):
+                logger.warning("Não foi possível ler %s; gerando a especificação", path)
+        return super().__schema__
+
+    def _register_apidoc(self, app):
+        # Os arquivos estáticos do Swagger UI só são necessários com a doc ativa.
+        if app.config.get("API_DOCS_ENABLED", True):
+            super()._register_apidoc(app)
+
+
+api = FileBackedApi(
     version="1.0",
     title="API de Prospecção de aluno",
     description="Uma API para gerenciamento de alunos de prospeção para UNIJUÍ",
@@ -28,6 +62,16 @@ api = Api(
     authorizations=authorizations,
     security="apikey",
 )
+api.init_app(api_bp)
+
+
+@api_bp.before_request
+def hide_docs():
+    """Com API_DOCS_ENABLED=false (produção) o Swagger UI e o swagger.json dão 404."""
+    if request.endpoint in ("api.doc", "api.specs") and not current_app.config.get(
+        "API_DOCS_ENABLED", True
+    ):
+        abort(404)
 
 
 api.add_namespace(student_ns, path="/students")
@@ -35,3 +79,16 @@ api.add_namespace(event_ns, path="/events")
 api.add_namespace(interaction_ns, path="/interactions")
 api.add_namespace(school_ns, path="/schools")
 api.add_namespace(formation_ns, path="/formations")
+api.add_namespace(analytics_ns, path="/analytics")
+api.add_namespace(job_ns, path="/jobs")
+api.add_namespace(monitoring_ns, path="/monitoring")
+
+
+@api.errorhandler(exc.TimeoutError)
+def handle_pool_timeout(error):
+    """Nenhuma conexão do pool ficou livre dentro de DB_POOL_TIMEOUT."""
+    return (
+        {"message": "Servidor sobrecarregado. Tente novamente."},
+        503,
+        {"Retry-After": "1"},
+    )
@@ -0,0 +1,86 @@
+from flask_restx import Namespace, Resource, inputs
+from flask_restx.reqparse import RequestParser
+
+from ..services import job_service, rollup_service
+from ..decorators import auth, handle_service_result, conditional_get
+from .serializers import to_accepted_response
+from .dtos.analytics_dto import funnel_row_fields
+from .dtos.job_dto import job_output_fields
+
+ns = Namespace("Análises", description="Indicadores agregados de prospecção")
+
+funnel_row_model = ns.model("LinhaFunil", funnel_row_fields)  # type: ignore
+job_model = ns.model("Tarefa", job_output_fields)  # type: ignore
+
+funnel_parser = RequestParser()
+funnel_parser.add_argument(
+    "dimension",
+    type=str,
+    choices=rollup_service.ROLLUP_DIMENSIONS,
+    default="school",
+    help="Dimensão do agrupamento: school, formation ou city",
+)
+funnel_parser.add_argument(
+    "min_events",
+    type=int,
+    default=1,
+    help=f"Mínimo de eventos frequentados para contar em 'attended' (0 a {rollup_service.ROLLUP_MAX_EVENTS})",
+)
+funnel_parser.add_argument(
+    "since",
+    type=inputs.date_from_iso8601,
+    help="Considera apenas alunos cadastrados a partir desta data (AAAA-MM-DD)",
+)
+funnel_parser.add_argument(
+    "until",
+    type=inputs.date_from_iso8601,
+    help="Considera apenas alunos cadastrados até esta data (AAAA-MM-DD)",
+)
+funnel_parser.add_argument(
+    "by_day",
+    type=inputs.boolean,
+    default=False,
+    help="Separa os totais por dia de cadastro",
+)
+
+
+@ns.route("/funnel")
+class Funnel(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Funil de prospecção por escola, formação ou cidade, lido dos agregados mantidos a cada gravação de alunos e interações."
+    )
+    @ns.response(400, "Parâmetros inválidos.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(funnel_parser)
+    @conditional_get("student", "interaction", "school", "formation")
+    @ns.marshal_list_with(funnel_row_model)
+    @handle_service_result(ns)
+    def get(self):
+        """Funil de prospecção"""
+        args = funnel_parser.parse_args()
+        return rollup_service.get_funnel(
+            args["dimension"],
+            min_events=args["min_events"],
+            since=args["since"],
+            until=args["until"],
+            by_day=args["by_day"],
+        )
+
+
+@ns.route("/funnel/rebuild")
+class FunnelRebuild(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Enfileira a reconstrução dos agregados do funil a partir de alunos e interações."
+    )
+    @ns.response(202, "Reconstrução enfileirada.", job_model)
+    @ns.response(503, "Fila de tarefas cheia.")
+    @handle_service_result(ns)
+    def post(self):
+        """Reconstrói os agregados do funil"""
+        result = job_service.submit_job("stats.rebuild_rollups")
+        return to_accepted_response(result, job_model)
@@ -0,0 +1,16 @@
+from flask_restx import fields
+
+funnel_row_fields = {
+    "dimension": fields.String(
+        description="Dimensão agregada (school, formation ou city)"
+    ),
+    "key": fields.String(
+        description="Chave da dimensão: ID da escola/formação ou nome da cidade (nulo: não informado)"
+    ),
+    "label": fields.String(description="Nome da escola, formação ou cidade"),
+    "day": fields.Date(description="Dia de cadastro dos alunos (apenas com by_day)"),
+    "students": fields.Integer(description="Alunos cadastrados"),
+    "attended": fields.Integer(
+        description="Alunos que frequentaram pelo menos 'min_events' eventos"
+    ),
+}
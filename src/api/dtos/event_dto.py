@@ -31,3 +31,52 @@ event_summary_fields = {
     "id": fields.Integer(description="ID do evento"),
     "event_name": fields.String(description="Nome do evento"),
 }
+
+event_checkin_input_fields = {
+    "student_ids": fields.List(
+        fields.Integer, description="IDs dos alunos presentes", example=[1, 2, 3]
+    ),
+    "emails": fields.List(
+        fields.String,
+        description="E-mails dos alunos presentes",
+        example=["maria.silva@email.com"],
+    ),
+}
+
+event_checkin_report_fields = {
+    "event_id": fields.Integer(description="ID do evento"),
+    "inserted": fields.List(
+        fields.Integer, description="IDs dos alunos com presença registrada agora"
+    ),
+    "already_present": fields.List(
+        fields.Integer, description="IDs dos alunos que já tinham presença registrada"
+    ),
+    "unknown_student_ids": fields.List(
+        fields.Integer, description="IDs informados que não correspondem a alunos"
+    ),
+    "unknown_emails": fields.List(
+        fields.String, description="E-mails informados que não correspondem a alunos"
+    ),
+}
+
+event_formation_stats_fields = {
+    "formation_id": fields.Integer(description="ID da formação (nulo: sem formação)"),
+    "formation_name": fields.String(description="Nome da formação"),
+    "count": fields.Integer(description="Interações de alunos desta formação"),
+}
+
+
+def get_event_stats_fields(formation_stats_model) -> dict:
+    return {
+        "event_id": fields.Integer(description="ID do evento"),
+        "event_name": fields.String(description="Nome do evento"),
+        "event_date": fields.Date(description="Data do evento (AAAA-MM-DD)"),
+        "interaction_count": fields.Integer(description="Total de interações"),
+        "unique_schools": fields.Integer(
+            description="Escolas distintas dos alunos presentes (modo detalhado)"
+        ),
+        "formations": fields.List(
+            fields.Nested(formation_stats_model),
+            description="Interações por formação principal (modo detalhado)",
+        ),
+    }
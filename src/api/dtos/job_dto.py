@@ -0,0 +1,18 @@
+from flask_restx import fields
+
+job_output_fields = {
+    "id": fields.String(readonly=True, description="Identificador da tarefa"),
+    "kind": fields.String(description="Tipo da tarefa", example="students.bulk_import"),
+    "status": fields.String(
+        description="Situação da tarefa",
+        enum=["queued", "running", "succeeded", "failed", "cancelled"],
+    ),
+    "processed": fields.Integer(description="Itens processados até o momento"),
+    "total": fields.Integer(description="Total de itens (nulo se desconhecido)"),
+    "cancel_requested": fields.Boolean(description="Cancelamento solicitado"),
+    "result": fields.Raw(description="Resultado da tarefa, quando concluída"),
+    "error": fields.String(description="Mensagem de erro, quando falhou"),
+    "created_at": fields.DateTime(description="Data de criação da tarefa"),
+    "started_at": fields.DateTime(description="Início da execução"),
+    "finished_at": fields.DateTime(description="Fim da execução"),
+}
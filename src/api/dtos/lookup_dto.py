@@ -0,0 +1,24 @@
+from flask_restx import Model, OrderedModel, fields
+
+from ...utils.lookup_utils import LOOKUP_MAX_IDS
+
+lookup_input_fields = {
+    "ids": fields.List(
+        fields.Integer,
+        required=True,
+        description=f"IDs a buscar (no máximo {LOOKUP_MAX_IDS})",
+        example=[1, 2, 3],
+    ),
+}
+
+
+def get_lookup_fields(item_model: Model | OrderedModel) -> dict:
+    return {
+        "items": fields.List(
+            fields.Nested(item_model),
+            description="Registros encontrados, na ordem dos ids pedidos",
+        ),
+        "missing": fields.List(
+            fields.Integer, description="IDs pedidos que não foram encontrados"
+        ),
+    }
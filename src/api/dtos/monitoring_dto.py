@@ -0,0 +1,23 @@
+from flask_restx import fields
+
+pool_stats_fields = {
+    "bind": fields.String(description="Banco de dados (bind) do pool"),
+    "size": fields.Integer(description="Tamanho configurado do pool (pool_size)"),
+    "max_overflow": fields.Integer(description="Conexões extras permitidas"),
+    "checked_out": fields.Integer(description="Conexões em uso agora"),
+    "idle": fields.Integer(description="Conexões livres no pool agora"),
+    "overflow": fields.Integer(description="Conexões extras abertas agora"),
+    "checkouts": fields.Integer(description="Conexões obtidas desde o início"),
+    "wait_seconds_total": fields.Float(
+        description="Tempo total para obter conexões, em segundos"
+    ),
+    "wait_seconds_max": fields.Float(
+        description="Maior tempo para obter uma conexão, em segundos"
+    ),
+    "timeouts": fields.Integer(
+        description="Pedidos de conexão que esgotaram pool_timeout"
+    ),
+    "overflow_connections": fields.Integer(
+        description="Conexões abertas além de pool_size desde o início"
+    ),
+}
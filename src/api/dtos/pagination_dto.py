@@ -0,0 +1,12 @@
+from flask_restx import Model, OrderedModel, fields
+
+
+def get_page_fields(item_model: Model | OrderedModel) -> dict:
+    return {
+        "items": fields.List(
+            fields.Nested(item_model), description="Registros da página atual"
+        ),
+        "next_cursor": fields.String(
+            description="Cursor para buscar a próxima página (nulo na última página)"
+        ),
+    }
@@ -74,3 +74,71 @@ def get_student_input_fields(
             allow_null=True,
         ),
     }
+
+
+def get_student_bulk_input_fields(student_input_model: Model | OrderedModel) -> dict:
+    return {
+        "students": fields.List(
+            fields.Nested(student_input_model),
+            required=True,
+            description="Alunos a importar (aceita escola e formação aninhadas)",
+        ),
+    }
+
+
+student_bulk_row_fields = {
+    "index": fields.Integer(description="Posição da linha no lote enviado"),
+    "email": fields.String(description="E-mail informado na linha"),
+    "status": fields.String(
+        description="Resultado da linha", enum=["created", "error"]
+    ),
+    "id": fields.Integer(description="ID do aluno criado"),
+    "message": fields.String(description="Motivo da falha da linha"),
+}
+
+
+def get_student_bulk_report_fields(row_model: Model | OrderedModel) -> dict:
+    return {
+        "created": fields.Integer(description="Quantidade de alunos criados"),
+        "failed": fields.Integer(description="Quantidade de linhas rejeitadas"),
+        "rows": fields.List(
+            fields.Nested(row_model), description="Relatório por linha do lote"
+        ),
+    }
+
+
+def get_student_search_fields(student_model: Model | OrderedModel) -> dict:
+    return {
+        "items": fields.List(
+            fields.Nested(student_model),
+            description="Alunos encontrados, do mais ao menos relevante",
+        ),
+    }
+
+
+duplicate_student_summary_fields = {
+    "id": fields.Integer(description="ID do aluno"),
+    "full_name": fields.String(description="Nome completo do aluno"),
+    "email": fields.String(description="E-mail do aluno"),
+    "phone_number": fields.String(description="Telefone do aluno"),
+}
+
+
+def get_duplicate_candidate_fields(student_summary_model: Model | OrderedModel) -> dict:
+    return {
+        "id": fields.Integer(description="ID do par candidato"),
+        "score": fields.Float(
+            description="Pontuação de 0 a 1 de que os dois registros são o mesmo aluno"
+        ),
+        "reasons": fields.String(
+            description="Sinais coincidentes, separados por vírgula (name, phone, email, school)",
+            example="name,phone",
+        ),
+        "created_at": fields.DateTime(description="Data da varredura que gerou o par"),
+        "student": fields.Nested(
+            student_summary_model, description="Aluno mais antigo"
+        ),
+        "other_student": fields.Nested(
+            student_summary_model, description="Possível cadastro duplicado"
+        ),
+    }
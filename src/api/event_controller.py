@@ -1,16 +1,66 @@
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, inputs, marshal
 from typing import Dict, Any
 
 from flask_restx.api import HTTPStatus
+from flask_restx.reqparse import RequestParser
 
-from ..services import event_service
-from ..decorators import auth, handle_service_result
-from .dtos.event_dto import event_output_fields, event_input_fields
+from ..services import event_service, interaction_service, job_service
+from ..decorators import auth, handle_service_result, conditional_get
+from ..utils.export_utils import EXPORT_FORMATS, to_export_response
+from ..utils.lookup_utils import LOOKUP_MAX_IDS
+from .serializers import (
+    parse_sparse_fields,
+    sparse_model,
+    sparse_serializer,
+    to_accepted_response,
+    to_json_response,
+)
+from .dtos.job_dto import job_output_fields
+from .dtos.lookup_dto import get_lookup_fields, lookup_input_fields
+from .dtos.event_dto import (
+    event_output_fields,
+    event_input_fields,
+    event_checkin_input_fields,
+    event_checkin_report_fields,
+    event_formation_stats_fields,
+    get_event_stats_fields,
+)
 
 ns = Namespace("Eventos", description="Operações relacionadas a eventos")
 
 event_model = ns.model("Evento", event_output_fields)  # type: ignore
 event_input_model = ns.model("EventoInput", event_input_fields)  # type: ignore
+event_checkin_input_model = ns.model("PresencasInput", event_checkin_input_fields)  # type: ignore
+event_checkin_report_model = ns.model("RelatorioPresencas", event_checkin_report_fields)  # type: ignore
+job_model = ns.model("Tarefa", job_output_fields)  # type: ignore
+lookup_input_model = ns.model("ConsultaLoteInput", lookup_input_fields)  # type: ignore
+event_lookup_model = ns.model("LoteEventos", get_lookup_fields(event_model))  # type: ignore
+event_formation_stats_model = ns.model("EstatisticaFormacao", event_formation_stats_fields)  # type: ignore
+event_stats_model = ns.model("EstatisticaEvento", get_event_stats_fields(event_formation_stats_model))  # type: ignore
+
+stats_parser = RequestParser()
+stats_parser.add_argument(
+    "detailed",
+    type=inputs.boolean,
+    default=False,
+    help="Inclui escolas distintas e distribuição por formação",
+)
+
+fields_parser = RequestParser()
+fields_parser.add_argument(
+    "fields",
+    type=str,
+    help="Atributos a devolver, separados por vírgula (p.ex. id,event_name)",
+)
+
+export_parser = RequestParser()
+export_parser.add_argument(
+    "format",
+    type=str,
+    choices=EXPORT_FORMATS,
+    default="ndjson",
+    help="Formato do arquivo exportado (ndjson ou csv)",
+)
 
 
 @ns.route("/")
@@ -18,13 +68,22 @@ class EventList(Resource):
     method_decorators = [auth(ns)]
 
     @ns.doc(description="Lista todos os eventos")
+    @ns.response(200, "Eventos.", [event_model])
+    @ns.response(400, "Campo inválido em 'fields'.")
     @ns.response(500, "Erro interno do servidor.")
-    @ns.marshal_list_with(event_model)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(fields_parser)
+    @conditional_get("event")
     @handle_service_result(ns)
     def get(self):
         """Lista todos os eventos"""
-        result = event_service.get_all_events()
-        return result
+        args = fields_parser.parse_args()
+        selection = parse_sparse_fields(event_model, args["fields"], None)
+        if not selection.success:
+            return selection
+        result = event_service.get_all_events(fields=selection.data)
+        serialize = sparse_serializer(event_model, selection.data)
+        return to_json_response(result, lambda rows: [serialize(row) for row in rows])
 
     @ns.doc(description="Cria um novo evento")
     @ns.response(201, "Evento criado com sucesso.")
@@ -36,22 +95,125 @@ class EventList(Resource):
     def post(self):
         """Cria um novo evento"""
         data: Dict[str, Any] = ns.payload
-        event_service.create_event(data)
         return event_service.create_event(data)
 
 
+@ns.route("/lookup")
+class EventLookup(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description=f"Busca vários eventos pelos ids (até {LOOKUP_MAX_IDS}) numa única consulta, na ordem pedida; os ids inexistentes vêm em 'missing'."
+    )
+    @ns.response(200, "Eventos encontrados.", event_lookup_model)
+    @ns.response(400, "Lista de ids inválida ou acima do limite.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(lookup_input_model, fields_parser, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca eventos por uma lista de ids"""
+        args = fields_parser.parse_args()
+        selection = parse_sparse_fields(event_model, args["fields"], None)
+        if not selection.success:
+            return selection
+        data: Dict[str, Any] = ns.payload or {}
+        result = event_service.get_events_by_ids(data.get("ids"), fields=selection.data)
+        return to_json_response(
+            result, sparse_serializer(event_model, selection.data, get_lookup_fields)
+        )
+
+
+@ns.route("/stats")
+class EventStats(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Estatísticas de presença por evento. Por padrão lê o contador mantido de interações; com detailed=true agrega escolas e formações em uma única consulta."
+    )
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(stats_parser)
+    @conditional_get("event", "interaction", "student")
+    @ns.marshal_list_with(event_stats_model)
+    @handle_service_result(ns)
+    def get(self):
+        """Estatísticas de presença dos eventos"""
+        args = stats_parser.parse_args()
+        return event_service.get_event_stats(detailed=args["detailed"])
+
+
+@ns.route("/stats/recount")
+class EventStatsRecount(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Enfileira o recálculo do contador de interações de todos os eventos."
+    )
+    @ns.response(202, "Recálculo enfileirado.", job_model)
+    @ns.response(503, "Fila de tarefas cheia.")
+    @handle_service_result(ns)
+    def post(self):
+        """Recalcula os contadores dos eventos"""
+        result = job_service.submit_job("stats.recount_events")
+        return to_accepted_response(result, job_model)
+
+
+@ns.route("/export")
+class EventExport(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(description="Exporta todos os eventos em streaming (NDJSON ou CSV)")
+    @ns.response(200, "Arquivo de exportação dos eventos.")
+    @ns.response(400, "Formato inválido.")
+    @ns.expect(export_parser)
+    @ns.produces(["application/x-ndjson", "text/csv"])
+    @handle_service_result(ns)
+    def get(self):
+        """Exporta os eventos"""
+        args = export_parser.parse_args()
+        result = event_service.iter_events_for_export()
+        return to_export_response(
+            result, event_service.EVENT_EXPORT_FIELDS, args["format"], "eventos"
+        )
+
+    @ns.doc(
+        description="Gera a exportação dos eventos em segundo plano; o arquivo fica disponível em /jobs/{id}/file quando a tarefa terminar."
+    )
+    @ns.response(202, "Exportação enfileirada.", job_model)
+    @ns.response(400, "Formato inválido.")
+    @ns.response(503, "Fila de tarefas cheia.")
+    @ns.expect(export_parser)
+    @handle_service_result(ns)
+    def post(self):
+        """Exporta os eventos para arquivo"""
+        args = export_parser.parse_args()
+        result = job_service.submit_job("export", entity="events", fmt=args["format"])
+        return to_accepted_response(result, job_model)
+
+
 @ns.route("/<int:id>")
 @ns.param("id", "O identificador do evento")
 class EventResource(Resource):
     method_decorators = [auth(ns)]
 
     @ns.doc(description="Busca um evento pelo seu identificador")
+    @ns.response(200, "Evento encontrado.", event_model)
+    @ns.response(400, "Campo inválido em 'fields'.")
     @ns.response(404, "Evento não encontrado.")
-    @ns.marshal_with(event_model)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(fields_parser)
+    @conditional_get("event")
     @handle_service_result(ns)
     def get(self, id: int):
         """Retorna um evento pelo id"""
-        return event_service.get_event_by_id(id)
+        args = fields_parser.parse_args()
+        selection = parse_sparse_fields(event_model, args["fields"], None)
+        if not selection.success:
+            return selection
+        result = event_service.get_event_by_id(id)
+        if result.success:
+            result.data = marshal(result.data, sparse_model(event_model, selection.data))
+        return result
 
     @ns.doc(description="Atualiza um evento existente")
     @ns.response(200, "Evento atualizado com sucesso.")
@@ -75,3 +237,26 @@ class EventResource(Resource):
     def delete(self, id: int):
         """Deleta um evento pelo id"""
         return event_service.delete_event(id)
+
+
+@ns.route("/<int:id>/checkins")
+@ns.param("id", "O identificador do evento")
+class EventCheckins(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Registra em lote a presença de alunos no evento, por ID ou e-mail, ignorando presenças já registradas."
+    )
+    @ns.response(200, "Presenças processadas.", event_checkin_report_model)
+    @ns.response(400, "Lote vazio ou acima do limite.")
+    @ns.response(404, "Evento não encontrado.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(event_checkin_input_model, validate=True)
+    @ns.marshal_with(event_checkin_report_model)
+    @handle_service_result(ns)
+    def post(self, id: int):
+        """Registra presenças no evento"""
+        data: Dict[str, Any] = ns.payload
+        return interaction_service.check_in_students(
+            id, student_ids=data.get("student_ids"), emails=data.get("emails")
+        )
@@ -1,16 +1,20 @@
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, marshal
 from typing import Dict, Any
 
 from flask_restx.api import HTTPStatus
 
 from ..services import formation_service
-from ..decorators import auth, handle_service_result
+from ..decorators import auth, handle_service_result, conditional_get
 from .dtos.formation_dto import formation_output_fields, formation_input_fields
+from .dtos.lookup_dto import get_lookup_fields, lookup_input_fields
+from ..utils.lookup_utils import LOOKUP_MAX_IDS
 
 ns = Namespace("Formações", description="Operações relacionadas a formações")
 
 formation_model = ns.model("Formacao", formation_output_fields)  # type: ignore
 formation_input_model = ns.model("FormacaoInput", formation_input_fields)  # type: ignore
+lookup_input_model = ns.model("ConsultaLoteInput", lookup_input_fields)  # type: ignore
+formation_lookup_model = ns.model("LoteFormacoes", get_lookup_fields(formation_model))  # type: ignore
 
 
 @ns.route("/")
@@ -19,6 +23,8 @@ class FormationList(Resource):
 
     @ns.doc(description="Lista todas as formações")
     @ns.response(500, "Erro interno do servidor.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("formation")
     @ns.marshal_list_with(formation_model)
     @handle_service_result(ns)
     def get(self):
@@ -38,6 +44,27 @@ class FormationList(Resource):
         return formation_service.create_formation(data)
 
 
+@ns.route("/lookup")
+class FormationLookup(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description=f"Busca várias formações pelos ids (até {LOOKUP_MAX_IDS}) numa única consulta, na ordem pedida; os ids inexistentes vêm em 'missing'."
+    )
+    @ns.response(200, "Formações encontradas.", formation_lookup_model)
+    @ns.response(400, "Lista de ids inválida ou acima do limite.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(lookup_input_model, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca formações por uma lista de ids"""
+        data: Dict[str, Any] = ns.payload or {}
+        result = formation_service.get_formations_by_ids(data.get("ids"))
+        if result.success:
+            result.data = marshal(result.data, formation_lookup_model)
+        return result
+
+
 @ns.route("/<int:id>")
 @ns.param("id", "O identificador da formação")
 class FormationResource(Resource):
@@ -45,6 +72,8 @@ class FormationResource(Resource):
 
     @ns.doc(description="Busca uma formação pelo seu identificador")
     @ns.response(404, "Formação não encontrada.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("formation")
     @ns.marshal_with(formation_model)
     @handle_service_result(ns)
     def get(self, id: int):
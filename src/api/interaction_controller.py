@@ -1,10 +1,19 @@
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, inputs, marshal
 from flask_restx.model import HTTPStatus
 from flask_restx.reqparse import RequestParser
 from typing import Dict, Any
 
-from ..services import interaction_service
-from ..decorators import auth, handle_service_result
+from ..services import interaction_service, job_service
+from ..decorators import auth, handle_service_result, conditional_get
+from .serializers import (
+    parse_sparse_fields,
+    sparse_model,
+    sparse_serializer,
+    to_accepted_response,
+    to_json_response,
+)
+from ..utils.export_utils import EXPORT_FORMATS, to_export_response
+from ..utils.lookup_utils import LOOKUP_MAX_IDS
 from .dtos.interaction_dto import (
     get_interaction_output_fields,
     get_interaction_input_fields,
@@ -14,6 +23,9 @@ from .dtos.event_dto import event_summary_fields, event_input_fields
 from .dtos.student_dto import get_student_input_fields as get_full_student_input_fields
 from .dtos.school_dto import school_input_fields
 from .dtos.formation_dto import formation_input_fields
+from .dtos.pagination_dto import get_page_fields
+from .dtos.lookup_dto import get_lookup_fields, lookup_input_fields
+from .dtos.job_dto import job_output_fields
 
 
 ns = Namespace(
@@ -23,6 +35,8 @@ ns = Namespace(
 
 student_summary_model = ns.model("ResumoAlunoInteracao", interaction_student_summary_fields)  # type: ignore
 event_summary_model = ns.model("ResumoEventoInteracao", event_summary_fields)  # type: ignore
+job_model = ns.model("Tarefa", job_output_fields)  # type: ignore
+lookup_input_model = ns.model("ConsultaLoteInput", lookup_input_fields)  # type: ignore
 
 school_input_for_student_model = ns.model("InputEscolaParaInteracao", school_input_fields)  # type: ignore
 formation_input_for_student_model = ns.model("InputFormacaoParaInteracao", formation_input_fields)  # type: ignore
@@ -38,6 +52,10 @@ interaction_model = ns.model(
     "Interacao",
     get_interaction_output_fields(student_summary_model, event_summary_model),
 )
+interaction_page_model = ns.model(
+    "PaginaInteracoes", get_page_fields(interaction_model)
+)
+interaction_lookup_model = ns.model("LoteInteracoes", get_lookup_fields(interaction_model))  # type: ignore
 interaction_input_model = ns.model(
     "InteracaoInput",
     get_interaction_input_fields(
@@ -52,6 +70,49 @@ list_parser.add_argument(
 list_parser.add_argument(
     "event_id", type=int, help="ID do evento para filtrar as interações"
 )
+list_parser.add_argument(
+    "since",
+    type=inputs.datetime_from_iso8601,
+    help="Data/hora inicial (ISO 8601, inclusiva) da interação",
+)
+list_parser.add_argument(
+    "until",
+    type=inputs.datetime_from_iso8601,
+    help="Data/hora final (ISO 8601, exclusiva) da interação",
+)
+list_parser.add_argument(
+    "limit", type=int, help="Quantidade máxima de interações por página (padrão 50)"
+)
+list_parser.add_argument(
+    "cursor", type=str, help="Cursor 'next_cursor' retornado pela página anterior"
+)
+
+detail_parser = RequestParser()
+detail_parser.add_argument(
+    "fields",
+    type=str,
+    help="Atributos a devolver, separados por vírgula (p.ex. id,interaction_date)",
+)
+detail_parser.add_argument(
+    "include",
+    type=str,
+    help="Relações a devolver, separadas por vírgula: student, event (com 'fields', nenhuma por padrão)",
+)
+for argument in detail_parser.args:
+    list_parser.add_argument(argument)
+
+export_parser = list_parser.copy()
+export_parser.remove_argument("limit")
+export_parser.remove_argument("cursor")
+export_parser.remove_argument("fields")
+export_parser.remove_argument("include")
+export_parser.add_argument(
+    "format",
+    type=str,
+    choices=EXPORT_FORMATS,
+    default="ndjson",
+    help="Formato do arquivo exportado (ndjson ou csv)",
+)
 
 
 @ns.route("/")
@@ -59,21 +120,32 @@ class InteractionList(Resource):
     method_decorators = [auth(ns)]
 
     @ns.doc(
-        description="Lista todas as interações, com filtros opcionais por aluno ou evento."
+        description="Lista as interações em páginas ordenadas por data, com filtros opcionais por aluno, evento e período."
     )
+    @ns.response(200, "Página de interações.", interaction_page_model)
+    @ns.response(400, "Filtro ou cursor de paginação inválido.")
     @ns.response(500, "Erro interno do servidor.")
     @ns.expect(list_parser)
-    @ns.marshal_list_with(interaction_model)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("interaction", "student", "event")
     @handle_service_result(ns)
     def get(self):
-        """Lista todas as interações (com filtros)"""
+        """Lista as interações (com filtros)"""
         args = list_parser.parse_args()
-        print(args)
-        student_id = args.get("student_id")
-        event_id = args.get("event_id")
-        print(student_id)
-        return interaction_service.get_all_interactions(
-            student_id=student_id, event_id=event_id
+        selection = parse_sparse_fields(interaction_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        result = interaction_service.get_interactions_page(
+            student_id=args.get("student_id"),
+            event_id=args.get("event_id"),
+            since=args.get("since"),
+            until=args.get("until"),
+            limit=args.get("limit"),
+            cursor=args.get("cursor"),
+            fields=selection.data,
+        )
+        return to_json_response(
+            result, sparse_serializer(interaction_model, selection.data, get_page_fields)
         )
 
     @ns.doc(
@@ -95,18 +167,108 @@ class InteractionList(Resource):
         return interaction_service.create_interaction(data)
 
 
+@ns.route("/lookup")
+class InteractionLookup(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description=f"Busca várias interações pelos ids (até {LOOKUP_MAX_IDS}) numa única consulta, na ordem pedida; os ids inexistentes vêm em 'missing'."
+    )
+    @ns.response(200, "Interações encontradas.", interaction_lookup_model)
+    @ns.response(400, "Lista de ids inválida ou acima do limite.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(lookup_input_model, detail_parser, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca interações por uma lista de ids"""
+        args = detail_parser.parse_args()
+        selection = parse_sparse_fields(interaction_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        data: Dict[str, Any] = ns.payload or {}
+        result = interaction_service.get_interactions_by_ids(data.get("ids"), fields=selection.data)
+        return to_json_response(
+            result, sparse_serializer(interaction_model, selection.data, get_lookup_fields)
+        )
+
+
+@ns.route("/export")
+class InteractionExport(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Exporta as interações em streaming (NDJSON ou CSV), com os nomes do aluno e do evento resolvidos."
+    )
+    @ns.response(200, "Arquivo de exportação das interações.")
+    @ns.response(400, "Filtro ou formato inválido.")
+    @ns.expect(export_parser)
+    @ns.produces(["application/x-ndjson", "text/csv"])
+    @handle_service_result(ns)
+    def get(self):
+        """Exporta as interações (com filtros)"""
+        args = export_parser.parse_args()
+        result = interaction_service.iter_interactions_for_export(
+            student_id=args.get("student_id"),
+            event_id=args.get("event_id"),
+            since=args.get("since"),
+            until=args.get("until"),
+        )
+        return to_export_response(
+            result,
+            interaction_service.INTERACTION_EXPORT_FIELDS,
+            args["format"],
+            "interacoes",
+        )
+
+    @ns.doc(
+        description="Gera a exportação das interações em segundo plano; o arquivo fica disponível em /jobs/{id}/file quando a tarefa terminar."
+    )
+    @ns.response(202, "Exportação enfileirada.", job_model)
+    @ns.response(400, "Formato inválido.")
+    @ns.response(503, "Fila de tarefas cheia.")
+    @ns.expect(export_parser)
+    @handle_service_result(ns)
+    def post(self):
+        """Exporta as interações para arquivo"""
+        args = export_parser.parse_args()
+        result = job_service.submit_job(
+            "export",
+            entity="interactions",
+            fmt=args["format"],
+            filters={
+                "student_id": args.get("student_id"),
+                "event_id": args.get("event_id"),
+                "since": args.get("since"),
+                "until": args.get("until"),
+            },
+        )
+        return to_accepted_response(result, job_model)
+
+
 @ns.route("/<int:id>")
 @ns.param("id", "O identificador da interação")
 class InteractionResource(Resource):
     method_decorators = [auth(ns)]
 
     @ns.doc(description="Busca uma interação pelo seu identificador")
+    @ns.response(200, "Interação encontrada.", interaction_model)
+    @ns.response(400, "Campo inválido em 'fields' ou 'include'.")
     @ns.response(404, "Interação não encontrada.")
-    @ns.marshal_with(interaction_model)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(detail_parser)
+    @conditional_get("interaction", "student", "event")
     @handle_service_result(ns)
     def get(self, id: int):
         """Busca uma interação pelo ID"""
-        return interaction_service.get_interaction_by_id(id)
+        args = detail_parser.parse_args()
+        selection = parse_sparse_fields(interaction_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        keys = selection.data
+        result = interaction_service.get_interaction_by_id(id, include=keys)
+        if result.success:
+            result.data = marshal(result.data, sparse_model(interaction_model, keys))
+        return result
 
     @ns.doc(description="Deleta uma interação existente")
     @ns.response(204, "Interação deletada com sucesso.")
@@ -0,0 +1,67 @@
+from flask import send_file
+from flask_restx import Namespace, Resource
+
+from ..services import job_handlers, job_service
+from ..decorators import auth, handle_service_result
+from ..utils.service_utils import ServiceResult
+from .dtos.job_dto import job_output_fields
+
+ns = Namespace("Tarefas", description="Acompanhamento de tarefas em segundo plano")
+
+job_model = ns.model("Tarefa", job_output_fields)  # type: ignore
+
+
+@ns.route("/<string:id>", endpoint="job")
+@ns.param("id", "O identificador da tarefa")
+class JobResource(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(description="Consulta a situação, o progresso e o resultado de uma tarefa")
+    @ns.response(404, "Tarefa não encontrada.")
+    @ns.marshal_with(job_model)
+    @handle_service_result(ns)
+    def get(self, id: str):
+        """Retorna uma tarefa pelo id"""
+        return job_service.get_job(id)
+
+
+@ns.route("/<string:id>/cancel")
+@ns.param("id", "O identificador da tarefa")
+class JobCancel(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Cancela uma tarefa. Tarefas na fila são canceladas na hora; as em execução param no próximo ponto de verificação."
+    )
+    @ns.response(400, "A tarefa já foi finalizada.")
+    @ns.response(404, "Tarefa não encontrada.")
+    @ns.marshal_with(job_model)
+    @handle_service_result(ns)
+    def post(self, id: str):
+        """Cancela uma tarefa"""
+        return job_service.cancel_job(id)
+
+
+@ns.route("/<string:id>/file")
+@ns.param("id", "O identificador da tarefa")
+class JobFile(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(description="Baixa o arquivo gerado por uma tarefa de exportação concluída")
+    @ns.response(400, "A tarefa não gerou arquivo ou ainda não terminou.")
+    @ns.response(404, "Tarefa não encontrada.")
+    @ns.produces(["application/x-ndjson", "text/csv"])
+    @handle_service_result(ns)
+    def get(self, id: str):
+        """Baixa o arquivo exportado"""
+        result = job_handlers.get_export_file(id)
+        if not result.success:
+            return result
+        return ServiceResult(
+            success=True,
+            data=send_file(
+                result.data["path"],
+                as_attachment=True,
+                download_name=result.data["filename"],
+            ),
+        )
@@ -0,0 +1,23 @@
+from flask_restx import Namespace, Resource
+
+from ..services import monitoring_service
+from ..decorators import auth, handle_service_result
+from .dtos.monitoring_dto import pool_stats_fields
+
+ns = Namespace("Monitoramento", description="Estado interno da aplicação")
+
+pool_stats_model = ns.model("EstatisticasPool", pool_stats_fields)  # type: ignore
+
+
+@ns.route("/pool")
+class PoolStats(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Uso do pool de conexões do banco: conexões em uso, tempo para obter conexões, esgotamentos e conexões de overflow."
+    )
+    @ns.marshal_list_with(pool_stats_model)
+    @handle_service_result(ns)
+    def get(self):
+        """Estatísticas do pool de conexões"""
+        return monitoring_service.get_pool_stats()
@@ -1,16 +1,20 @@
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, marshal
 from typing import Dict, Any
 
 from flask_restx.api import HTTPStatus
 
 from ..services import school_service
-from ..decorators import handle_service_result, auth
+from ..decorators import handle_service_result, auth, conditional_get
 from .dtos.school_dto import school_output_fields, school_input_fields
+from .dtos.lookup_dto import get_lookup_fields, lookup_input_fields
+from ..utils.lookup_utils import LOOKUP_MAX_IDS
 
 ns = Namespace("Escolas", description="Operações relacionadas a escolas")
 
 school_model = ns.model("Escola", school_output_fields)  # type: ignore
 school_input_model = ns.model("EscolaInput", school_input_fields)  # type: ignore
+lookup_input_model = ns.model("ConsultaLoteInput", lookup_input_fields)  # type: ignore
+school_lookup_model = ns.model("LoteEscolas", get_lookup_fields(school_model))  # type: ignore
 
 
 @ns.route("/")
@@ -19,6 +23,8 @@ class SchoolList(Resource):
 
     @ns.doc(description="Lista todas as escolas")
     @ns.response(500, "Erro interno do servidor.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("school")
     @ns.marshal_list_with(school_model)
     @handle_service_result(ns)
     def get(self):
@@ -38,6 +44,27 @@ class SchoolList(Resource):
         return school_service.create_school(data)
 
 
+@ns.route("/lookup")
+class SchoolLookup(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description=f"Busca várias escolas pelos ids (até {LOOKUP_MAX_IDS}) numa única consulta, na ordem pedida; os ids inexistentes vêm em 'missing'."
+    )
+    @ns.response(200, "Escolas encontradas.", school_lookup_model)
+    @ns.response(400, "Lista de ids inválida ou acima do limite.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(lookup_input_model, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca escolas por uma lista de ids"""
+        data: Dict[str, Any] = ns.payload or {}
+        result = school_service.get_schools_by_ids(data.get("ids"))
+        if result.success:
+            result.data = marshal(result.data, school_lookup_model)
+        return result
+
+
 @ns.route("/<int:id>")
 @ns.param("id", "O identificador da escola")
 class SchoolResource(Resource):
@@ -45,6 +72,8 @@ class SchoolResource(Resource):
 
     @ns.doc(description="Busca uma escola pelo seu identificador")
     @ns.response(404, "Escola não encontrada.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("school")
     @ns.marshal_with(school_model)
     @handle_service_result(ns)
     def get(self, id: int):
@@ -0,0 +1,190 @@
+import json
+from http import HTTPStatus
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from flask import Response, url_for
+from flask_restx import Model, OrderedModel, fields, marshal
+
+from ..utils.service_utils import ServiceError, ServiceResult
+
+RowSerializer = Callable[[Mapping[str, Any]], Dict[str, Any]]
+
+# Separador entre o nome de um campo aninhado e o da sua coluna na linha
+# achatada, p.ex. a coluna "school__name" alimenta {"school": {"name": ...}}.
+NESTED_SEPARATOR = "__"
+
+
+def _format_datetime(value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _format_int(value: Any) -> Any:
+    return None if value is None else int(value)
+
+
+def _format_str(value: Any) -> Any:
+    return None if value is None else str(value)
+
+
+def _passthrough(value: Any) -> Any:
+    return value
+
+
+def _formatter(field: fields.Raw) -> Callable[[Any], Any]:
+    if isinstance(field, fields.DateTime):
+        return _format_datetime
+    if isinstance(field, fields.Integer):
+        return _format_int
+    if isinstance(field, fields.String):
+        return _format_str
+    return _passthrough
+
+
+def compile_serializer(model: Model | OrderedModel, prefix: str = "") -> RowSerializer:
+    """Gera uma vez a função que converte uma linha no formato do `model`.
+
+    Segue as mesmas regras do marshal do flask-restx para os tipos usados nos
+    DTOs: `fields.Nested` é lido das colunas achatadas com o prefixo do campo
+    (e vira nulo quando `allow_null` e todas estão nulas) e `fields.List` é
+    lido como uma lista de linhas, cada uma serializada pelo seu modelo.
+    """
+    steps: List[Tuple[str, Callable[[Mapping[str, Any]], Any]]] = []
+
+    for key, field in model.items():
+        column = prefix + key
+        if isinstance(field, fields.Nested):
+            nested = compile_serializer(field.nested, column + NESTED_SEPARATOR)
+            nested_columns = [column + NESTED_SEPARATOR + k for k in field.nested]
+
+            def read_nested(row, nested=nested, cols=nested_columns, field=field):
+                if field.allow_null and all(row.get(c) is None for c in cols):
+                    return None
+                return nested(row)
+
+            steps.append((key, read_nested))
+        elif isinstance(field, fields.List):
+            item = field.container
+            if isinstance(item, fields.Nested):
+                convert = compile_serializer(item.nested)
+            else:
+                convert = _formatter(item)
+
+            def read_list(row, column=column, convert=convert):
+                values = row.get(column)
+                return None if values is None else [convert(v) for v in values]
+
+            steps.append((key, read_list))
+        else:
+            fmt = _formatter(field)
+            steps.append((key, lambda row, c=column, fmt=fmt: fmt(row.get(c))))
+
+    def serialize(row: Mapping[str, Any]) -> Dict[str, Any]:
+        return {key: read(row) for key, read in steps}
+
+    return serialize
+
+
+def _split_param(value: Optional[str]) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def parse_sparse_fields(
+    model: Model | OrderedModel,
+    requested_fields: Optional[str],
+    requested_include: Optional[str],
+) -> ServiceResult[Optional[Tuple[str, ...]]]:
+    """Resolve os parâmetros `fields=` e `include=` nos campos do `model`.
+
+    `fields` lista os atributos e `include` as relações (campos aninhados).
+    Sem nenhum dos dois, devolve None (o modelo completo); sem `fields`, vêm
+    todos os atributos; sem `include`, as relações só vêm quando `fields`
+    também foi omitido.
+    """
+    if requested_fields is None and requested_include is None:
+        return ServiceResult(success=True, data=None)
+
+    relations = [k for k, f in model.items() if isinstance(f, fields.Nested)]
+    attributes = [k for k in model if k not in relations]
+    chosen = set()
+    for param, value, allowed in (
+        ("fields", requested_fields, attributes),
+        ("include", requested_include, relations),
+    ):
+        names = allowed if value is None else _split_param(value)
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            return ServiceResult(
+                success=False,
+                error_type=ServiceError.INVALID_INPUT,
+                message=(
+                    f"Valor inválido em '{param}': {', '.join(unknown)}. "
+                    f"Use: {', '.join(allowed) or 'nenhum'}."
+                ),
+            )
+        chosen.update(names)
+    if requested_include is None and requested_fields is not None:
+        chosen.difference_update(relations)
+    return ServiceResult(success=True, data=tuple(k for k in model if k in chosen))
+
+
+_sparse_serializers: Dict[
+    Tuple[str, Optional[Callable], Optional[Tuple[str, ...]]], RowSerializer
+] = {}
+
+
+def sparse_serializer(
+    model: Model | OrderedModel,
+    keys: Optional[Tuple[str, ...]],
+    wrap: Optional[Callable[[Model | OrderedModel], dict]] = None,
+) -> RowSerializer:
+    """Serializador que emite só os campos `keys` do `model` (todos se None).
+
+    `wrap` monta o envelope a partir do modelo dos itens (p.ex.
+    get_page_fields). Os serializadores ficam em cache por combinação de
+    campos.
+    """
+    cache_key = (model.name, wrap, keys)
+    serializer = _sparse_serializers.get(cache_key)
+    if serializer is None:
+        subset = sparse_model(model, keys)
+        if wrap is not None:
+            subset = Model(subset.name, wrap(subset))
+        serializer = _sparse_serializers[cache_key] = compile_serializer(subset)
+    return serializer
+
+
+def sparse_model(
+    model: Model | OrderedModel, keys: Optional[Tuple[str, ...]]
+) -> Model | OrderedModel:
+    """Modelo com só os campos `keys`, para uso com marshal."""
+    if keys is None:
+        return model
+    return Model(model.name, {key: model[key] for key in keys})
+
+
+def to_json_response(result: ServiceResult, serializer: RowSerializer) -> ServiceResult:
+    """Serializa o resultado do serviço direto para bytes JSON."""
+    if not result.success:
+        return result
+    body = json.dumps(
+        serializer(result.data), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return ServiceResult(success=True, data=Response(body, mimetype="application/json"))
+
+
+def to_accepted_response(
+    result: ServiceResult, job_model: Model | OrderedModel
+) -> ServiceResult:
+    """Responde 202 com a tarefa enfileirada e o endereço para acompanhá-la."""
+    if not result.success:
+        return result
+    job = result.data
+    headers = {"Location": url_for("api.job", id=job.id)}
+    return ServiceResult(
+        success=True, data=(marshal(job, job_model), HTTPStatus.ACCEPTED, headers)
+    )
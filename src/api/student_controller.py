@@ -1,13 +1,36 @@
 from typing import Any, Dict
-from flask_restx import Namespace, Resource
+from flask_restx import Namespace, Resource, inputs, marshal
 from flask_restx.model import HTTPStatus
+from flask_restx.reqparse import RequestParser
 
-from ..services import student_service
-from ..decorators import handle_service_result, auth
+from ..services import dedup_service, job_service, student_service
+from ..decorators import handle_service_result, auth, conditional_get
+from .serializers import (
+    compile_serializer,
+    parse_sparse_fields,
+    sparse_model,
+    sparse_serializer,
+    to_accepted_response,
+    to_json_response,
+)
+from ..utils.export_utils import EXPORT_FORMATS, to_export_response
+from ..utils.lookup_utils import LOOKUP_MAX_IDS
 
-from .dtos.student_dto import get_student_output_fields, get_student_input_fields
+from .dtos.student_dto import (
+    get_student_output_fields,
+    get_student_input_fields,
+    get_student_bulk_input_fields,
+    get_student_bulk_report_fields,
+    student_bulk_row_fields,
+    get_student_search_fields,
+    duplicate_student_summary_fields,
+    get_duplicate_candidate_fields,
+)
 from .dtos.school_dto import school_summary_fields, school_input_fields
 from .dtos.formation_dto import formation_summary_fields, formation_input_fields
+from .dtos.pagination_dto import get_page_fields
+from .dtos.lookup_dto import get_lookup_fields, lookup_input_fields
+from .dtos.job_dto import job_output_fields
 
 ns = Namespace(
     "Alunos",
@@ -27,6 +50,114 @@ student_input_model = ns.model(
     "AlunoInput", get_student_input_fields(school_input_fields, formation_input_fields)
 )
 
+student_bulk_input_model = ns.model(
+    "AlunoLoteInput", get_student_bulk_input_fields(student_input_model)
+)
+student_bulk_row_model = ns.model("LinhaLoteAluno", student_bulk_row_fields)
+student_bulk_report_model = ns.model(
+    "RelatorioLoteAlunos", get_student_bulk_report_fields(student_bulk_row_model)
+)
+
+job_model = ns.model("Tarefa", job_output_fields)
+lookup_input_model = ns.model("ConsultaLoteInput", lookup_input_fields)
+
+student_page_model = ns.model("PaginaAlunos", get_page_fields(student_model))
+
+student_search_model = ns.model("BuscaAlunos", get_student_search_fields(student_model))
+student_search_serializer = compile_serializer(student_search_model)
+
+student_lookup_model = ns.model("LoteAlunos", get_lookup_fields(student_model))
+
+duplicate_student_model = ns.model(
+    "ResumoAlunoDuplicado", duplicate_student_summary_fields
+)
+duplicate_candidate_model = ns.model(
+    "CandidatoDuplicado", get_duplicate_candidate_fields(duplicate_student_model)
+)
+duplicate_page_model = ns.model(
+    "PaginaCandidatosDuplicados", get_page_fields(duplicate_candidate_model)
+)
+duplicate_page_serializer = compile_serializer(duplicate_page_model)
+
+list_parser = RequestParser()
+list_parser.add_argument(
+    "school_id", type=int, help="ID da escola para filtrar os alunos"
+)
+list_parser.add_argument(
+    "formation_id", type=int, help="ID da formação para filtrar os alunos"
+)
+list_parser.add_argument(
+    "limit", type=int, help="Quantidade máxima de alunos por página (padrão 50)"
+)
+list_parser.add_argument(
+    "cursor", type=str, help="Cursor 'next_cursor' retornado pela página anterior"
+)
+
+detail_parser = RequestParser()
+detail_parser.add_argument(
+    "fields",
+    type=str,
+    help="Atributos a devolver, separados por vírgula (p.ex. id,full_name)",
+)
+detail_parser.add_argument(
+    "include",
+    type=str,
+    help="Relações a devolver, separadas por vírgula: school, main_formation (com 'fields', nenhuma por padrão)",
+)
+for argument in detail_parser.args:
+    list_parser.add_argument(argument)
+
+search_parser = RequestParser()
+search_parser.add_argument(
+    "q",
+    type=str,
+    required=True,
+    help="Parte do nome, do e-mail ou do telefone (mínimo de 3 caracteres)",
+)
+search_parser.add_argument(
+    "limit", type=int, help="Quantidade máxima de resultados (padrão 20, máximo 100)"
+)
+
+bulk_parser = RequestParser()
+bulk_parser.add_argument(
+    "async",
+    type=inputs.boolean,
+    default=False,
+    help=f"Executa em segundo plano e responde 202 com a tarefa (sempre ocorre acima de {student_service.BULK_SYNC_MAX_ROWS} alunos)",
+)
+
+duplicates_parser = RequestParser()
+duplicates_parser.add_argument(
+    "min_score", type=float, help="Pontuação mínima dos pares (0 a 1)"
+)
+duplicates_parser.add_argument(
+    "limit", type=int, help="Quantidade máxima de pares por página (padrão 50)"
+)
+duplicates_parser.add_argument(
+    "cursor", type=str, help="Cursor 'next_cursor' retornado pela página anterior"
+)
+
+scan_parser = RequestParser()
+scan_parser.add_argument(
+    "min_score",
+    type=float,
+    default=dedup_service.DEDUP_MIN_SCORE,
+    help="Pontuação mínima para registrar um par (0 a 1)",
+)
+
+export_parser = list_parser.copy()
+export_parser.remove_argument("limit")
+export_parser.remove_argument("fields")
+export_parser.remove_argument("include")
+export_parser.remove_argument("cursor")
+export_parser.add_argument(
+    "format",
+    type=str,
+    choices=EXPORT_FORMATS,
+    default="ndjson",
+    help="Formato do arquivo exportado (ndjson ou csv)",
+)
+
 
 @ns.route("/")
 @ns.doc(security="apikey")
@@ -34,13 +165,32 @@ student_input_model = ns.model(
 class StudentList(Resource):
     method_decorators = [auth(ns)]
 
-    @ns.doc(description="Lista todos os alunos")
+    @ns.doc(
+        description="Lista os alunos em páginas ordenadas por nome, com filtros opcionais por escola ou formação."
+    )
+    @ns.response(200, "Página de alunos.", student_page_model)
+    @ns.response(400, "Cursor de paginação inválido.")
     @ns.response(500, "Erro interno do servidor.")
-    @ns.marshal_list_with(student_model)
+    @ns.expect(list_parser)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("student", "school", "formation")
     @handle_service_result(ns)
     def get(self):
-        """Retorna todos os alunos"""
-        return student_service.get_all_students()
+        """Retorna uma página de alunos"""
+        args = list_parser.parse_args()
+        selection = parse_sparse_fields(student_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        result = student_service.get_students_page(
+            school_id=args.get("school_id"),
+            formation_id=args.get("formation_id"),
+            limit=args.get("limit"),
+            cursor=args.get("cursor"),
+            fields=selection.data,
+        )
+        return to_json_response(
+            result, sparse_serializer(student_model, selection.data, get_page_fields)
+        )
 
     @ns.doc(description="Cria um novo aluno")
     @ns.response(201, "Aluno criado com sucesso.")
@@ -59,6 +209,179 @@ class StudentList(Resource):
         return student_service.create_student_with_relations(data)
 
 
+@ns.route("/bulk")
+@ns.response(401, "Não autorizado.")
+class StudentBulk(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Importa alunos em lote numa única transação, com escolas e formações aninhadas, e devolve o resultado de cada linha. Lotes grandes (ou com async=true) são importados em segundo plano: a resposta é 202 com a tarefa, cujo resultado traz o mesmo relatório."
+    )
+    @ns.response(200, "Lote processado.", student_bulk_report_model)
+    @ns.response(202, "Importação enfileirada.", job_model)
+    @ns.response(400, "Lote vazio ou acima do limite.")
+    @ns.response(409, "Conflito com registros criados simultaneamente.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.response(503, "Fila de tarefas cheia.")
+    @ns.expect(student_bulk_input_model, bulk_parser, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Importa alunos em lote"""
+        args = bulk_parser.parse_args()
+        data: Dict[str, Any] = ns.payload or {}
+        rows = data.get("students")
+        if args["async"] or (
+            isinstance(rows, list) and len(rows) > student_service.BULK_SYNC_MAX_ROWS
+        ):
+            result = student_service.enqueue_bulk_import(rows)
+            return to_accepted_response(result, job_model)
+
+        result = student_service.bulk_create_students(rows)
+        if result.success:
+            result.data = marshal(result.data, student_bulk_report_model)
+        return result
+
+
+@ns.route("/search")
+@ns.response(401, "Não autorizado.")
+class StudentSearch(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Busca alunos por parte do nome, e-mail ou telefone, com resultados ordenados por relevância."
+    )
+    @ns.response(200, "Alunos encontrados.", student_search_model)
+    @ns.response(400, "Termo de busca muito curto.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(search_parser)
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @conditional_get("student", "school", "formation")
+    @handle_service_result(ns)
+    def get(self):
+        """Busca alunos"""
+        args = search_parser.parse_args()
+        result = student_service.search_students(args["q"], limit=args.get("limit"))
+        return to_json_response(result, student_search_serializer)
+
+
+@ns.route("/lookup")
+@ns.response(401, "Não autorizado.")
+class StudentLookup(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description=f"Busca vários alunos pelos ids (até {LOOKUP_MAX_IDS}) numa única consulta, na ordem pedida; os ids inexistentes vêm em 'missing'."
+    )
+    @ns.response(200, "Alunos encontrados.", student_lookup_model)
+    @ns.response(400, "Lista de ids inválida ou acima do limite.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(lookup_input_model, detail_parser, validate=False)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca alunos por uma lista de ids"""
+        args = detail_parser.parse_args()
+        selection = parse_sparse_fields(student_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        data: Dict[str, Any] = ns.payload or {}
+        result = student_service.get_students_by_ids(
+            data.get("ids"), fields=selection.data
+        )
+        return to_json_response(
+            result, sparse_serializer(student_model, selection.data, get_lookup_fields)
+        )
+
+
+@ns.route("/duplicates")
+@ns.response(401, "Não autorizado.")
+class StudentDuplicates(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Lista os pares de alunos que provavelmente são a mesma pessoa, da maior para a menor pontuação, conforme a última varredura."
+    )
+    @ns.response(200, "Página de pares candidatos.", duplicate_page_model)
+    @ns.response(400, "Cursor de paginação inválido.")
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.expect(duplicates_parser)
+    @handle_service_result(ns)
+    def get(self):
+        """Lista candidatos a alunos duplicados"""
+        args = duplicates_parser.parse_args()
+        result = dedup_service.get_candidates_page(
+            min_score=args.get("min_score"),
+            limit=args.get("limit"),
+            cursor=args.get("cursor"),
+        )
+        return to_json_response(result, duplicate_page_serializer)
+
+
+@ns.route("/duplicates/scan")
+@ns.response(401, "Não autorizado.")
+class StudentDuplicateScan(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Enfileira a varredura de alunos duplicados, que substitui os pares candidatos existentes. O resultado da tarefa traz o número de alunos analisados e de pares encontrados."
+    )
+    @ns.response(202, "Varredura enfileirada.", job_model)
+    @ns.response(500, "Erro interno do servidor.")
+    @ns.response(503, "Fila de tarefas cheia.")
+    @ns.expect(scan_parser)
+    @handle_service_result(ns)
+    def post(self):
+        """Busca alunos duplicados"""
+        args = scan_parser.parse_args()
+        result = job_service.submit_job("dedup.scan", min_score=args["min_score"])
+        return to_accepted_response(result, job_model)
+
+
+@ns.route("/export")
+@ns.response(401, "Não autorizado.")
+class StudentExport(Resource):
+    method_decorators = [auth(ns)]
+
+    @ns.doc(
+        description="Exporta todos os alunos em streaming (NDJSON ou CSV), com os nomes da escola e da formação resolvidos."
+    )
+    @ns.response(200, "Arquivo de exportação dos alunos.")
+    @ns.response(400, "Formato inválido.")
+    @ns.expect(export_parser)
+    @ns.produces(["application/x-ndjson", "text/csv"])
+    @handle_service_result(ns)
+    def get(self):
+        """Exporta os alunos"""
+        args = export_parser.parse_args()
+        result = student_service.iter_students_for_export(
+            school_id=args.get("school_id"), formation_id=args.get("formation_id")
+        )
+        return to_export_response(
+            result, student_service.STUDENT_EXPORT_FIELDS, args["format"], "alunos"
+        )
+
+    @ns.doc(
+        description="Gera a exportação dos alunos em segundo plano; o arquivo fica disponível em /jobs/{id}/file quando a tarefa terminar."
+    )
+    @ns.response(202, "Exportação enfileirada.", job_model)
+    @ns.response(400, "Formato inválido.")
+    @ns.response(503, "Fila de tarefas cheia.")
+    @ns.expect(export_parser)
+    @handle_service_result(ns)
+    def post(self):
+        """Exporta os alunos para arquivo"""
+        args = export_parser.parse_args()
+        result = job_service.submit_job(
+            "export",
+            entity="students",
+            fmt=args["format"],
+            filters={
+                "school_id": args.get("school_id"),
+                "formation_id": args.get("formation_id"),
+            },
+        )
+        return to_accepted_response(result, job_model)
+
+
 @ns.route("/<int:id>")
 @ns.response(404, "Aluno não encontrado")
 @ns.response(500, "Erro interno do servidor.")
@@ -67,11 +390,23 @@ class StudentResource(Resource):
     method_decorators = [auth(ns)]
 
     @ns.doc(description="Busca um aluno pelo seu identificador")
-    @ns.marshal_with(student_model)
+    @ns.response(200, "Aluno encontrado.", student_model)
+    @ns.response(400, "Campo inválido em 'fields' ou 'include'.")
+    @ns.response(304, "Não modificado desde a última consulta (ETag).")
+    @ns.expect(detail_parser)
+    @conditional_get("student", "school", "formation")
     @handle_service_result(ns)
     def get(self, id):
         """Retorna um aluno pelo id"""
-        return student_service.get_student_by_id(id)
+        args = detail_parser.parse_args()
+        selection = parse_sparse_fields(student_model, args["fields"], args["include"])
+        if not selection.success:
+            return selection
+        keys = selection.data
+        result = student_service.get_student_by_id(id, include=keys)
+        if result.success:
+            result.data = marshal(result.data, sparse_model(student_model, keys))
+        return result
 
     @ns.doc(description="Atualiza um aluno existente")
     @ns.response(200, "Aluno atualizado com sucesso.")
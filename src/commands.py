@@ -0,0 +1,234 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+from flask import Flask, current_app
+from flask.cli import AppGroup
+
+stats_cli = AppGroup("stats", help="Manutenção dos agregados de estatísticas.")
+
+
+@stats_cli.command("recount-events")
+def recount_events() -> None:
+    """Recalcula o contador de interações de todos os eventos."""
+    from .services import event_service
+
+    updated = event_service.recount_interaction_counts()
+    click.echo(f"{updated} eventos recalculados.")
+
+
+@stats_cli.command("rebuild-rollups")
+def rebuild_rollups() -> None:
+    """Reconstrói os agregados do funil de prospecção."""
+    from .services import rollup_service
+
+    rows = rollup_service.rebuild_rollups()
+    click.echo(f"{rows} linhas de agregados gravadas.")
+
+
+dedup_cli = AppGroup("dedup", help="Detecção de alunos duplicados.")
+
+
+@dedup_cli.command("scan")
+@click.option(
+    "--min-score",
+    type=float,
+    default=None,
+    help="Pontuação mínima para registrar um par (0 a 1).",
+)
+def scan_duplicates(min_score) -> None:
+    """Compara todos os alunos e regrava os pares candidatos a duplicados."""
+    from .services import dedup_service
+
+    if min_score is None:
+        min_score = dedup_service.DEDUP_MIN_SCORE
+    result = dedup_service.scan_duplicates(min_score=min_score)
+    if not result.success:
+        raise click.ClickException(result.message)
+    click.echo(
+        f"{result.data['students']} alunos analisados, "
+        f"{result.data['candidates']} pares candidatos."
+    )
+
+
+docs_cli = AppGroup("docs", help="Especificação OpenAPI (swagger.json).")
+
+
+@docs_cli.command("generate")
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Arquivo de saída (padrão: SWAGGER_FILE ou swagger.json).",
+)
+def generate_docs(output) -> None:
+    """Gera o swagger.json uma vez, para ser servido a partir do arquivo."""
+    from flask_restx import Swagger
+
+    from .api import api
+
+    output = output or current_app.config.get("SWAGGER_FILE") or "swagger.json"
+    with current_app.test_request_context():
+        schema = Swagger(api).as_dict()
+    with open(output, "w", encoding="utf-8") as spec:
+        json.dump(schema, spec, ensure_ascii=False, separators=(",", ":"))
+    click.echo(f"Especificação gravada em {output} ({len(schema['paths'])} rotas).")
+
+
+# Executado num processo novo a cada medição, para incluir as importações.
+_STARTUP_PROBE = """
+import json, time
+started = time.perf_counter()
+import src
+imported = time.perf_counter()
+app = src.create_app()
+created = time.perf_counter()
+with app.test_request_context():
+    from src.api import api
+    api.__schema__
+documented = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "swagger": documented - created,
+}))
+"""
+
+
+perf_cli = AppGroup("perf", help="Medições de desempenho.")
+
+
+@perf_cli.command("startup")
+@click.option("--runs", type=int, default=5, help="Quantidade de processos medidos.")
+def measure_startup(runs) -> None:
+    """Mede a inicialização a frio: importações, create_app e swagger.json."""
+    samples = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(current_app.root_path),
+        )
+        if completed.returncode != 0:
+            raise click.ClickException(completed.stderr.strip().splitlines()[-1])
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    for phase in ("import", "create_app", "swagger"):
+        values = [sample[phase] * 1000 for sample in samples]
+        click.echo(
+            f"{phase:<10} mediana {statistics.median(values):8.1f} ms"
+            f"  máx {max(values):8.1f} ms"
+        )
+
+
+@perf_cli.command("seed")
+@click.option("--students", type=int, default=100_000, show_default=True)
+@click.option("--schools", type=int, default=500, show_default=True)
+@click.option("--formations", type=int, default=100, show_default=True)
+@click.option("--events", type=int, default=200, show_default=True)
+@click.option("--interactions", type=int, default=1_000_000, show_default=True)
+@click.option("--seed", type=int, default=42, help="Semente dos dados gerados.")
+@click.option("--batch-size", type=int, default=5000, help="Linhas por INSERT.")
+def seed_benchmark(
+    students, schools, formations, events, interactions, seed, batch_size
+) -> None:
+    """Popula um banco vazio com dados sintéticos para as medições."""
+    from .monitoring.benchmark import SeedVolumes, seed_database
+
+    volumes = SeedVolumes(students, schools, formations, events, interactions)
+    started = time.perf_counter()
+
+    def progress(table: str, done: int, total: int) -> None:
+        if done == total or done % (batch_size * 20) == 0:
+            click.echo(f"{table}: {done}/{total}")
+
+    try:
+        counts = seed_database(
+            volumes, seed=seed, batch_size=batch_size, progress=progress
+        )
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    click.echo(
+        f"Banco populado em {time.perf_counter() - started:.1f} s: "
+        + ", ".join(f"{table}={count}" for table, count in counts.items())
+    )
+
+
+@perf_cli.command("run")
+@click.option(
+    "--requests",
+    type=click.IntRange(1),
+    default=50,
+    help="Requisições medidas por rota.",
+)
+@click.option("--warmup", type=int, default=5, help="Requisições descartadas por rota.")
+@click.option(
+    "--concurrency", type=click.IntRange(1), default=1, help="Requisições simultâneas."
+)
+@click.option(
+    "--only",
+    multiple=True,
+    help="Mede só os cenários com este prefixo (p.ex. students.); repetível.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Grava o relatório JSON neste arquivo (padrão: saída padrão).",
+)
+def run_benchmarks(requests, warmup, concurrency, only, output) -> None:
+    """Mede vazão, latência (p50/p95/p99), consultas e memória de cada rota."""
+    from .monitoring.benchmark import run_benchmark
+
+    def progress(name: str, result: dict) -> None:
+        latency = result["latency_ms"]
+        click.echo(
+            f"{name:<32} p50 {latency['p50']:8.2f} ms  p95 {latency['p95']:8.2f} ms"
+            f"  {result['throughput_rps']:8.1f} req/s",
+            err=True,
+        )
+
+    report = run_benchmark(
+        current_app._get_current_object(),
+        requests=requests,
+        warmup=warmup,
+        concurrency=concurrency,
+        only=only,
+        progress=progress,
+    )
+    if output:
+        with open(output, "w", encoding="utf-8") as target:
+            json.dump(report, target, ensure_ascii=False, indent=2)
+        click.echo(f"Relatório gravado em {output}.", err=True)
+    else:
+        click.echo(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+@perf_cli.command("compare")
+@click.argument("baseline", type=click.File(encoding="utf-8"))
+@click.argument("current", type=click.File(encoding="utf-8"))
+def compare_benchmarks(baseline, current) -> None:
+    """Compara dois relatórios de `flask perf run` (p.ex. de commits diferentes)."""
+    from .monitoring.benchmark import compare_reports
+
+    for row in compare_reports(json.load(baseline), json.load(current)):
+        changes = "  ".join(
+            f"{key} {row[key][0]:8.2f} → {row[key][1]:8.2f} ms"
+            + (f" ({row[key][2]:+6.1f}%)" if row[key][2] is not None else "")
+            for key in ("p50", "p95", "p99")
+        )
+        click.echo(
+            f"{row['endpoint']:<32} {changes}  consultas {row['queries'][0]} → {row['queries'][1]}"
+        )
+
+
+def init_app(app: Flask) -> None:
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(dedup_cli)
+    app.cli.add_command(docs_cli)
+    app.cli.add_command(perf_cli)
@@ -1,8 +1,15 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 from flask_restx import Namespace
-from flask import request, current_app
+from flask import Response, request, current_app, after_this_request, g
 from flask_restx.api import HTTPStatus
 
+from .. import db
+from ..monitoring import metrics
+from ..monitoring.pool_stats import pool_exhausted
+from ..services import version_service
+from ..utils.rate_limit import retry_after
 from ..utils.service_utils import ServiceResult, ServiceError
 
 
@@ -15,6 +22,9 @@ def handle_service_result(ns: Namespace):
             if not result.success:
                 error_type = result.error_type
                 message = result.message
+                metrics.count_service_error(
+                    error_type.name if error_type else "UNKNOWN"
+                )
 
                 if error_type == ServiceError.NOT_FOUND:
                     ns.abort(404, message)
@@ -24,6 +34,8 @@ def handle_service_result(ns: Namespace):
                     ns.abort(400, message)
                 elif error_type == ServiceError.DEPENDENCY_ERROR:
                     ns.abort(400, message)
+                elif error_type == ServiceError.UNAVAILABLE:
+                    ns.abort(503, message)
                 else:
                     ns.abort(500, message)
 
@@ -39,11 +51,19 @@ def handle_service_result(ns: Namespace):
 
 
 def auth(ns):
+    """Autentica a chave de API e aplica os limites dela.
+
+    Cada chave tem um balde de fichas (taxa e rajada) e um limite de
+    requisições simultâneas; ao excedê-los a resposta é 429 com Retry-After.
+    Com o pool de conexões esgotado a requisição é recusada com 503 em vez de
+    esperar por uma conexão.
+    """
+
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            api_key = current_app.config.get("SECRET_KEY")
-            if not api_key:
+            registry = current_app.extensions["api_keys"]
+            if not registry.keys:
                 ns.abort(
                     HTTPStatus(500), "A chave de API não foi configurada no servidor."
                 )
@@ -73,10 +93,105 @@ def auth(ns):
                     'Formato do cabeçalho de autorização inválido. Use "ApiKey <token>".',
                 )
 
-            if provided_key != api_key:
+            api_key = registry.find(provided_key)
+            if api_key is None:
                 ns.abort(HTTPStatus(401), "Chave de API inválida ou incorreta.")
                 return
+            g.api_key = api_key.name
+
+            wait = api_key.take()
+            if wait:
+                return (
+                    {"message": "Limite de requisições excedido para esta chave."},
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    {"Retry-After": retry_after(wait)},
+                )
+            if pool_exhausted(db.engine):
+                return (
+                    {"message": "Servidor sobrecarregado. Tente novamente."},
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    {"Retry-After": "1"},
+                )
+            if not api_key.acquire():
+                return (
+                    {"message": "Muitas requisições simultâneas para esta chave."},
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    {"Retry-After": "1"},
+                )
+            try:
+                response = fn(*args, **kwargs)
+            except BaseException:
+                api_key.release()
+                raise
+            # Respostas em streaming (exportações) ainda estão sendo geradas:
+            # a vaga só é liberada quando o envio termina.
+            if isinstance(response, Response) and response.is_streamed:
+                response.call_on_close(api_key.release)
+            else:
+                api_key.release()
+            return response
+
+        wrapper.__name__ = fn.__name__
+        return wrapper
+
+    return decorator
+
+
+def _last_modified(updated_at: datetime):
+    """Last-Modified (com precisão de segundos) para a versão gravada em `updated_at`.
+
+    O valor é o fim do segundo da alteração, e só é enviado depois que esse
+    segundo terminou. Assim, outra escrita no mesmo segundo não pode ficar
+    com a mesma data truncada e ser respondida com 304.
+    """
+    ceiling = updated_at.replace(microsecond=0) + timedelta(seconds=1)
+    if ceiling > datetime.utcnow():
+        return None
+    return ceiling.replace(tzinfo=timezone.utc)
+
+
+def conditional_get(*tables: str):
+    """Responde GETs condicionais a partir das versões das tabelas envolvidas.
+
+    O ETag combina a URL (com os filtros) e o contador de version_service de
+    cada tabela que compõe a resposta; um `If-None-Match` válido recebe 304
+    sem que nenhuma linha seja carregada ou serializada.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            versions = version_service.get_versions(tables)
+            fingerprint = (
+                request.full_path
+                + "|"
+                + ",".join(f"{name}:{versions[name][0]}" for name in tables)
+            )
+            etag = hashlib.sha1(fingerprint.encode()).hexdigest()
+            modified = [at for _, at in versions.values() if at is not None]
+            last_modified = _last_modified(max(modified)) if modified else None
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = bool(
+                    last_modified
+                    and request.if_modified_since
+                    and last_modified <= request.if_modified_since
+                )
+
+            def set_validators(response):
+                if response.status_code in (200, 304):
+                    response.set_etag(etag, weak=True)
+                    if last_modified:
+                        response.last_modified = last_modified
+                    response.cache_control.no_cache = True
+                return response
+
+            if not_modified:
+                return set_validators(current_app.response_class(status=304))
 
+            after_this_request(set_validators)
             return fn(*args, **kwargs)
 
         wrapper.__name__ = fn.__name__
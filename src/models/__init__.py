@@ -3,5 +3,19 @@ from .event import Event
 from .interaction import Interaction
 from .school import School
 from .formation import Formation
+from .table_version import TableVersion
+from .prospect_rollup import ProspectRollup
+from .duplicate_candidate import DuplicateCandidate
+from .job import Job
 
-__all__ = ["School", "Formation", "Student", "Event", "Interaction"]
+__all__ = [
+    "School",
+    "Formation",
+    "Student",
+    "Event",
+    "Interaction",
+    "TableVersion",
+    "ProspectRollup",
+    "DuplicateCandidate",
+    "Job",
+]
@@ -0,0 +1,36 @@
+from .. import db
+from datetime import datetime
+
+
+class DuplicateCandidate(db.Model):
+    """Par de alunos que provavelmente são a mesma pessoa (ver dedup_service)."""
+
+    __tablename__ = "duplicate_candidate"
+    id = db.Column(db.Integer, primary_key=True)
+    # Sempre student_id < other_student_id, para que cada par apareça uma vez.
+    student_id = db.Column(
+        db.Integer,
+        db.ForeignKey("student.id", name="fk_duplicate_student_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    other_student_id = db.Column(
+        db.Integer,
+        db.ForeignKey(
+            "student.id", name="fk_duplicate_other_student_id", ondelete="CASCADE"
+        ),
+        nullable=False,
+        index=True,
+    )
+    score = db.Column(db.Float, nullable=False)
+    reasons = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "student_id", "other_student_id", name="uq_duplicate_candidate_pair"
+        ),
+        db.Index("ix_duplicate_candidate_score_id", "score", "id"),
+    )
+
+    def __repr__(self):
+        return f"<DuplicateCandidate {self.student_id}~{self.other_student_id}>"
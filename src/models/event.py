@@ -10,11 +10,19 @@ class Event(db.Model):
     event_location = db.Column(db.String(150), nullable=True)
     description = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Contador mantido por interaction_service; recalculável com
+    # `flask stats recount-events`.
+    interaction_count = db.Column(
+        db.Integer, nullable=False, default=0, server_default="0"
+    )
 
     interactions = db.relationship(
         "Interaction", backref="event", lazy=True, cascade="all, delete-orphan"
     )
 
+    # Listagens e estatísticas ordenadas por data (event_service).
+    __table_args__ = (db.Index("ix_event_date_id", "event_date", "id"),)
+
     def __repr__(self):
         return f"<Event {self.event_name}>"
 
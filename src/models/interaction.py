@@ -10,21 +10,27 @@ class Interaction(db.Model):
         db.Integer,
         db.ForeignKey("student.id", name="fk_interaction_student_id"),
         nullable=False,
-        index=True,
     )
     event_id = db.Column(
         db.Integer,
         db.ForeignKey("event.id", name="fk_interaction_event_id"),
         nullable=False,
-        index=True,
     )
 
-    interaction_date = db.Column(db.DateTime, default=datetime.utcnow)
+    interaction_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
+    # student_id e event_id não têm índice próprio: os índices compostos
+    # abaixo começam por eles e atendem às mesmas buscas.
     __table_args__ = (
         db.UniqueConstraint(
             "student_id", "event_id", name="uq_student_event_interaction"
         ),
+        db.Index("ix_interaction_event_date_id", "event_id", "interaction_date", "id"),
+        # Listagem sem filtro de aluno/evento (ordem e intervalo por data).
+        db.Index("ix_interaction_date_id", "interaction_date", "id"),
+        db.Index(
+            "ix_interaction_student_date_id", "student_id", "interaction_date", "id"
+        ),
     )
 
     def __repr__(self):
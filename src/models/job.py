@@ -0,0 +1,24 @@
+from .. import db
+from datetime import datetime
+
+
+class Job(db.Model):
+    """Tarefa executada em segundo plano por job_service.JobRunner."""
+
+    __tablename__ = "job"
+    id = db.Column(db.String(36), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    # queued, running, succeeded, failed ou cancelled
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer, nullable=True)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+    worker = db.Column(db.String(100), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.id} {self.status}>"
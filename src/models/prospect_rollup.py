@@ -0,0 +1,19 @@
+from .. import db
+
+
+class ProspectRollup(db.Model):
+    """Contagem de alunos por dia de cadastro, dimensão e eventos frequentados.
+
+    Mantida incrementalmente por rollup_service a partir das gravações de
+    alunos e interações; pode ser reconstruída com `flask stats rebuild-rollups`.
+    """
+
+    __tablename__ = "prospect_rollup"
+    dimension = db.Column(db.String(20), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    dimension_key = db.Column(db.String(150), primary_key=True)
+    events_attended = db.Column(db.Integer, primary_key=True)
+    students = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ProspectRollup {self.dimension}={self.dimension_key} {self.day}>"
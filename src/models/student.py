@@ -1,5 +1,6 @@
 from .. import db
 from datetime import datetime
+from sqlalchemy import DDL, event, func, literal_column
 
 
 class Student(db.Model):
@@ -8,9 +9,9 @@ class Student(db.Model):
     full_name = db.Column(db.String(150), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     phone_number = db.Column(db.String(20), nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(
-        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow()
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
     school_id = db.Column(
@@ -35,6 +36,23 @@ class Student(db.Model):
         "Interaction", backref="student", lazy=True, cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        db.Index("ix_student_full_name_id", "full_name", "id"),
+        # Índices de trigramas para a busca (student_service.search_students).
+        db.Index(
+            "ix_student_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        db.Index(
+            "ix_student_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     def __repr__(self):
         return f"<Student {self.full_name}>"
 
@@ -53,3 +71,26 @@ class Student(db.Model):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+# Telefone apenas com dígitos; a busca usa exatamente esta expressão (com os
+# argumentos literais, não parâmetros) para que o PostgreSQL aproveite o índice.
+student_phone_digits = func.regexp_replace(
+    Student.phone_number,
+    literal_column("'[^0-9]'"),
+    literal_column("''"),
+    literal_column("'g'"),
+)
+
+db.Index(
+    "ix_student_phone_digits_trgm",
+    student_phone_digits.label("phone_digits"),
+    postgresql_using="gin",
+    postgresql_ops={"phone_digits": "gin_trgm_ops"},
+).ddl_if(dialect="postgresql")
+
+event.listen(
+    Student.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
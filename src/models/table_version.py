@@ -0,0 +1,12 @@
+from .. import db
+from datetime import datetime
+
+
+class TableVersion(db.Model):
+    __tablename__ = "table_version"
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TableVersion {self.name}={self.version}>"
@@ -0,0 +1,11 @@
+from flask import Flask
+
+from . import metrics, pool_stats, slow_queries, sql_stats
+
+
+def init_app(app: Flask) -> None:
+    """Deve ser chamada antes de db.init_app (ver pool_stats.init_app)."""
+    pool_stats.init_app(app)
+    sql_stats.init_app(app)
+    slow_queries.init_app(app)
+    metrics.init_app(app)
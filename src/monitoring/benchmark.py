@@ -0,0 +1,492 @@
+import platform
+import random
+import secrets
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from flask import Flask
+from sqlalchemy import func, insert, select
+
+from .. import db
+from ..models import Event, Formation, Interaction, School, Student
+from ..services import event_service, rollup_service
+from ..services.version_service import bump_version
+from ..utils.db_utils import chunked
+from ..utils.rate_limit import ApiKey
+
+try:  # resource só existe em sistemas Unix
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+SEED_BATCH_SIZE = 5000
+
+# Quantidade de ids diferentes usados nas consultas por id e nas buscas em lote.
+SAMPLE_SIZE = 100
+
+_FIRST_NAMES = (
+    "Ana Bruno Carla Daniel Eduarda Felipe Gabriela Henrique Isabela João Larissa "
+    "Lucas Mariana Mateus Natália Pedro Rafaela Rodrigo Sofia Thiago Valentina"
+).split()
+_LAST_NAMES = (
+    "Almeida Barbosa Cardoso Costa Ferreira Gomes Lima Machado Martins Oliveira "
+    "Pereira Ribeiro Rodrigues Santos Schmidt Silva Souza Weber"
+).split()
+_CITIES = (
+    "Ijuí",
+    "Santa Rosa",
+    "Cruz Alta",
+    "Panambi",
+    "Santo Ângelo",
+    "Três Passos",
+    "Catuípe",
+    "Ajuricaba",
+)
+_DEGREE_LEVELS = ("Bacharelado", "Licenciatura", "Tecnólogo")
+
+
+class SeedVolumes(NamedTuple):
+    students: int
+    schools: int
+    formations: int
+    events: int
+    interactions: int
+
+
+class Scenario(NamedTuple):
+    """Uma chamada medida: `{id}` no caminho é trocado por ids de `entity`."""
+
+    name: str
+    method: str
+    path: str
+    entity: Optional[str] = None
+    body: Optional[Dict[str, Any]] = None
+
+
+def _insert_batches(
+    model: Any,
+    rows: Any,
+    total: int,
+    batch_size: int,
+    progress: Optional[Callable[[str, int, int], None]],
+) -> None:
+    done = 0
+    for batch in chunked(rows, batch_size):
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        done += len(batch)
+        if progress:
+            progress(model.__tablename__, done, total)
+
+
+def _ids(model: Any) -> List[int]:
+    return list(db.session.execute(select(model.id).order_by(model.id)).scalars())
+
+
+def seed_database(
+    volumes: SeedVolumes,
+    seed: int = 42,
+    batch_size: int = SEED_BATCH_SIZE,
+    progress: Optional[Callable[[str, int, int], None]] = None,
+) -> Dict[str, int]:
+    """Popula um banco vazio com dados sintéticos, sempre os mesmos para a mesma `seed`.
+
+    As linhas são inseridas em lotes (executemany) e, no fim, os contadores
+    de eventos, os agregados do funil e as versões das tabelas são refeitos.
+    O número de interações fica limitado a alunos × eventos, pois cada par
+    só pode aparecer uma vez.
+    """
+    if db.session.execute(select(func.count()).select_from(Student)).scalar():
+        raise ValueError("A tabela de alunos já tem registros; use um banco vazio.")
+
+    rng = random.Random(seed)
+    today = date.today()
+    first_day = today - timedelta(days=365)
+
+    _insert_batches(
+        School,
+        (
+            {"name": f"Escola {i:05d}", "city": rng.choice(_CITIES)}
+            for i in range(1, volumes.schools + 1)
+        ),
+        volumes.schools,
+        batch_size,
+        progress,
+    )
+    _insert_batches(
+        Formation,
+        (
+            {
+                "name": f"Formação {i:04d}",
+                "degree_level": rng.choice(_DEGREE_LEVELS),
+                "description": f"Curso sintético {i}",
+            }
+            for i in range(1, volumes.formations + 1)
+        ),
+        volumes.formations,
+        batch_size,
+        progress,
+    )
+    _insert_batches(
+        Event,
+        (
+            {
+                "event_name": f"Evento {i:05d}",
+                "event_date": first_day + timedelta(days=rng.randrange(365)),
+                "event_location": rng.choice(_CITIES),
+                "description": f"Evento sintético {i}",
+            }
+            for i in range(1, volumes.events + 1)
+        ),
+        volumes.events,
+        batch_size,
+        progress,
+    )
+
+    school_ids = _ids(School)
+    formation_ids = _ids(Formation)
+
+    def students():
+        for i in range(1, volumes.students + 1):
+            created_at = datetime.combine(first_day, datetime.min.time()) + timedelta(
+                seconds=rng.randrange(365 * 24 * 3600)
+            )
+            yield {
+                "full_name": f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+                f" {rng.choice(_LAST_NAMES)}",
+                "email": f"aluno{i}@exemplo.com",
+                "phone_number": f"(55) 9{rng.randrange(10**8):08d}",
+                "school_id": rng.choice(school_ids) if school_ids else None,
+                "main_formation_id": (
+                    rng.choice(formation_ids) if formation_ids else None
+                ),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    _insert_batches(Student, students(), volumes.students, batch_size, progress)
+
+    student_ids = _ids(Student)
+    events = db.session.execute(
+        select(Event.id, Event.event_date).order_by(Event.id)
+    ).all()
+    total_interactions = min(volumes.interactions, len(student_ids) * len(events))
+
+    def interactions():
+        # A k-ésima interação liga o aluno k % alunos ao evento deslocado por
+        # k // alunos, o que nunca repete um par enquanto k < alunos × eventos.
+        for k in range(total_interactions):
+            rounds, index = divmod(k, len(student_ids))
+            event_id, event_date = events[(rounds + index * 7919) % len(events)]
+            yield {
+                "student_id": student_ids[index],
+                "event_id": event_id,
+                "interaction_date": datetime.combine(event_date, datetime.min.time())
+                + timedelta(minutes=rng.randrange(8 * 60, 22 * 60)),
+            }
+
+    _insert_batches(
+        Interaction, interactions(), total_interactions, batch_size, progress
+    )
+
+    event_service.recount_interaction_counts()
+    rollup_service.rebuild_rollups()
+    bump_version("school", "formation", "student", "interaction", "event")
+    db.session.commit()
+    return table_counts()
+
+
+def table_counts() -> Dict[str, int]:
+    return {
+        model.__tablename__: db.session.execute(
+            select(func.count()).select_from(model)
+        ).scalar()
+        for model in (School, Formation, Event, Student, Interaction)
+    }
+
+
+def _sample_ids(model: Any, size: int = SAMPLE_SIZE) -> List[int]:
+    """Ids espalhados por toda a tabela, os mesmos a cada execução."""
+    low, high = db.session.execute(select(func.min(model.id), func.max(model.id))).one()
+    if low is None:
+        return []
+    step = max((high - low) // size, 1)
+    candidates = list(range(low, high + 1, step))[:size]
+    found = set(
+        db.session.execute(select(model.id).where(model.id.in_(candidates))).scalars()
+    )
+    return [candidate for candidate in candidates if candidate in found]
+
+
+def default_scenarios(
+    samples: Dict[str, List[int]], search_term: str
+) -> List[Scenario]:
+    """Todas as rotas de leitura da API, incluindo as buscas em lote.
+
+    As rotas que alteram dados ficam de fora para que execuções seguidas
+    sobre o mesmo banco continuem comparáveis.
+    """
+    school_id = samples["school"][0] if samples["school"] else 0
+    student_id = samples["student"][0] if samples["student"] else 0
+    scenarios = [
+        Scenario("students.list", "GET", "/api/v1/students/"),
+        Scenario(
+            "students.list_fields", "GET", "/api/v1/students/?fields=id,full_name"
+        ),
+        Scenario(
+            "students.list_by_school", "GET", f"/api/v1/students/?school_id={school_id}"
+        ),
+        Scenario("students.get", "GET", "/api/v1/students/{id}", "student"),
+        Scenario("students.search", "GET", f"/api/v1/students/search?q={search_term}"),
+        Scenario("students.duplicates", "GET", "/api/v1/students/duplicates"),
+        Scenario(
+            "students.export", "GET", f"/api/v1/students/export?school_id={school_id}"
+        ),
+        Scenario("interactions.list", "GET", "/api/v1/interactions/"),
+        Scenario(
+            "interactions.list_by_student",
+            "GET",
+            f"/api/v1/interactions/?student_id={student_id}",
+        ),
+        Scenario("interactions.get", "GET", "/api/v1/interactions/{id}", "interaction"),
+        Scenario(
+            "interactions.export",
+            "GET",
+            f"/api/v1/interactions/export?student_id={student_id}",
+        ),
+        Scenario("events.list", "GET", "/api/v1/events/"),
+        Scenario("events.get", "GET", "/api/v1/events/{id}", "event"),
+        Scenario("events.stats", "GET", "/api/v1/events/stats"),
+        Scenario("events.stats_detailed", "GET", "/api/v1/events/stats?detailed=true"),
+        Scenario("events.export", "GET", "/api/v1/events/export"),
+        Scenario("schools.list", "GET", "/api/v1/schools/"),
+        Scenario("schools.get", "GET", "/api/v1/schools/{id}", "school"),
+        Scenario("formations.list", "GET", "/api/v1/formations/"),
+        Scenario("formations.get", "GET", "/api/v1/formations/{id}", "formation"),
+        Scenario("analytics.funnel", "GET", "/api/v1/analytics/funnel"),
+        Scenario(
+            "analytics.funnel_city_by_day",
+            "GET",
+            "/api/v1/analytics/funnel?dimension=city&by_day=true",
+        ),
+        Scenario("monitoring.pool", "GET", "/api/v1/monitoring/pool"),
+    ]
+    for entity, path in (
+        ("student", "students"),
+        ("interaction", "interactions"),
+        ("event", "events"),
+        ("school", "schools"),
+        ("formation", "formations"),
+    ):
+        scenarios.append(
+            Scenario(
+                f"{path}.lookup",
+                "POST",
+                f"/api/v1/{path}/lookup",
+                body={"ids": samples[entity]},
+            )
+        )
+    return scenarios
+
+
+def collect_samples() -> Dict[str, List[int]]:
+    return {
+        "student": _sample_ids(Student),
+        "interaction": _sample_ids(Interaction),
+        "event": _sample_ids(Event),
+        "school": _sample_ids(School),
+        "formation": _sample_ids(Formation),
+    }
+
+
+def search_term_for(student_ids: Sequence[int]) -> str:
+    """Parte do nome de um aluno existente, para a busca sempre ter resultado."""
+    if not student_ids:
+        return "ana"
+    name = db.session.get(Student, student_ids[0]).full_name
+    return name.split()[-1][:5].lower()
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentil pelo método do posto mais próximo (valores já ordenados)."""
+    if not values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(values) + 0.5)) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Pico de memória residente do processo até agora (Linux: ru_maxrss em KiB)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if platform.system() == "Darwin" else peak * 1024
+
+
+def _git_commit(cwd: str) -> Optional[str]:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=cwd,
+        )
+    except OSError:
+        return None
+    return completed.stdout.strip() or None
+
+
+def _measure(
+    app: Flask,
+    scenario: Scenario,
+    headers: Dict[str, str],
+    ids: List[int],
+    requests: int,
+    warmup: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    queries: List[int] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+    counter = iter(range(warmup + requests))
+
+    def worker() -> None:
+        client = app.test_client(use_cookies=False)
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            path = scenario.path.replace("{id}", str(ids[i % len(ids)] if ids else 0))
+            started = time.perf_counter()
+            response = client.open(
+                path, method=scenario.method, headers=headers, json=scenario.body
+            )
+            response.get_data()
+            elapsed = time.perf_counter() - started
+            response.close()
+            if i < warmup:
+                continue
+            with lock:
+                latencies.append(elapsed)
+                statuses[str(response.status_code)] = (
+                    statuses.get(str(response.status_code), 0) + 1
+                )
+                count = response.headers.get("X-DB-Query-Count")
+                if count is not None:
+                    queries.append(int(count))
+
+    rss_before = peak_rss_bytes()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+    rss_after = peak_rss_bytes()
+
+    latencies.sort()
+    return {
+        "method": scenario.method,
+        "path": scenario.path,
+        "requests": len(latencies),
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3),
+        },
+        "queries": (
+            {"mean": round(sum(queries) / len(queries), 2), "max": max(queries)}
+            if queries
+            else None
+        ),
+        "peak_rss_bytes": rss_after,
+        "peak_rss_growth_bytes": (
+            rss_after - rss_before if rss_after is not None else None
+        ),
+    }
+
+
+def run_benchmark(
+    app: Flask,
+    requests: int = 50,
+    warmup: int = 5,
+    concurrency: int = 1,
+    only: Optional[Sequence[str]] = None,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Executa os cenários pelo cliente de testes do Flask e devolve o relatório.
+
+    Usa uma chave de API própria, sem limite de taxa, para que o limitador
+    não interfira nas medições. O pico de memória é o do processo inteiro
+    (inclui os cenários anteriores); o crescimento mostra quanto cada um
+    elevou esse pico.
+    """
+    token = secrets.token_hex(16)
+    registry = app.extensions["api_keys"]
+    registry.keys.append(ApiKey("benchmark", token))
+    headers = {"Authorization": f"ApiKey {token}"}
+
+    with app.app_context():
+        samples = collect_samples()
+        search_term = search_term_for(samples["student"])
+        volumes = table_counts()
+        dialect = db.engine.dialect.name
+    scenarios = default_scenarios(samples, search_term)
+    if only:
+        scenarios = [
+            scenario
+            for scenario in scenarios
+            if any(scenario.name.startswith(prefix) for prefix in only)
+        ]
+
+    endpoints = {}
+    for scenario in scenarios:
+        ids = samples.get(scenario.entity, []) if scenario.entity else []
+        endpoints[scenario.name] = _measure(
+            app, scenario, headers, ids, requests, warmup, concurrency
+        )
+        if progress:
+            progress(scenario.name, endpoints[scenario.name])
+
+    return {
+        "meta": {
+            "commit": _git_commit(app.root_path),
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": dialect,
+            "volumes": volumes,
+            "requests": requests,
+            "warmup": warmup,
+            "concurrency": concurrency,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """Variação de p50/p95/p99 e de consultas entre dois relatórios."""
+    rows = []
+    for name, now in current["endpoints"].items():
+        before = baseline["endpoints"].get(name)
+        if before is None:
+            continue
+        row: Dict[str, Any] = {"endpoint": name}
+        for key in ("p50", "p95", "p99"):
+            old, new = before["latency_ms"][key], now["latency_ms"][key]
+            row[key] = (old, new, (new - old) / old * 100 if old else None)
+        old_queries = (before.get("queries") or {}).get("mean")
+        new_queries = (now.get("queries") or {}).get("mean")
+        row["queries"] = (old_queries, new_queries)
+        rows.append(row)
+    return rows
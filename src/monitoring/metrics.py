@@ -0,0 +1,291 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, has_request_context, request
+
+from .pool_stats import pool_snapshot
+
+# Limites superiores (em segundos) dos baldes dos histogramas.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+API_PREFIX = "/api/v1"
+
+Labels = Tuple[str, ...]
+
+
+class _ThreadMetrics:
+    """Valores de uma thread; só ela escreve, por isso não há trava no registro.
+
+    Cada histograma guarda, por combinação de rótulos, a contagem de cada
+    balde seguida da soma e do total de observações.
+    """
+
+    __slots__ = ("thread", "requests", "db_time", "service_errors")
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        self.requests: Dict[Labels, List[float]] = {}
+        self.db_time: Dict[Labels, List[float]] = {}
+        self.service_errors: Dict[Labels, int] = {}
+
+
+def _observe(histogram: Dict[Labels, List[float]], labels: Labels, value: float):
+    values = histogram.get(labels)
+    if values is None:
+        values = histogram[labels] = [0.0] * (len(DURATION_BUCKETS) + 2)
+    index = bisect_left(DURATION_BUCKETS, value)
+    if index < len(DURATION_BUCKETS):
+        values[index] += 1
+    values[-2] += value
+    values[-1] += 1
+
+
+def _merge(target: _ThreadMetrics, source: _ThreadMetrics) -> None:
+    for name in ("requests", "db_time"):
+        merged = getattr(target, name)
+        for labels, values in getattr(source, name).copy().items():
+            current = merged.setdefault(labels, [0.0] * len(values))
+            for index, value in enumerate(values):
+                current[index] += value
+    for labels, count in source.service_errors.copy().items():
+        target.service_errors[labels] = target.service_errors.get(labels, 0) + count
+
+
+class MetricsRegistry:
+    """Métricas por thread, somadas apenas na leitura de /metrics.
+
+    O caminho de cada requisição não disputa travas: a trava só é usada na
+    primeira medição de cada thread e na coleta. Os valores das threads
+    encerradas são acumulados em `_retired` para os contadores não voltarem
+    atrás.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: List[_ThreadMetrics] = []
+        self._retired = _ThreadMetrics(threading.current_thread())
+
+    def _mine(self) -> _ThreadMetrics:
+        metrics = getattr(self._local, "metrics", None)
+        if metrics is None:
+            metrics = self._local.metrics = _ThreadMetrics(threading.current_thread())
+            with self._lock:
+                self._threads.append(metrics)
+        return metrics
+
+    def observe_request(
+        self,
+        namespace: str,
+        method: str,
+        status: int,
+        duration: float,
+        db_duration: Optional[float],
+    ) -> None:
+        metrics = self._mine()
+        _observe(metrics.requests, (namespace, method, str(status)), duration)
+        if db_duration is not None:
+            _observe(metrics.db_time, (namespace, method), db_duration)
+
+    def count_service_error(self, namespace: str, error_type: str) -> None:
+        errors = self._mine().service_errors
+        labels = (namespace, error_type)
+        errors[labels] = errors.get(labels, 0) + 1
+
+    def collect(self) -> _ThreadMetrics:
+        with self._lock:
+            alive = []
+            for metrics in self._threads:
+                if metrics.thread.is_alive():
+                    alive.append(metrics)
+                else:
+                    _merge(self._retired, metrics)
+            self._threads = alive
+            total = _ThreadMetrics(threading.current_thread())
+            for metrics in [self._retired, *alive]:
+                _merge(total, metrics)
+        return total
+
+
+registry = MetricsRegistry()
+
+
+def namespace_of(rule: Optional[str]) -> str:
+    """Primeiro segmento da rota (`/api/v1/students/<int:id>` → `students`)."""
+    if rule is None:
+        return "unmatched"
+    if rule.startswith(API_PREFIX):
+        rule = rule[len(API_PREFIX) :]
+    return rule.strip("/").split("/", 1)[0] or "root"
+
+
+def _current_namespace() -> str:
+    rule = request.url_rule
+    return namespace_of(rule.rule if rule is not None else None)
+
+
+def count_service_error(error_type: str) -> None:
+    """Conta um ServiceResult de erro devolvido a um controller."""
+    if has_request_context() and "metrics" in current_app.extensions:
+        registry.count_service_error(_current_namespace(), error_type)
+
+
+def _start_timer():
+    if request.endpoint != "metrics":
+        g._metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop("_metrics_started", None)
+    if started is not None:
+        stats = g.get("_sql_stats")
+        registry.observe_request(
+            _current_namespace(),
+            request.method,
+            response.status_code,
+            time.perf_counter() - started,
+            stats.duration if stats is not None else None,
+        )
+    return response
+
+
+def _record_failure(error):
+    # Exceção não tratada: o after_request não rodou.
+    started = g.pop("_metrics_started", None)
+    if started is not None and error is not None:
+        registry.observe_request(
+            _current_namespace(),
+            request.method,
+            500,
+            time.perf_counter() - started,
+            None,
+        )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _histogram_lines(
+    name: str,
+    help_text: str,
+    label_names: Tuple[str, ...],
+    histogram: Dict[Labels, List[float]],
+) -> Iterator[str]:
+    yield f"# HELP {name} {help_text}"
+    yield f"# TYPE {name} histogram"
+    for labels, values in sorted(histogram.items()):
+        cumulative = 0.0
+        for bound, count in zip(DURATION_BUCKETS, values):
+            cumulative += count
+            le = _labels(label_names, labels, f'le="{bound}"')
+            yield f"{name}_bucket{le} {cumulative:g}"
+        le = _labels(label_names, labels, 'le="+Inf"')
+        yield f"{name}_bucket{le} {values[-1]:g}"
+        yield f"{name}_sum{_labels(label_names, labels)} {values[-2]:.6f}"
+        yield f"{name}_count{_labels(label_names, labels)} {values[-1]:g}"
+
+
+# (métrica, tipo, ajuda, chave em pool_snapshot)
+POOL_METRICS = (
+    ("db_pool_size", "gauge", "Conexões mantidas no pool.", "size"),
+    ("db_pool_checked_out", "gauge", "Conexões em uso.", "checked_out"),
+    ("db_pool_idle", "gauge", "Conexões livres no pool.", "idle"),
+    ("db_pool_overflow", "gauge", "Conexões abertas além do pool.", "overflow"),
+    ("db_pool_checkouts_total", "counter", "Conexões obtidas.", "checkouts"),
+    (
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Tempo total para obter conexões.",
+        "wait_seconds_total",
+    ),
+    ("db_pool_timeouts_total", "counter", "Esgotamentos do pool.", "timeouts"),
+    (
+        "db_pool_overflow_connections_total",
+        "counter",
+        "Conexões de overflow abertas.",
+        "overflow_connections",
+    ),
+)
+
+
+def render_metrics() -> str:
+    """Todas as métricas no formato de texto do Prometheus."""
+    from .. import db
+
+    totals = registry.collect()
+    lines = list(
+        _histogram_lines(
+            "http_request_duration_seconds",
+            "Duração das requisições até a resposta ser montada.",
+            ("namespace", "method", "status"),
+            totals.requests,
+        )
+    )
+    lines.extend(
+        _histogram_lines(
+            "http_request_db_duration_seconds",
+            "Tempo gasto em instruções SQL por requisição.",
+            ("namespace", "method"),
+            totals.db_time,
+        )
+    )
+    lines.append(
+        "# HELP service_errors_total ServiceResult de erro devolvidos aos controllers."
+    )
+    lines.append("# TYPE service_errors_total counter")
+    for labels, count in sorted(totals.service_errors.items()):
+        lines.append(
+            f"service_errors_total{_labels(('namespace', 'error_type'), labels)} {count}"
+        )
+
+    pools = pool_snapshot(db.engines)
+    for name, kind, help_text, key in POOL_METRICS:
+        if not pools:
+            break
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for pool in pools:
+            lines.append(f"{name}{_labels(('bind',), (pool['bind'],))} {pool[key]}")
+    return "\n".join(lines) + "\n"
+
+
+def _authorized() -> bool:
+    """Aceita as mesmas chaves da API (`Authorization: ApiKey <chave>`), sem limite de taxa."""
+    keys = current_app.extensions.get("api_keys")
+    if keys is None or not keys.keys:
+        return True
+    auth_type, _, provided = request.headers.get("Authorization", "").partition(" ")
+    return auth_type.lower() == "apikey" and keys.find(provided.strip()) is not None
+
+
+def metrics_view():
+    if not _authorized():
+        return Response(
+            "Chave de API inválida ou ausente.\n", 401, mimetype="text/plain"
+        )
+    return Response(render_metrics(), content_type="text/plain; version=0.0.4")
+
+
+def init_app(app: Flask) -> None:
+    """Mede as requisições e publica as métricas em /metrics (METRICS_ENABLED).
+
+    Os rótulos usam o primeiro segmento da rota (`students`, `events`...),
+    não o caminho, para não criar uma série por id.
+    """
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    app.extensions["metrics"] = registry
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.teardown_request(_record_failure)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
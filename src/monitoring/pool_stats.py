@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+from flask import Flask, g, has_request_context
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class PoolStats:
+    """Contadores acumulados de um pool de conexões."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.overflow_connections = 0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_connections += 1
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool que mede o tempo para obter cada conexão.
+
+    O tempo inclui a espera por uma conexão livre, a abertura de conexões
+    novas e o pre-ping; também conta os esgotamentos (TimeoutError) e as
+    conexões abertas além de pool_size (overflow).
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout(time.perf_counter() - started)
+            raise
+        waited = time.perf_counter() - started
+        self.stats.record_checkout(waited)
+        if has_request_context():
+            g._pool_wait = g.get("_pool_wait", 0.0) + waited
+        return connection
+
+    def _create_connection(self):
+        if self.overflow() > 0:
+            self.stats.record_overflow()
+        return super()._create_connection()
+
+    def capacity(self) -> int:
+        return self.size() + max(self._max_overflow, 0)
+
+    def exhausted(self) -> bool:
+        """Todas as conexões permitidas (incluindo overflow) estão em uso."""
+        return self._max_overflow > -1 and self.checkedout() >= self.capacity()
+
+
+def pool_exhausted(engine: Any) -> bool:
+    """Indica se uma nova requisição teria de esperar por uma conexão."""
+    pool = engine.pool
+    return isinstance(pool, TimedQueuePool) and pool.exhausted()
+
+
+def pool_snapshot(engines: Dict[Any, Any]) -> List[Dict[str, Any]]:
+    """Estado atual e contadores de cada pool medido, por bind."""
+    snapshot = []
+    for bind, engine in engines.items():
+        pool = engine.pool
+        if not isinstance(pool, TimedQueuePool):
+            continue
+        stats = pool.stats
+        snapshot.append(
+            {
+                "bind": bind or "default",
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": stats.checkouts,
+                "wait_seconds_total": round(stats.wait_total, 6),
+                "wait_seconds_max": round(stats.wait_max, 6),
+                "timeouts": stats.timeouts,
+                "overflow_connections": stats.overflow_connections,
+            }
+        )
+    return snapshot
+
+
+def _add_pool_timing_header(response):
+    waited = g.get("_pool_wait")
+    if waited is not None:
+        response.headers.add("Server-Timing", f"pool;dur={waited * 1000:.2f}")
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Usa TimedQueuePool nos engines que têm QueuePool.
+
+    Precisa rodar antes de db.init_app, que cria os engines. Bancos SQLite em
+    memória usam outro tipo de pool e ficam sem medição.
+    """
+    options = dict(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    if "pool_size" in options:
+        options.setdefault("poolclass", TimedQueuePool)
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    app.after_request(_add_pool_timing_header)
@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from typing import Any, List, Optional
+
+from flask import Flask, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..utils.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Só estas instruções passam por EXPLAIN. ANALYZE executa o comando de novo,
+# por isso fica restrito a SELECT: um WITH pode conter CTEs que alteram dados.
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH")
+ANALYZABLE_PREFIXES = ("SELECT",)
+
+MAX_PARAMETERS_LENGTH = 2000
+
+_STARTED_KEY = "_slow_query_started_at"
+
+
+class SlowQueryLog:
+    """Registra as instruções acima do limite, no máximo `per_minute` por minuto.
+
+    As que excedem a cota são apenas contadas e o total aparece na próxima
+    entrada registrada.
+    """
+
+    def __init__(self, threshold: float, per_minute: int, explain_analyze: bool):
+        self.threshold = threshold
+        self.explain_analyze = explain_analyze
+        self.bucket = TokenBucket(per_minute / 60, per_minute)
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def admit(self) -> Optional[int]:
+        """Devolve quantas entradas foram omitidas desde a última, ou None se esta também for."""
+        with self._lock:
+            if self.bucket.take():
+                self._suppressed += 1
+                return None
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed
+
+    def explain(self, conn: Any, statement: str, parameters: Any) -> List[str]:
+        """Plano escolhido pelo banco, executado na mesma conexão da instrução."""
+        head = statement.lstrip().upper()
+        if not head.startswith(EXPLAINABLE_PREFIXES):
+            return []
+        dialect = conn.dialect.name
+        if dialect == "postgresql":
+            analyze = self.explain_analyze and head.startswith(ANALYZABLE_PREFIXES)
+            options = "(ANALYZE, BUFFERS) " if analyze else ""
+            prefix = f"EXPLAIN {options}"
+        elif dialect == "sqlite":
+            prefix = "EXPLAIN QUERY PLAN "
+        else:
+            prefix = "EXPLAIN "
+
+        # Cursor DBAPI direto: não passa pelos eventos do SQLAlchemy (nem é
+        # contado em sql_stats). No PostgreSQL um erro no EXPLAIN invalidaria a
+        # transação do request; o savepoint isola essa falha.
+        savepoint = dialect == "postgresql"
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            except Exception as error:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                return [f"(EXPLAIN falhou: {error})"]
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        finally:
+            cursor.close()
+        return [" | ".join(str(value) for value in row) for row in rows]
+
+    def record(
+        self, conn: Any, statement: str, parameters: Any, elapsed: float, many: bool
+    ) -> None:
+        suppressed = self.admit()
+        if suppressed is None:
+            return
+        if has_request_context():
+            origin = f"{request.method} {request.path} ({request.endpoint})"
+        else:
+            origin = "fora de requisição (comando ou tarefa)"
+        # executemany não tem um único conjunto de parâmetros para o EXPLAIN.
+        plan = [] if many else self.explain(conn, statement, parameters)
+        lines = [
+            f"Instrução lenta: {elapsed * 1000:.1f} ms em {origin}",
+            f"SQL: {' '.join(statement.split())}",
+            f"Parâmetros: {repr(parameters)[:MAX_PARAMETERS_LENGTH]}",
+        ]
+        if plan:
+            lines.append("Plano:")
+            lines.extend(f"  {line}" for line in plan)
+        if suppressed:
+            lines.append(f"({suppressed} instruções lentas omitidas pelo limite)")
+        logger.warning("\n".join(lines))
+
+
+_log: Optional[SlowQueryLog] = None
+_listening = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_STARTED_KEY].pop()
+    if _log is not None and elapsed >= _log.threshold:
+        _log.record(conn, statement, parameters, elapsed, executemany)
+
+
+def _handle_error(context):
+    # Instrução com erro: não há after_cursor_execute para desempilhar o início.
+    conn = context.connection
+    if conn is not None and conn.info.get(_STARTED_KEY):
+        conn.info[_STARTED_KEY].pop()
+
+
+def _configure_file(app: Flask) -> None:
+    path = app.config.get("SLOW_QUERY_LOG_FILE")
+    if not path or any(
+        isinstance(handler, RotatingFileHandler) for handler in logger.handlers
+    ):
+        return
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(
+            path,
+            maxBytes=app.config.get("SLOW_QUERY_LOG_MAX_BYTES", 10 * 1024 * 1024),
+            backupCount=app.config.get("SLOW_QUERY_LOG_BACKUPS", 5),
+            encoding="utf-8",
+        )
+    except OSError as error:
+        # Sistema de arquivos somente leitura, por exemplo: as entradas seguem
+        # apenas no log da aplicação.
+        logger.warning(
+            "Não foi possível abrir %s para as instruções lentas: %s", path, error
+        )
+        return
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    logger.addHandler(handler)
+
+
+def init_app(app: Flask) -> None:
+    """Registra as instruções SQL mais lentas que SLOW_QUERY_THRESHOLD_MS.
+
+    Cada entrada traz os parâmetros, a rota de origem e o EXPLAIN da
+    instrução (com ANALYZE nos SELECT se SLOW_QUERY_EXPLAIN_ANALYZE), até
+    SLOW_QUERY_LOG_PER_MINUTE entradas por minuto, no log da aplicação e,
+    se definido, também em SLOW_QUERY_LOG_FILE (arquivo com rotação). Com
+    limite 0 o registro fica desligado.
+    """
+    global _log, _listening
+    threshold_ms = app.config.get("SLOW_QUERY_THRESHOLD_MS", 500)
+    if threshold_ms <= 0:
+        return
+
+    _log = SlowQueryLog(
+        threshold_ms / 1000,
+        app.config.get("SLOW_QUERY_LOG_PER_MINUTE", 30),
+        app.config.get("SLOW_QUERY_EXPLAIN_ANALYZE", False),
+    )
+    _configure_file(app)
+
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listening = True
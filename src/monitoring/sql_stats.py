@@ -0,0 +1,98 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from flask import Flask, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_listening = False
+
+
+class RequestQueryStats:
+    """Instruções SQL executadas durante uma requisição."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Dict[str, int] = {}
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    if not has_request_context():
+        return None
+    stats = g.get("_sql_stats")
+    if stats is None:
+        stats = g._sql_stats = RequestQueryStats()
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["_query_started_at"].pop()
+    stats = current_stats()
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.duration += elapsed
+    repeats = stats.statements.get(statement, 0) + 1
+    stats.statements[statement] = repeats
+
+    # Avisa uma única vez por instrução, quando ela passa do limite.
+    if repeats == current_app.config["SQL_REPEAT_WARNING_THRESHOLD"] + 1:
+        logger.warning(
+            "Possível N+1 em %s %s: a mesma instrução já foi executada %d vezes: %s",
+            request.method,
+            request.path,
+            repeats,
+            " ".join(statement.split())[:500],
+        )
+
+
+def _handle_error(context):
+    # A instrução falhou e o after_cursor_execute não vai rodar: descarta o
+    # início dela para a pilha da conexão não crescer.
+    conn = context.connection
+    if conn is not None and conn.info.get("_query_started_at"):
+        conn.info["_query_started_at"].pop()
+
+
+def _add_timing_headers(response):
+    stats = g.get("_sql_stats")
+    count = stats.count if stats else 0
+    duration_ms = stats.duration * 1000 if stats else 0.0
+    response.headers.add(
+        "Server-Timing", f'db;dur={duration_ms:.2f};desc="{count} queries"'
+    )
+    response.headers["X-DB-Query-Count"] = str(count)
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Conta as instruções SQL e o tempo de banco de cada requisição.
+
+    Os totais são devolvidos nos cabeçalhos `Server-Timing` e
+    `X-DB-Query-Count`; instruções repetidas mais de
+    SQL_REPEAT_WARNING_THRESHOLD vezes na mesma requisição geram um aviso
+    no log (sintoma típico de carregamento preguiçoso em laço).
+    """
+    global _listening
+    app.config.setdefault("SQL_REPEAT_WARNING_THRESHOLD", 10)
+    if not app.config.get("SQL_STATS_ENABLED", True):
+        return
+
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listening = True
+
+    app.after_request(_add_timing_headers)
@@ -0,0 +1,354 @@
+import logging
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import and_, delete, insert, or_, select
+from sqlalchemy.orm import aliased
+
+from .. import db
+from ..models import DuplicateCandidate, Student
+from ..utils.db_utils import chunked
+from ..utils.export_utils import EXPORT_BATCH_SIZE
+from ..utils.pagination_utils import (
+    InvalidCursorError,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+)
+from ..utils.service_utils import ServiceError, ServiceResult
+from ..utils.db_routing import read_only
+
+logger = logging.getLogger(__name__)
+
+DEDUP_MIN_SCORE = 0.7
+
+# Blocos maiores que isto (nomes muito comuns) não são comparados par a par:
+# os alunos são ordenados pelo nome e cada um é comparado só com os vizinhos
+# dentro da janela, o que mantém o custo linear.
+DEDUP_BLOCK_MAX_SIZE = 200
+DEDUP_WINDOW = 20
+
+DEDUP_WRITE_BATCH_SIZE = 1000
+
+# Peso de cada sinal na pontuação. Um nome idêntico sozinho não basta para
+# formar um par; é preciso um segundo sinal (telefone, e-mail ou escola).
+NAME_WEIGHT = 0.6
+PHONE_WEIGHT = 0.25
+EMAIL_WEIGHT = 0.15
+SCHOOL_WEIGHT = 0.1
+PHONE_MISMATCH_PENALTY = 0.15
+
+_NAME_PARTICLES = {"da", "das", "de", "do", "dos", "e"}
+_PHONETIC_RULES = [
+    (re.compile(pattern), replacement)
+    for pattern, replacement in (
+        (r"ph", "f"),
+        (r"lh", "l"),
+        (r"nh", "n"),
+        (r"[cs]h", "x"),
+        (r"qu|q", "k"),
+        (r"gu(?=[ei])", "g"),
+        (r"g(?=[ei])", "j"),
+        (r"c(?=[ei])", "s"),
+        (r"sc(?=[ei])|ss|z", "s"),
+        (r"c", "k"),
+        (r"y", "i"),
+        (r"w", "v"),
+        (r"h", ""),
+    )
+]
+
+
+class DedupRecord(NamedTuple):
+    id: int
+    name: str
+    phone: Optional[str]
+    email: str
+    school_id: Optional[int]
+
+
+def _strip_accents(value: str) -> str:
+    return "".join(
+        ch
+        for ch in unicodedata.normalize("NFKD", value)
+        if not unicodedata.combining(ch)
+    )
+
+
+def normalize_person_name(name: str) -> str:
+    """Nome em minúsculas, sem acentos, pontuação e espaços repetidos."""
+    value = _strip_accents(name.replace("ç", "s").replace("Ç", "s")).casefold()
+    return " ".join(re.sub(r"[^a-z ]", " ", value).split())
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Últimos 8 dígitos do telefone, que ignoram DDI, DDD e o nono dígito."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-8:] if len(digits) >= 8 else None
+
+
+def normalize_email(email: str) -> str:
+    """Parte local do e-mail, sem pontos nem sufixo '+tag'."""
+    local = email.casefold().split("@", 1)[0]
+    return local.split("+", 1)[0].replace(".", "")
+
+
+def phonetic_key(token: str) -> str:
+    """Código fonético simplificado para nomes em português."""
+    if not token:
+        return ""
+    value = token
+    for pattern, replacement in _PHONETIC_RULES:
+        value = pattern.sub(replacement, value)
+    if not value:
+        return ""
+    skeleton = value[0] + re.sub(r"[aeiou]", "", value[1:])
+    return re.sub(r"(.)\1+", r"\1", skeleton)[:6]
+
+
+def blocking_keys(record: DedupRecord) -> List[str]:
+    """Chaves de agrupamento: só alunos que compartilham uma chave são comparados.
+
+    As chaves mais seletivas (telefone, e-mail) vêm primeiro; cada par é
+    avaliado apenas no primeiro bloco que os dois compartilham.
+    """
+    keys = []
+    if record.phone:
+        keys.append(f"p:{record.phone}")
+    if record.email:
+        keys.append(f"e:{record.email}")
+    tokens = [t for t in record.name.split() if t not in _NAME_PARTICLES]
+    if tokens:
+        keys.append(f"n:{phonetic_key(tokens[0])}:{phonetic_key(tokens[-1])}")
+    return keys
+
+
+def _sorted_tokens(name: str) -> str:
+    return " ".join(sorted(name.split()))
+
+
+def score_pair(
+    a: DedupRecord, b: DedupRecord, min_score: float = 0.0
+) -> Tuple[float, List[str]]:
+    """Pontuação entre 0 e 1 de que os dois registros são o mesmo aluno.
+
+    Os sinais baratos (telefone, e-mail, escola) são avaliados primeiro; se nem
+    com nomes idênticos o par alcançaria `min_score`, ou se o limite superior
+    da similaridade dos nomes já o impede, devolve 0 sem a comparação completa.
+    """
+    score, reasons = 0.0, []
+    if a.phone and b.phone:
+        if a.phone == b.phone:
+            score += PHONE_WEIGHT
+            reasons.append("phone")
+        else:
+            score -= PHONE_MISMATCH_PENALTY
+    if a.email and a.email == b.email:
+        score += EMAIL_WEIGHT
+        reasons.append("email")
+    if a.school_id and a.school_id == b.school_id:
+        score += SCHOOL_WEIGHT
+        reasons.append("school")
+
+    needed = (min_score - score) / NAME_WEIGHT
+    if needed > 1.0:
+        return 0.0, []
+    matcher = SequenceMatcher(None, a.name, b.name)
+    if matcher.real_quick_ratio() < needed or matcher.quick_ratio() < needed:
+        return 0.0, []
+    name = matcher.ratio()
+    if name < 1.0:
+        name = max(
+            name,
+            SequenceMatcher(
+                None, _sorted_tokens(a.name), _sorted_tokens(b.name)
+            ).ratio(),
+        )
+    if name >= 0.85:
+        reasons.insert(0, "name")
+    return min(max(score + NAME_WEIGHT * name, 0.0), 1.0), reasons
+
+
+def _to_record(row: Any) -> DedupRecord:
+    student_id, full_name, email, phone_number, school_id = row
+    return DedupRecord(
+        student_id,
+        normalize_person_name(full_name),
+        normalize_phone(phone_number),
+        normalize_email(email),
+        school_id,
+    )
+
+
+def _block_pairs(
+    block: List[DedupRecord],
+) -> Iterator[Tuple[DedupRecord, DedupRecord]]:
+    if len(block) <= DEDUP_BLOCK_MAX_SIZE:
+        for i, a in enumerate(block):
+            for b in block[i + 1 :]:
+                yield a, b
+        return
+    ordered = sorted(block, key=lambda r: r.name)
+    for i, a in enumerate(ordered):
+        for b in ordered[i + 1 : i + 1 + DEDUP_WINDOW]:
+            yield a, b
+
+
+def find_duplicates(
+    records: Iterable[DedupRecord], min_score: float = DEDUP_MIN_SCORE
+) -> Dict[Tuple[int, int], Tuple[float, List[str]]]:
+    """Compara os registros dentro de cada bloco e devolve os pares candidatos."""
+    keys_by_id: Dict[int, List[str]] = {}
+    blocks: Dict[str, List[DedupRecord]] = defaultdict(list)
+    for record in records:
+        keys = keys_by_id[record.id] = blocking_keys(record)
+        for key in keys:
+            blocks[key].append(record)
+
+    pairs: Dict[Tuple[int, int], Tuple[float, List[str]]] = {}
+    for key, block in blocks.items():
+        if len(block) < 2:
+            continue
+        for a, b in _block_pairs(block):
+            other_keys = keys_by_id[b.id]
+            first_shared = next(k for k in keys_by_id[a.id] if k in other_keys)
+            if first_shared != key:
+                continue
+            score, reasons = score_pair(a, b, min_score)
+            if score >= min_score:
+                pair = (a.id, b.id) if a.id < b.id else (b.id, a.id)
+                pairs[pair] = (score, reasons)
+    return pairs
+
+
+def scan_duplicates(
+    min_score: float = DEDUP_MIN_SCORE,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Varre todos os alunos e substitui a tabela de candidatos a duplicados.
+
+    `progress`, se informado, é chamado uma vez, antes do commit; uma exceção
+    lançada por ele desfaz a gravação dos pares.
+    """
+    try:
+        rows = db.session.execute(
+            select(
+                Student.id,
+                Student.full_name,
+                Student.email,
+                Student.phone_number,
+                Student.school_id,
+            ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        records = [_to_record(row) for row in rows]
+        pairs = find_duplicates(records, min_score)
+
+        db.session.execute(delete(DuplicateCandidate))
+        params = [
+            {
+                "student_id": student_id,
+                "other_student_id": other_id,
+                "score": round(score, 4),
+                "reasons": ",".join(reasons),
+            }
+            for (student_id, other_id), (score, reasons) in pairs.items()
+        ]
+        for batch in chunked(params, DEDUP_WRITE_BATCH_SIZE):
+            db.session.execute(insert(DuplicateCandidate), batch)
+        if progress:
+            progress(len(records), len(records))
+        db.session.commit()
+        logger.info(
+            "Busca de duplicados: %d alunos, %d pares", len(records), len(pairs)
+        )
+        return ServiceResult(
+            success=True, data={"students": len(records), "candidates": len(pairs)}
+        )
+    except Exception:
+        logger.exception("Erro na busca de alunos duplicados")
+        db.session.rollback()
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Não foi possível concluir a busca de alunos duplicados.",
+        )
+
+
+@read_only
+def get_candidates_page(
+    min_score: Optional[float] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Lista os pares candidatos, da maior para a menor pontuação."""
+    page_size = clamp_limit(limit)
+    try:
+        after = decode_cursor(cursor, 2) if cursor else None
+    except InvalidCursorError:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="Cursor de paginação inválido.",
+        )
+
+    try:
+        first = aliased(Student)
+        other = aliased(Student)
+        stmt = (
+            select(
+                DuplicateCandidate.id.label("id"),
+                DuplicateCandidate.score.label("score"),
+                DuplicateCandidate.reasons.label("reasons"),
+                DuplicateCandidate.created_at.label("created_at"),
+                first.id.label("student__id"),
+                first.full_name.label("student__full_name"),
+                first.email.label("student__email"),
+                first.phone_number.label("student__phone_number"),
+                other.id.label("other_student__id"),
+                other.full_name.label("other_student__full_name"),
+                other.email.label("other_student__email"),
+                other.phone_number.label("other_student__phone_number"),
+            )
+            .join(first, DuplicateCandidate.student_id == first.id)
+            .join(other, DuplicateCandidate.other_student_id == other.id)
+        )
+        if min_score is not None:
+            stmt = stmt.where(DuplicateCandidate.score >= min_score)
+        if after:
+            score, candidate_id = after
+            stmt = stmt.where(
+                or_(
+                    DuplicateCandidate.score < score,
+                    and_(
+                        DuplicateCandidate.score == score,
+                        DuplicateCandidate.id > candidate_id,
+                    ),
+                )
+            )
+        stmt = stmt.order_by(
+            DuplicateCandidate.score.desc(), DuplicateCandidate.id
+        ).limit(page_size + 1)
+        rows = db.session.execute(stmt).mappings().all()
+        return ServiceResult(
+            success=True,
+            data=build_page(rows, page_size, lambda r: (r["score"], r["id"])),
+        )
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar os candidatos a duplicados.",
+        )
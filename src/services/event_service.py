@@ -1,14 +1,89 @@
 from .. import db
-from ..models import Event
-from typing import Dict, Any, List
+from ..models import Event, Formation, Interaction, Student
+from typing import Callable, Dict, Any, List, Mapping, Optional, Sequence
 from ..utils.service_utils import ServiceResult, ServiceError
+from ..utils.db_routing import read_only
+from ..utils.db_utils import select_row_columns
+from ..utils.lookup_utils import check_lookup_ids, fetch_by_ids
+from ..utils.export_utils import EXPORT_BATCH_SIZE, ExportRows
+from .version_service import bump_version
+from sqlalchemy import func, select, update
 from datetime import datetime
 
+# Colunas da listagem, rotuladas com os nomes dos campos do DTO.
+EVENT_ROW_COLUMNS = {
+    "id": Event.id,
+    "event_name": Event.event_name,
+    "event_date": Event.event_date,
+    "event_location": Event.event_location,
+    "description": Event.description,
+    "created_at": Event.created_at,
+}
 
-def get_all_events() -> ServiceResult[List[Event]]:
+
+@read_only
+def get_all_events(
+    fields: Optional[Sequence[str]] = None,
+) -> ServiceResult[List[Mapping[str, Any]]]:
+    """Lista os eventos como linhas, só com as colunas dos campos em `fields`."""
+    try:
+        columns = select_row_columns(EVENT_ROW_COLUMNS, fields)
+        stmt = select(*(c.label(k) for k, c in columns.items())).order_by(
+            Event.event_date.desc()
+        )
+        return ServiceResult(
+            success=True, data=db.session.execute(stmt).mappings().all()
+        )
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar eventos.",
+        )
+
+
+EVENT_EXPORT_FIELDS = (
+    "id",
+    "event_name",
+    "event_date",
+    "event_location",
+    "description",
+    "created_at",
+)
+
+
+def iter_events_for_export() -> ServiceResult[ExportRows]:
+    """Percorre os eventos com cursor no servidor, em lotes, para exportação."""
+    stmt = (
+        select(
+            Event.id,
+            Event.event_name,
+            Event.event_date,
+            Event.event_location,
+            Event.description,
+            Event.created_at,
+        )
+        .order_by(Event.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    return ServiceResult(success=True, data=ExportRows(stmt))
+
+
+@read_only
+def get_events_by_ids(
+    ids: List[int], fields: Optional[Sequence[str]] = None
+) -> ServiceResult[Dict[str, Any]]:
+    """Busca vários eventos numa consulta, na ordem pedida, indicando os ausentes."""
+    checked = check_lookup_ids(ids)
+    if not checked.success:
+        return checked
     try:
-        events = Event.query.order_by(Event.event_date.desc()).all()
-        return ServiceResult(success=True, data=events)
+        columns = select_row_columns(EVENT_ROW_COLUMNS, fields, ("id",))
+        stmt = select(*(c.label(k) for k, c in columns.items()))
+        return ServiceResult(
+            success=True, data=fetch_by_ids(stmt, Event.id, checked.data)
+        )
     except Exception:
         return ServiceResult(
             success=False,
@@ -17,6 +92,7 @@ def get_all_events() -> ServiceResult[List[Event]]:
         )
 
 
+@read_only
 def get_event_by_id(event_id: int) -> ServiceResult[Event]:
     event = db.session.get(Event, event_id)
     if not event:
@@ -28,28 +104,38 @@ def get_event_by_id(event_id: int) -> ServiceResult[Event]:
     return ServiceResult(success=True, data=event)
 
 
-def create_event(data: Dict[str, Any]) -> ServiceResult[Event]:
-    try:
-        event_date_obj = data.get("event_date")
-        if isinstance(event_date_obj, str):
+def add_event(data: Dict[str, Any]) -> ServiceResult[Event]:
+    """Valida e adiciona o evento à transação atual, sem commit."""
+    event_date_obj = data.get("event_date")
+    if isinstance(event_date_obj, str):
+        try:
             event_date_obj = datetime.strptime(event_date_obj, "%Y-%m-%d").date()
+        except ValueError:
+            return ServiceResult(
+                success=False,
+                error_type=ServiceError.INVALID_INPUT,
+                message="Formato de data inválido para event_date. Use AAAA-MM-DD.",
+            )
 
-        new_event = Event()
-        new_event.event_name = data["event_name"]
-        new_event.event_date = data["event_date"]
-        new_event.event_location = data["event_location"]
-        new_event.description = data["description"]
+    new_event = Event()
+    new_event.event_name = data["event_name"]
+    new_event.event_date = event_date_obj
+    new_event.event_location = data.get("event_location")
+    new_event.description = data.get("description")
 
-        db.session.add(new_event)
+    db.session.add(new_event)
+    db.session.flush()
+    bump_version("event")
+    return ServiceResult(success=True, data=new_event)
+
+
+def create_event(data: Dict[str, Any]) -> ServiceResult[Event]:
+    try:
+        result = add_event(data)
+        if not result.success:
+            return result
         db.session.commit()
-        db.session.refresh(new_event)
-        return ServiceResult(success=True, data=new_event)
-    except ValueError:
-        return ServiceResult(
-            success=False,
-            error_type=ServiceError.INVALID_INPUT,
-            message="Formato de data inválido para event_date. Use AAAA-MM-DD.",
-        )
+        return result
     except Exception:
         db.session.rollback()
         return ServiceResult(
@@ -85,6 +171,7 @@ def update_event(event_id: int, data: Dict[str, Any]) -> ServiceResult[Event]:
     event.description = data.get("description", event.description)
 
     try:
+        bump_version("event")
         db.session.commit()
         return ServiceResult(success=True, data=event)
     except Exception:
@@ -102,7 +189,10 @@ def delete_event(event_id: int) -> ServiceResult[None] | ServiceResult[Event]:
         return event_result
 
     event = event_result.data
-    if event.interactions:
+    has_interactions = db.session.execute(
+        select(select(Interaction.id).where(Interaction.event_id == event_id).exists())
+    ).scalar()
+    if has_interactions:
         return ServiceResult(
             success=False,
             error_type=ServiceError.DEPENDENCY_ERROR,
@@ -111,6 +201,7 @@ def delete_event(event_id: int) -> ServiceResult[None] | ServiceResult[Event]:
 
     try:
         db.session.delete(event)
+        bump_version("event")
         db.session.commit()
         return ServiceResult(success=True)
     except Exception:
@@ -120,3 +211,166 @@ def delete_event(event_id: int) -> ServiceResult[None] | ServiceResult[Event]:
             error_type=ServiceError.INTERNAL_ERROR,
             message="Não foi possível deletar o evento.",
         )
+
+
+def adjust_interaction_counts(deltas: Dict[int, int]) -> None:
+    """Aplica variações ao contador de interações dos eventos, na transação atual.
+
+    Não altera a versão de "event": o contador só aparece em /events/stats,
+    que já depende da versão de "interaction", e as listagens de eventos
+    continuam válidas nos caches dos clientes.
+    """
+    for event_id, delta in deltas.items():
+        if not delta:
+            continue
+        db.session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(interaction_count=Event.interaction_count + delta)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def discount_student_interactions(student_id: int) -> None:
+    """Desconta dos contadores as interações do aluno que será removido."""
+    db.session.execute(
+        update(Event)
+        .where(
+            Event.id.in_(
+                select(Interaction.event_id).where(Interaction.student_id == student_id)
+            )
+        )
+        .values(interaction_count=Event.interaction_count - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount_interaction_counts(
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """Recalcula o contador de interações de todos os eventos.
+
+    `progress`, se informado, é chamado antes do commit; uma exceção lançada
+    por ele desfaz a recontagem.
+    """
+    total = (
+        select(func.count(Interaction.id))
+        .where(Interaction.event_id == Event.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Event)
+        .values(interaction_count=total)
+        .execution_options(synchronize_session=False)
+    )
+    bump_version("event")
+    if progress:
+        progress(result.rowcount, result.rowcount)
+    db.session.commit()
+    return result.rowcount
+
+
+@read_only
+def get_event_stats(detailed: bool = False) -> ServiceResult[List[Dict[str, Any]]]:
+    """Estatísticas de presença por evento.
+
+    Sem `detailed`, lê apenas o contador mantido em Event.interaction_count.
+    Com `detailed`, calcula numa única consulta GROUP BY (evento, escola,
+    formação) o total, as escolas distintas e a distribuição por formação.
+    """
+    try:
+        if not detailed:
+            rows = db.session.execute(
+                select(
+                    Event.id,
+                    Event.event_name,
+                    Event.event_date,
+                    Event.interaction_count,
+                ).order_by(Event.event_date.desc(), Event.id)
+            ).all()
+            return ServiceResult(
+                success=True,
+                data=[
+                    {
+                        "event_id": event_id,
+                        "event_name": event_name,
+                        "event_date": event_date,
+                        "interaction_count": count,
+                    }
+                    for event_id, event_name, event_date, count in rows
+                ],
+            )
+
+        rows = db.session.execute(
+            select(
+                Event.id,
+                Event.event_name,
+                Event.event_date,
+                Student.school_id,
+                Student.main_formation_id,
+                Formation.name,
+                func.count(Interaction.id),
+            )
+            .outerjoin(Interaction, Interaction.event_id == Event.id)
+            .outerjoin(Student, Interaction.student_id == Student.id)
+            .outerjoin(Formation, Student.main_formation_id == Formation.id)
+            .group_by(
+                Event.id,
+                Event.event_name,
+                Event.event_date,
+                Student.school_id,
+                Student.main_formation_id,
+                Formation.name,
+            )
+            .order_by(Event.event_date.desc(), Event.id)
+        ).all()
+
+        stats: Dict[int, Dict[str, Any]] = {}
+        schools: Dict[int, set] = {}
+        for (
+            event_id,
+            event_name,
+            event_date,
+            school_id,
+            formation_id,
+            formation_name,
+            count,
+        ) in rows:
+            entry = stats.setdefault(
+                event_id,
+                {
+                    "event_id": event_id,
+                    "event_name": event_name,
+                    "event_date": event_date,
+                    "interaction_count": 0,
+                    "unique_schools": 0,
+                    "formations": {},
+                },
+            )
+            if not count:
+                continue
+            entry["interaction_count"] += count
+            if school_id is not None:
+                schools.setdefault(event_id, set()).add(school_id)
+            formation = entry["formations"].setdefault(
+                formation_id,
+                {
+                    "formation_id": formation_id,
+                    "formation_name": formation_name,
+                    "count": 0,
+                },
+            )
+            formation["count"] += count
+
+        for event_id, entry in stats.items():
+            entry["unique_schools"] = len(schools.get(event_id, ()))
+            entry["formations"] = sorted(
+                entry["formations"].values(), key=lambda f: -f["count"]
+            )
+        return ServiceResult(success=True, data=list(stats.values()))
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao calcular as estatísticas dos eventos.",
+        )
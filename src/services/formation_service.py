@@ -1,11 +1,17 @@
 from src.services import student_service
 from .. import db
 from ..models import Formation
+from .reference_index import formation_index
+from .version_service import bump_version
 from typing import Dict, Any, List
 from ..utils.service_utils import ServiceResult, ServiceError
+from ..utils.db_routing import read_only
+from ..utils.lookup_utils import check_lookup_ids, fetch_by_ids
+from sqlalchemy import select
 from datetime import datetime
 
 
+@read_only
 def get_all_formations() -> ServiceResult[List[Formation]]:
     try:
         formations = Formation.query.order_by(Formation.name).all()
@@ -18,6 +24,30 @@ def get_all_formations() -> ServiceResult[List[Formation]]:
         )
 
 
+@read_only
+def get_formations_by_ids(ids: List[int]) -> ServiceResult[Dict[str, Any]]:
+    """Busca várias formações numa consulta, na ordem pedida, indicando as ausentes."""
+    checked = check_lookup_ids(ids)
+    if not checked.success:
+        return checked
+    try:
+        data = fetch_by_ids(
+            select(Formation),
+            Formation.id,
+            checked.data,
+            id_of=lambda formation: formation.id,
+            scalars=True,
+        )
+        return ServiceResult(success=True, data=data)
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar formações.",
+        )
+
+
+@read_only
 def get_formation_by_id(formation_id: int) -> ServiceResult[Formation]:
     formation = db.session.get(Formation, formation_id)
     if not formation:
@@ -29,24 +59,34 @@ def get_formation_by_id(formation_id: int) -> ServiceResult[Formation]:
     return ServiceResult(success=True, data=formation)
 
 
-def create_formation(data: Dict[str, Any]) -> ServiceResult[Formation]:
-    if Formation.query.filter_by(name=data["name"]).first():
+def add_formation(data: Dict[str, Any]) -> ServiceResult[Formation]:
+    """Valida e adiciona a formação à transação atual, sem commit."""
+    if formation_index.has_name(data["name"]):
         return ServiceResult(
             success=False,
             error_type=ServiceError.ALREADY_EXISTS,
             message=f"Formação com o nome '{data['name']}' já existe.",
         )
 
-    try:
-        new_formation = Formation()
-        new_formation.name = data["name"]
-        new_formation.description = data.get("description")
-        new_formation.degree_level = data.get("degree_level")
+    new_formation = Formation()
+    new_formation.name = data["name"]
+    new_formation.description = data.get("description")
+    new_formation.degree_level = data.get("degree_level")
 
-        db.session.add(new_formation)
+    db.session.add(new_formation)
+    db.session.flush()
+    bump_version("formation")
+    formation_index.invalidate()
+    return ServiceResult(success=True, data=new_formation)
+
+
+def create_formation(data: Dict[str, Any]) -> ServiceResult[Formation]:
+    try:
+        result = add_formation(data)
+        if not result.success:
+            return result
         db.session.commit()
-        db.session.refresh(new_formation)
-        return ServiceResult(success=True, data=new_formation)
+        return result
     except Exception as e:
         db.session.rollback()
         return ServiceResult(
@@ -79,6 +119,8 @@ def update_formation(
     formation.updated_at = datetime.utcnow()
 
     try:
+        bump_version("formation")
+        formation_index.invalidate()
         db.session.commit()
         return ServiceResult(success=True, data=formation)
     except Exception:
@@ -97,8 +139,7 @@ def delete_formation(
     if not formation_result.success or not formation_result.data:
         return formation_result
     formation = formation_result.data
-    intersted_students = student_service.get_all_students(formation_id=formation_id)
-    if not intersted_students.data or not len(intersted_students.data):
+    if student_service.has_students(formation_id=formation_id):
         return ServiceResult(
             success=False,
             error_type=ServiceError.DEPENDENCY_ERROR,
@@ -106,6 +147,8 @@ def delete_formation(
         )
     try:
         db.session.delete(formation)
+        bump_version("formation")
+        formation_index.invalidate()
         db.session.commit()
         return ServiceResult(success=True)
     except Exception:
@@ -2,35 +2,153 @@ from src.models.formation import Formation
 from src.models.school import School
 from .. import db
 from ..models import Interaction, Student, Event
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
+from datetime import datetime, timezone
 from ..utils.service_utils import ServiceResult, ServiceError
-from sqlalchemy import select
+from ..utils.db_routing import read_only
+from ..utils.db_utils import (
+    chunked,
+    fetch_in,
+    insert_ignoring_conflicts,
+    select_row_columns,
+)
+from ..utils.export_utils import EXPORT_BATCH_SIZE, ExportRows
+from ..utils.lookup_utils import check_lookup_ids, fetch_by_ids
+from ..utils.pagination_utils import (
+    InvalidCursorError,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+)
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
-from .student_service import create_student_with_relations
-from .event_service import create_event
-from src.services import student_service
+from .student_service import add_student_with_relations
+from .event_service import add_event, adjust_interaction_counts
+from .version_service import bump_version
+from . import rollup_service
 
-from src.services import event_service
+# Colunas da listagem, rotuladas com os nomes dos campos do DTO; os campos
+# aninhados usam o prefixo "<campo>__" (ver api/serializers.py).
+INTERACTION_ROW_COLUMNS = {
+    "id": Interaction.id,
+    "student_id": Interaction.student_id,
+    "student__id": Student.id,
+    "student__full_name": Student.full_name,
+    "event_id": Interaction.event_id,
+    "event__id": Event.id,
+    "event__event_name": Event.event_name,
+    "interaction_date": Interaction.interaction_date,
+}
 
 
-def get_all_interactions(
-    student_id: Optional[int] = None, event_id: Optional[int] = None
-) -> ServiceResult[List[Interaction]]:
+def _rows_stmt(columns: Dict[str, Any]):
+    """SELECT das colunas pedidas, juntando aluno e evento só se necessário."""
+    # As chaves estrangeiras não são nulas, então dispensar as junções não
+    # muda quais interações aparecem.
+    stmt = select(*(c.label(k) for k, c in columns.items()))
+    if "student__id" in columns:
+        stmt = stmt.join(Student, Interaction.student_id == Student.id)
+    if "event__id" in columns:
+        stmt = stmt.join(Event, Interaction.event_id == Event.id)
+    return stmt
+
+
+@read_only
+def get_interactions_by_ids(
+    ids: List[int], fields: Optional[Sequence[str]] = None
+) -> ServiceResult[Dict[str, Any]]:
+    """Busca várias interações numa consulta, na ordem pedida, indicando as ausentes."""
+    checked = check_lookup_ids(ids)
+    if not checked.success:
+        return checked
+    try:
+        stmt = _rows_stmt(select_row_columns(INTERACTION_ROW_COLUMNS, fields, ("id",)))
+        return ServiceResult(
+            success=True, data=fetch_by_ids(stmt, Interaction.id, checked.data)
+        )
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar interações.",
+        )
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Converte datas com fuso para UTC sem fuso, como interaction_date é gravada.
+
+    Datas sem fuso já são tratadas como UTC e ficam como estão.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@read_only
+def get_interactions_page(
+    student_id: Optional[int] = None,
+    event_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Lista interações paginando por chave (interaction_date, id).
+
+    Devolve linhas com apenas as colunas de INTERACTION_ROW_COLUMNS, sem montar
+    entidades do ORM. Com `fields`, lê só as colunas desses campos e junta
+    aluno e evento apenas se forem pedidos.
+    """
+    page_size = clamp_limit(limit)
     try:
+        after = decode_cursor(cursor, 2) if cursor else None
+    except InvalidCursorError:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="Cursor de paginação inválido.",
+        )
 
-        stmt = Interaction.query.options(
-            joinedload(Interaction.student), joinedload(Interaction.event)  # type: ignore
+    since, until = _as_naive_utc(since), _as_naive_utc(until)
+    if since and until and since > until:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="O parâmetro 'since' deve ser anterior a 'until'.",
+        )
+
+    try:
+        stmt = _rows_stmt(
+            select_row_columns(
+                INTERACTION_ROW_COLUMNS, fields, required=("interaction_date", "id")
+            )
         )
 
         if student_id:
             stmt = stmt.where(Interaction.student_id == student_id)
         if event_id:
             stmt = stmt.where(Interaction.event_id == event_id)
+        if since:
+            stmt = stmt.where(Interaction.interaction_date >= since)
+        if until:
+            stmt = stmt.where(Interaction.interaction_date < until)
+        if after:
+            stmt = stmt.where(
+                tuple_(Interaction.interaction_date, Interaction.id) > tuple_(*after)
+            )
 
-        interactions = stmt.order_by(Interaction.interaction_date).all()
-        print(interactions)
-        return ServiceResult(success=True, data=interactions)
+        stmt = stmt.order_by(Interaction.interaction_date, Interaction.id).limit(
+            page_size + 1
+        )
+        rows = db.session.execute(stmt).mappings().all()
+        return ServiceResult(
+            success=True,
+            data=build_page(
+                rows, page_size, lambda r: (r["interaction_date"], r["id"])
+            ),
+        )
     except Exception:
         return ServiceResult(
             success=False,
@@ -39,10 +157,72 @@ def get_all_interactions(
         )
 
 
-def get_interaction_by_id(interaction_id: int) -> ServiceResult[Interaction]:
+INTERACTION_EXPORT_FIELDS = (
+    "id",
+    "student_id",
+    "student_name",
+    "event_id",
+    "event_name",
+    "interaction_date",
+)
+
+
+def iter_interactions_for_export(
+    student_id: Optional[int] = None,
+    event_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> ServiceResult[ExportRows]:
+    """Percorre as interações com cursor no servidor, em lotes, para exportação."""
+    since, until = _as_naive_utc(since), _as_naive_utc(until)
+    if since and until and since > until:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="O parâmetro 'since' deve ser anterior a 'until'.",
+        )
+
+    stmt = (
+        select(
+            Interaction.id,
+            Interaction.student_id,
+            Student.full_name.label("student_name"),
+            Interaction.event_id,
+            Event.event_name,
+            Interaction.interaction_date,
+        )
+        .join(Student, Interaction.student_id == Student.id)
+        .join(Event, Interaction.event_id == Event.id)
+        .order_by(Interaction.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if student_id:
+        stmt = stmt.where(Interaction.student_id == student_id)
+    if event_id:
+        stmt = stmt.where(Interaction.event_id == event_id)
+    if since:
+        stmt = stmt.where(Interaction.interaction_date >= since)
+    if until:
+        stmt = stmt.where(Interaction.interaction_date < until)
+
+    return ServiceResult(success=True, data=ExportRows(stmt))
+
+
+@read_only
+def get_interaction_by_id(
+    interaction_id: int, include: Optional[Sequence[str]] = None
+) -> ServiceResult[Interaction]:
+    """Busca a interação carregando as relações em `include` (todas se None)."""
+    relations = {"student": Interaction.student, "event": Interaction.event}
     stmt = (
         select(Interaction)
-        .options(joinedload(Interaction.student), joinedload(Interaction.event))  # type: ignore
+        .options(
+            *(
+                joinedload(relation)  # type: ignore
+                for name, relation in relations.items()
+                if include is None or name in include
+            )
+        )
         .where(Interaction.id == interaction_id)
     )
     interaction = db.session.scalars(stmt).first()
@@ -55,15 +235,9 @@ def get_interaction_by_id(interaction_id: int) -> ServiceResult[Interaction]:
     return ServiceResult(success=True, data=interaction)
 
 
-def create_interaction(
+def _resolve_student(
     data: Dict[str, Any],
-) -> (
-    ServiceResult[Interaction]
-    | ServiceResult[Student]
-    | ServiceResult[School]
-    | ServiceResult[Formation]
-    | ServiceResult[Event]
-):
+) -> ServiceResult[Student] | ServiceResult[School] | ServiceResult[Formation]:
     student_id = data.get("student_id")
     student_input = data.get("student")
     if not student_id and not student_input:
@@ -73,29 +247,20 @@ def create_interaction(
             message="Forneça 'student_id' ou 'student'",
         )
 
-    final_student_id = student_id
-    if student_input and not final_student_id:
-        student_result = create_student_with_relations(student_input)
-        if not student_result.success:
-            return student_result
-        if student_result.data:
-            final_student_id = student_result.data.id
-
-    if not final_student_id:
-        return ServiceResult(
-            success=False,
-            error_type=ServiceError.INVALID_INPUT,
-            message="Forneça 'student_id' ou 'student'",
-        )
+    if student_input and not student_id:
+        return add_student_with_relations(student_input)
 
-    student = student_service.get_student_by_id(final_student_id)
-    if not student.success:
+    student = db.session.get(Student, student_id)
+    if not student:
         return ServiceResult(
             success=False,
             error_type=ServiceError.NOT_FOUND,
-            message=f"Aluno com ID {final_student_id} não encontrado.",
+            message=f"Aluno com ID {student_id} não encontrado.",
         )
+    return ServiceResult(success=True, data=student)
 
+
+def _resolve_event(data: Dict[str, Any]) -> ServiceResult[Event]:
     event_id = data.get("event_id")
     event_input = data.get("event")
     if not event_id and not event_input:
@@ -105,40 +270,56 @@ def create_interaction(
             message="Forneça 'event_id' ou 'event_input'",
         )
 
-    final_event_id = event_id
-    if event_input and not final_event_id:
-        event_result = create_event(event_input)
-        if not event_result.success:
-            return event_result
-        if event_result.data:
-            final_event_id = event_result.data.id
-
-    if not final_event_id:
-        return ServiceResult(
-            success=False,
-            error_type=ServiceError.INVALID_INPUT,
-            message="É necessário fornecer 'student_id' (ou 'student') e 'event_id' (ou 'event').",
-        )
+    if event_input and not event_id:
+        return add_event(event_input)
 
-    event = event_service.get_event_by_id(final_event_id)
-    if not event.success:
+    event = db.session.get(Event, event_id)
+    if not event:
         return ServiceResult(
             success=False,
             error_type=ServiceError.NOT_FOUND,
-            message=f"Evento com ID {final_event_id} não encontrado.",
+            message=f"Evento com ID {event_id} não encontrado.",
         )
+    return ServiceResult(success=True, data=event)
+
+
+def create_interaction(
+    data: Dict[str, Any],
+) -> (
+    ServiceResult[Interaction]
+    | ServiceResult[Student]
+    | ServiceResult[School]
+    | ServiceResult[Formation]
+    | ServiceResult[Event]
+):
+    """Cria a interação e, se necessário, o aluno e o evento aninhados.
 
+    Todas as entidades são gravadas na mesma transação, com um único commit;
+    qualquer falha desfaz também o que já tinha sido enviado com flush.
+    """
     try:
+        student_result = _resolve_student(data)
+        if not student_result.success:
+            db.session.rollback()
+            return student_result
+
+        event_result = _resolve_event(data)
+        if not event_result.success:
+            db.session.rollback()
+            return event_result
+
         new_interaction = Interaction()
-        new_interaction = Interaction()
-        new_interaction.student_id = final_student_id
-        new_interaction.event_id = final_event_id
+        new_interaction.student = student_result.data
+        new_interaction.event = event_result.data
 
         db.session.add(new_interaction)
+        db.session.flush()
+        adjust_interaction_counts({new_interaction.event_id: 1})
+        rollup_service.record_attendance_change([new_interaction.student_id], 1)
+        bump_version("interaction")
         db.session.commit()
-        return get_interaction_by_id(new_interaction.id)
-    except IntegrityError as e:
-        print(e)
+        return ServiceResult(success=True, data=new_interaction)
+    except IntegrityError:
         db.session.rollback()
         return ServiceResult(
             success=False,
@@ -154,6 +335,108 @@ def create_interaction(
         )
 
 
+CHECKIN_MAX_ITEMS = 5000
+CHECKIN_INSERT_BATCH_SIZE = 1000
+
+
+def check_in_students(
+    event_id: int,
+    student_ids: Optional[List[int]] = None,
+    emails: Optional[List[str]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Registra a presença de vários alunos num evento de uma só vez.
+
+    Os alunos são resolvidos com uma consulta IN por ids e outra por e-mails, e
+    as interações são gravadas com INSERT multi-linha que ignora as duplicadas
+    de uq_student_event_interaction, sem depender de IntegrityError/rollback.
+    """
+    student_ids = list(dict.fromkeys(student_ids or []))
+    emails = list(dict.fromkeys(emails or []))
+    if not student_ids and not emails:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="Forneça 'student_ids' e/ou 'emails'.",
+        )
+    if len(student_ids) + len(emails) > CHECKIN_MAX_ITEMS:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"O lote excede o limite de {CHECKIN_MAX_ITEMS} alunos.",
+        )
+
+    if not db.session.get(Event, event_id):
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.NOT_FOUND,
+            message=f"Evento com ID {event_id} não encontrado.",
+        )
+
+    try:
+        found_ids = {
+            student_id
+            for (student_id,) in fetch_in(select(Student.id), Student.id, student_ids)
+        }
+        ids_by_email = dict(
+            (email, student_id)
+            for student_id, email in fetch_in(
+                select(Student.id, Student.email), Student.email, emails
+            )
+        )
+
+        resolved = list(
+            dict.fromkeys(
+                [i for i in student_ids if i in found_ids]
+                + [ids_by_email[e] for e in emails if e in ids_by_email]
+            )
+        )
+
+        inserted = set()
+        now = datetime.utcnow()
+        for batch in chunked(resolved, CHECKIN_INSERT_BATCH_SIZE):
+            stmt = (
+                insert_ignoring_conflicts(
+                    Interaction.__table__,
+                    [Interaction.student_id, Interaction.event_id],
+                )
+                .values(
+                    [
+                        {
+                            "student_id": student_id,
+                            "event_id": event_id,
+                            "interaction_date": now,
+                        }
+                        for student_id in batch
+                    ]
+                )
+                .returning(Interaction.student_id)
+            )
+            inserted.update(db.session.scalars(stmt))
+        if inserted:
+            adjust_interaction_counts({event_id: len(inserted)})
+            rollup_service.record_attendance_change(inserted, 1)
+            bump_version("interaction")
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Não foi possível registrar as presenças.",
+        )
+
+    return ServiceResult(
+        success=True,
+        data={
+            "event_id": event_id,
+            "inserted": [i for i in resolved if i in inserted],
+            "already_present": [i for i in resolved if i not in inserted],
+            "unknown_student_ids": [i for i in student_ids if i not in found_ids],
+            "unknown_emails": [e for e in emails if e not in ids_by_email],
+        },
+    )
+
+
 def delete_interaction(
     interaction_id: int,
 ) -> ServiceResult[None] | ServiceResult[Interaction]:
@@ -164,6 +447,10 @@ def delete_interaction(
     interaction = interaction_result.data
     try:
         db.session.delete(interaction)
+        db.session.flush()
+        adjust_interaction_counts({interaction.event_id: -1})
+        rollup_service.record_attendance_change([interaction.student_id], -1)
+        bump_version("interaction")
         db.session.commit()
         return ServiceResult(success=True)
     except Exception:
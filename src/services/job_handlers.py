@@ -0,0 +1,120 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from flask import current_app
+
+from ..utils.export_utils import EXPORT_BATCH_SIZE, iter_csv, iter_ndjson
+from ..utils.service_utils import ServiceError, ServiceResult
+from . import (
+    dedup_service,
+    event_service,
+    interaction_service,
+    rollup_service,
+    student_service,
+)
+from .job_service import JobContext, get_job, job_handler
+
+# Exportações disponíveis em segundo plano: linhas (ExportRows) e campos.
+EXPORTS = {
+    "students": (
+        student_service.iter_students_for_export,
+        student_service.STUDENT_EXPORT_FIELDS,
+    ),
+    "events": (
+        event_service.iter_events_for_export,
+        event_service.EVENT_EXPORT_FIELDS,
+    ),
+    "interactions": (
+        interaction_service.iter_interactions_for_export,
+        interaction_service.INTERACTION_EXPORT_FIELDS,
+    ),
+}
+
+
+def export_path(job_id: str, fmt: str) -> str:
+    return os.path.join(current_app.config["JOB_EXPORT_DIR"], f"{job_id}.{fmt}")
+
+
+def get_export_file(job_id: str) -> ServiceResult[Dict[str, str]]:
+    """Caminho e nome do arquivo gerado por uma tarefa de exportação concluída."""
+    result = get_job(job_id)
+    if not result.success:
+        return result
+    job = result.data
+    if job.kind != "export" or job.status != "succeeded":
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="A tarefa não gerou arquivo ou ainda não terminou.",
+        )
+    path = export_path(job.id, job.result["format"])
+    if not os.path.exists(path):
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.NOT_FOUND,
+            message="O arquivo exportado não está mais disponível.",
+        )
+    filename = f"{job.result['entity']}.{job.result['format']}"
+    return ServiceResult(success=True, data={"path": path, "filename": filename})
+
+
+@job_handler("students.bulk_import")
+def run_bulk_import(
+    context: JobContext, rows: List[Dict[str, Any]]
+) -> ServiceResult[Dict[str, Any]]:
+    return student_service.bulk_create_students(rows, progress=context.progress)
+
+
+@job_handler("export")
+def run_export(
+    context: JobContext,
+    entity: str,
+    fmt: str,
+    filters: Optional[Dict[str, Any]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    iter_rows, fieldnames = EXPORTS[entity]
+    result = iter_rows(**(filters or {}))
+    if not result.success:
+        return result
+
+    # Contado com os mesmos filtros da exportação.
+    total = result.data.count()
+    context.progress(0, total)
+
+    path = export_path(context.job_id, fmt)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    encoder = iter_csv if fmt == "csv" else iter_ndjson
+    written = 0
+    try:
+        with open(path, "w", encoding="utf-8", newline="") as output:
+            for chunk in encoder(result.data, fieldnames):
+                output.write(chunk)
+                written += EXPORT_BATCH_SIZE
+                context.progress(min(written, total), total)
+    except BaseException:
+        os.remove(path)
+        raise
+    context.progress(total, total)
+    return ServiceResult(
+        success=True,
+        data={"entity": entity, "format": fmt, "size": os.path.getsize(path)},
+    )
+
+
+@job_handler("stats.rebuild_rollups")
+def run_rebuild_rollups(context: JobContext) -> ServiceResult[Dict[str, Any]]:
+    rows = rollup_service.rebuild_rollups(progress=context.progress)
+    return ServiceResult(success=True, data={"rows": rows})
+
+
+@job_handler("stats.recount_events")
+def run_recount_events(context: JobContext) -> ServiceResult[Dict[str, Any]]:
+    events = event_service.recount_interaction_counts(progress=context.progress)
+    return ServiceResult(success=True, data={"events": events})
+
+
+@job_handler("dedup.scan")
+def run_dedup_scan(
+    context: JobContext, min_score: float
+) -> ServiceResult[Dict[str, Any]]:
+    return dedup_service.scan_duplicates(min_score=min_score, progress=context.progress)
@@ -0,0 +1,341 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from .. import db
+from ..models import Job
+from ..utils.service_utils import ServiceError, ServiceResult
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+JobHandler = Callable[..., ServiceResult]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def job_handler(kind: str):
+    """Registra a função que executa as tarefas do tipo `kind`.
+
+    A função recebe um JobContext e os parâmetros passados a submit_job, e
+    devolve um ServiceResult cujo `data` é gravado como resultado da tarefa.
+    """
+
+    def decorator(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+
+    return decorator
+
+
+class JobContext:
+    """Progresso e cancelamento de uma tarefa em execução.
+
+    O progresso fica em memória e é gravado na tabela `job` no máximo a cada
+    JOB_PROGRESS_INTERVAL segundos, por uma conexão própria, para não interferir
+    na transação da tarefa; na mesma ida ao banco é lido o pedido de
+    cancelamento, que pode ter vindo de outro processo.
+    """
+
+    def __init__(self, job_id: str, interval: float):
+        self.job_id = job_id
+        self.processed = 0
+        self.total: Optional[int] = None
+        self.cancel_requested = False
+        self._interval = interval
+        self._flushed_at = time.monotonic()
+
+    def progress(self, processed: int, total: Optional[int] = None) -> None:
+        """Atualiza o progresso; lança JobCancelled se houve pedido de cancelamento.
+
+        Ao chegar ao total (em geral logo antes do commit da tarefa) o pedido
+        de cancelamento é sempre relido do banco: depois do commit a tarefa
+        não pode mais ser cancelada.
+        """
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        if time.monotonic() - self._flushed_at >= self._interval:
+            self._flush()
+        elif self.total is not None and processed >= self.total:
+            self._read_cancel_request()
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        if self.cancel_requested:
+            raise JobCancelled(self.job_id)
+
+    def _flush(self) -> None:
+        self._flushed_at = time.monotonic()
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    update(Job)
+                    .where(Job.id == self.job_id)
+                    .values(processed=self.processed, total=self.total)
+                )
+                if conn.execute(
+                    select(Job.cancel_requested).where(Job.id == self.job_id)
+                ).scalar():
+                    self.cancel_requested = True
+        except SQLAlchemyError:
+            logger.debug("Progresso da tarefa %s não gravado", self.job_id)
+
+    def _read_cancel_request(self) -> None:
+        # Lido na própria transação da tarefa: outra conexão poderia esperar
+        # pelas travas que ela mesma mantém (SQLite). O progresso final é
+        # gravado ao concluir a tarefa.
+        if db.session.execute(
+            select(Job.cancel_requested).where(Job.id == self.job_id)
+        ).scalar():
+            self.cancel_requested = True
+
+
+class JobRunner:
+    """Executa as tarefas num pool de threads limitado, com o app context ativo."""
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get("JOB_WORKERS", 2),
+            thread_name_prefix="job",
+        )
+        self._slots = threading.BoundedSemaphore(
+            app.config.get("JOB_WORKERS", 2) + app.config.get("JOB_MAX_PENDING", 20)
+        )
+        self._interval = app.config.get("JOB_PROGRESS_INTERVAL", 2)
+        self._running: Dict[str, JobContext] = {}
+
+    def try_reserve(self) -> bool:
+        return self._slots.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._slots.release()
+
+    def start(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        self._executor.submit(self._run, job_id, kind, params)
+
+    def live(self, job_id: str) -> Optional[JobContext]:
+        return self._running.get(job_id)
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        try:
+            with self.app.app_context():
+                self._execute(job_id, kind, params)
+        except Exception:
+            logger.exception("Falha ao executar a tarefa %s", job_id)
+        finally:
+            self._running.pop(job_id, None)
+            self.release()
+
+    def _execute(self, job_id: str, kind: str, params: Dict[str, Any]) -> None:
+        # A tarefa só é iniciada se ainda estiver na fila e sem pedido de
+        # cancelamento; a condição no UPDATE evita corrida com cancel_job.
+        claimed = db.session.execute(
+            update(Job)
+            .where(
+                Job.id == job_id,
+                Job.status == "queued",
+                Job.cancel_requested.is_(False),
+            )
+            .values(status="running", worker=self.worker, started_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return
+
+        context = JobContext(job_id, self._interval)
+        self._running[job_id] = context
+
+        try:
+            result = _handlers[kind](context, **params)
+        except JobCancelled:
+            result = None
+        except Exception:
+            logger.exception("Erro na tarefa %s (%s)", job_id, kind)
+            result = ServiceResult(
+                success=False,
+                error_type=ServiceError.INTERNAL_ERROR,
+                message="Erro interno ao executar a tarefa.",
+            )
+
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.processed = context.processed
+        job.total = context.total
+        # Uma tarefa que terminou com sucesso já gravou o seu trabalho; um
+        # cancelamento pedido tarde demais não muda isso.
+        if result is not None and result.success:
+            job.result = result.data
+            _finish(job, "succeeded")
+        elif context.cancel_requested or job.cancel_requested:
+            _finish(job, "cancelled")
+        else:
+            job.error = ((result and result.message) or "Erro desconhecido.")[:500]
+            _finish(job, "failed")
+
+
+def _finish(job: Job, status: str) -> None:
+    job.status = status
+    job.finished_at = datetime.utcnow()
+    db.session.commit()
+
+
+def _runner() -> JobRunner:
+    return current_app.extensions["job_runner"]
+
+
+def _with_live_progress(job: Job) -> Job:
+    context = _runner().live(job.id)
+    if context is not None and job.status == "running":
+        job.processed = context.processed
+        job.total = context.total
+    return job
+
+
+def submit_job(kind: str, **params: Any) -> ServiceResult[Job]:
+    """Registra a tarefa e a enfileira; devolve imediatamente, sem executá-la."""
+    runner = _runner()
+    if not runner.try_reserve():
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.UNAVAILABLE,
+            message="A fila de tarefas está cheia. Tente novamente mais tarde.",
+        )
+    try:
+        job = Job(
+            id=str(uuid.uuid4()), kind=kind, status="queued", worker=runner.worker
+        )
+        db.session.add(job)
+        db.session.commit()
+    except Exception:
+        runner.release()
+        db.session.rollback()
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Não foi possível registrar a tarefa.",
+        )
+    runner.start(job.id, kind, params)
+    return ServiceResult(success=True, data=job)
+
+
+def get_job(job_id: str) -> ServiceResult[Job]:
+    job = db.session.get(Job, job_id)
+    if not job:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.NOT_FOUND,
+            message=f"Tarefa com ID {job_id} não encontrada.",
+        )
+    return ServiceResult(success=True, data=_with_live_progress(job))
+
+
+def cancel_job(job_id: str) -> ServiceResult[Job]:
+    """Pede o cancelamento; a tarefa para no próximo ponto de verificação."""
+    job_result = get_job(job_id)
+    if not job_result.success:
+        return job_result
+    job = job_result.data
+    if job.status in FINISHED_STATUSES:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"A tarefa já foi finalizada ({job.status}).",
+        )
+    try:
+        db.session.execute(
+            update(Job).where(Job.id == job_id).values(cancel_requested=True)
+        )
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="cancelled", finished_at=datetime.utcnow())
+        )
+        db.session.commit()
+        db.session.refresh(job)
+    except Exception:
+        db.session.rollback()
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Não foi possível cancelar a tarefa.",
+        )
+    context = _runner().live(job_id)
+    if context is not None:
+        context.cancel_requested = True
+    return ServiceResult(success=True, data=job)
+
+
+def _process_alive(worker: Optional[str]) -> bool:
+    try:
+        os.kill(int((worker or "").rsplit(":", 1)[1]), 0)
+    except (IndexError, ValueError):
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def fail_orphaned_jobs(runner: JobRunner) -> int:
+    """Marca como falhas as tarefas deste host cujo processo não existe mais.
+
+    A fila fica em memória: tarefas `queued`/`running` de um processo
+    reiniciado nunca serão executadas nem concluídas.
+    """
+    host = runner.worker.rsplit(":", 1)[0]
+    stale = [
+        job_id
+        for job_id, worker in db.session.execute(
+            select(Job.id, Job.worker).where(
+                Job.status.in_(("queued", "running")),
+                Job.worker.like(f"{host}:%"),
+                Job.worker != runner.worker,
+            )
+        )
+        if not _process_alive(worker)
+    ]
+    if stale:
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_(stale), Job.status.in_(("queued", "running")))
+            .values(
+                status="failed",
+                error="A tarefa foi interrompida pelo reinício do servidor.",
+                finished_at=datetime.utcnow(),
+            )
+        )
+    db.session.commit()
+    return len(stale)
+
+
+def init_app(app: Flask) -> None:
+    runner = app.extensions["job_runner"] = JobRunner(app)
+    with app.app_context():
+        try:
+            failed = fail_orphaned_jobs(runner)
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.warning("Não foi possível verificar as tarefas interrompidas.")
+        else:
+            if failed:
+                logger.warning("%d tarefas interrompidas marcadas como falhas", failed)
+    from . import job_handlers  # noqa: F401  (registra os tipos de tarefa)
@@ -0,0 +1,10 @@
+from typing import Any, Dict, List
+
+from .. import db
+from ..monitoring.pool_stats import pool_snapshot
+from ..utils.service_utils import ServiceResult
+
+
+def get_pool_stats() -> ServiceResult[List[Dict[str, Any]]]:
+    """Uso e contadores dos pools de conexões deste processo."""
+    return ServiceResult(success=True, data=pool_snapshot(db.engines))
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, Optional, Type
+
+from flask import Flask, current_app
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import make_transient_to_detached
+
+from .. import db
+from ..models import Formation, School
+from .version_service import get_versions, session_has_writes
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name: str) -> str:
+    """Normaliza nomes para comparação: Unicode NFKC, caixa e espaços."""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+class ReferenceIndex:
+    """Índice em memória de uma tabela de referência pequena (escolas, formações).
+
+    As linhas ficam indexadas por id e por nome normalizado. A versão da tabela
+    (ver version_service) é conferida no máximo a cada
+    REFERENCE_INDEX_CHECK_SECONDS, e sempre que uma busca não encontra o
+    registro, para que alterações feitas por outros workers sejam percebidas.
+
+    Tudo é lido pela sessão atual. Enquanto a transação dela tem escritas não
+    confirmadas, o índice já carregado não é recarregado, para não guardar
+    linhas que ainda podem ser desfeitas.
+    """
+
+    def __init__(self, model: Type[db.Model], table: str):
+        self._model = model
+        self._table = table
+        self._columns = [c.key for c in inspect(model).column_attrs]
+        self._lock = threading.Lock()
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        self._by_name: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    def load(self) -> None:
+        with self._lock:
+            session = db.session
+            # Carregado no meio de uma escrita, pode conter linhas ainda não
+            # confirmadas: serve a esta transação e é recarregado no próximo uso.
+            trusted = not session_has_writes()
+            with session.no_autoflush:
+                version, _ = get_versions([self._table])[self._table]
+                rows = session.execute(select(self._model.__table__)).mappings().all()
+            by_id = {row["id"]: dict(row) for row in rows}
+            self._by_id = by_id
+            self._by_name = {normalize_name(r["name"]): r for r in by_id.values()}
+            self._version = version if trusted else None
+            self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        self._version = None
+
+    def _ensure_fresh(self, force: bool = False) -> None:
+        interval = current_app.config.get("REFERENCE_INDEX_CHECK_SECONDS", 5)
+        if self._version is not None and (
+            session_has_writes()
+            or (not force and time.monotonic() - self._checked_at < interval)
+        ):
+            return
+        if self._version is not None:
+            version, _ = get_versions([self._table])[self._table]
+            if version == self._version:
+                self._checked_at = time.monotonic()
+                return
+        self.load()
+
+    def _lookup(self, index_name: str, key: Any) -> Optional[Dict[str, Any]]:
+        self._ensure_fresh()
+        row = getattr(self, index_name).get(key)
+        if row is None:
+            self._ensure_fresh(force=True)
+            row = getattr(self, index_name).get(key)
+        return row
+
+    def _attach(self, row: Optional[Dict[str, Any]]):
+        """Devolve a entidade ligada à sessão atual sem consultar o banco."""
+        if row is None:
+            return None
+        instance = self._model(**{key: row[key] for key in self._columns})
+        make_transient_to_detached(instance)
+        return db.session.merge(instance, load=False)
+
+    def get(self, id: int):
+        return self._attach(self._lookup("_by_id", id))
+
+    def get_name(self, id: int) -> Optional[str]:
+        row = self._lookup("_by_id", id)
+        return row["name"] if row else None
+
+    def has_name(self, name: str) -> bool:
+        return self._lookup("_by_name", normalize_name(name)) is not None
+
+    def find_by_name(self, name: str):
+        return self._attach(self._lookup("_by_name", normalize_name(name)))
+
+    def find_id_by_name(self, name: str) -> Optional[int]:
+        """Como find_by_name, mas só o id (sem ligar a entidade à sessão)."""
+        row = self._lookup("_by_name", normalize_name(name))
+        return row["id"] if row else None
+
+    def find_ids_by_names(self, names: Iterable[Optional[str]]) -> Dict[str, int]:
+        """Ids dos registros encontrados, pelo nome normalizado.
+
+        A versão é conferida uma vez para o lote todo, com no máximo uma
+        recarga se algum nome não estiver no índice.
+        """
+        keys = {normalize_name(name) for name in names if name}
+        self._ensure_fresh()
+        by_name = self._by_name
+        if not keys <= by_name.keys():
+            self._ensure_fresh(force=True)
+            by_name = self._by_name
+        return {key: by_name[key]["id"] for key in keys if key in by_name}
+
+
+school_index = ReferenceIndex(School, "school")
+formation_index = ReferenceIndex(Formation, "formation")
+
+
+def init_app(app: Flask) -> None:
+    """Carrega os índices na inicialização; em caso de falha, carrega sob demanda."""
+    if not app.config.get("REFERENCE_INDEX_WARMUP", True):
+        return
+    with app.app_context():
+        try:
+            school_index.load()
+            formation_index.load()
+        except SQLAlchemyError:
+            logger.warning(
+                "Não foi possível pré-carregar os índices de referência; "
+                "serão carregados no primeiro uso."
+            )
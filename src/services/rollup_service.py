@@ -0,0 +1,287 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import case, delete, func, insert, select
+
+from .. import db
+from ..models import Interaction, ProspectRollup, School, Student
+from ..utils.db_utils import chunked, fetch_in, insert_accumulating
+from ..utils.export_utils import EXPORT_BATCH_SIZE
+from ..utils.service_utils import ServiceError, ServiceResult
+from ..utils.db_routing import read_only
+from .reference_index import formation_index, school_index
+
+ROLLUP_DIMENSIONS = ("school", "formation", "city")
+
+# Alunos com esta quantidade de eventos ou mais ficam na mesma faixa, o que
+# limita o tamanho da tabela; `min_events` não pode passar deste valor.
+ROLLUP_MAX_EVENTS = 10
+
+ROLLUP_WRITE_BATCH_SIZE = 1000
+
+RollupKey = Tuple[str, date, str, int]
+
+
+class StudentProfile(NamedTuple):
+    day: date
+    school_id: Optional[int]
+    formation_id: Optional[int]
+    city: Optional[str]
+    events: int
+
+
+def _profiles_stmt():
+    return (
+        select(
+            Student.id,
+            Student.created_at,
+            Student.school_id,
+            Student.main_formation_id,
+            School.city,
+            func.count(Interaction.id),
+        )
+        .outerjoin(School, Student.school_id == School.id)
+        .outerjoin(Interaction, Interaction.student_id == Student.id)
+        .group_by(
+            Student.id,
+            Student.created_at,
+            Student.school_id,
+            Student.main_formation_id,
+            School.city,
+        )
+    )
+
+
+def _to_profiles(rows: Iterable[Any]) -> Dict[int, StudentProfile]:
+    # Alunos sem created_at não têm dia de cadastro e ficam fora dos agregados,
+    # tanto na manutenção incremental quanto na reconstrução.
+    return {
+        student_id: StudentProfile(
+            created_at.date(), school_id, formation_id, city, events
+        )
+        for student_id, created_at, school_id, formation_id, city, events in rows
+        if created_at is not None
+    }
+
+
+def _load_profiles(
+    student_ids: Optional[List[int]] = None, school_id: Optional[int] = None
+) -> Dict[int, StudentProfile]:
+    if school_id is not None:
+        return _to_profiles(
+            db.session.execute(_profiles_stmt().where(Student.school_id == school_id))
+        )
+    return _to_profiles(fetch_in(_profiles_stmt(), Student.id, student_ids or []))
+
+
+def _keys(profile: StudentProfile) -> List[RollupKey]:
+    bucket = min(profile.events, ROLLUP_MAX_EVENTS)
+    return [
+        ("school", profile.day, str(profile.school_id or ""), bucket),
+        ("formation", profile.day, str(profile.formation_id or ""), bucket),
+        ("city", profile.day, profile.city or "", bucket),
+    ]
+
+
+def _count(deltas: Counter, profiles: Iterable[StudentProfile], sign: int) -> Counter:
+    for profile in profiles:
+        for key in _keys(profile):
+            deltas[key] += sign
+    return deltas
+
+
+def _apply(deltas: Counter) -> None:
+    params = [
+        {
+            "dimension": dimension,
+            "day": day,
+            "dimension_key": dimension_key,
+            "events_attended": events,
+            "students": delta,
+        }
+        for (dimension, day, dimension_key, events), delta in deltas.items()
+        if delta
+    ]
+    table = ProspectRollup.__table__
+    stmt = insert_accumulating(
+        table,
+        [
+            table.c.dimension,
+            table.c.day,
+            table.c.dimension_key,
+            table.c.events_attended,
+        ],
+        ["students"],
+    )
+    for batch in chunked(params, ROLLUP_WRITE_BATCH_SIZE):
+        db.session.execute(stmt, batch)
+
+
+def record_new_students(student_ids: List[int]) -> None:
+    """Conta os alunos recém-inseridos (já enviados com flush)."""
+    _apply(_count(Counter(), _load_profiles(student_ids).values(), 1))
+
+
+def record_attendance_change(student_ids: Iterable[int], delta: int) -> None:
+    """Move os alunos de faixa depois de ganharem (ou perderem) `delta` eventos.
+
+    Deve ser chamada depois do flush das interações, com uma consulta para
+    todos os alunos afetados.
+    """
+    after = _load_profiles(list(student_ids))
+    before = [p._replace(events=p.events - delta) for p in after.values()]
+    deltas = _count(Counter(), before, -1)
+    _apply(_count(deltas, after.values(), 1))
+
+
+@contextmanager
+def tracking(
+    student_ids: Optional[List[int]] = None, school_id: Optional[int] = None
+) -> Iterator[None]:
+    """Atualiza os agregados com a diferença entre antes e depois do bloco.
+
+    Usada nas alterações que mudam a dimensão dos alunos (troca de escola ou
+    formação, cidade da escola) ou os removem. Gravações concorrentes sobre o
+    mesmo aluno podem deixar os agregados defasados; a reconstrução corrige.
+    """
+    before = _load_profiles(student_ids, school_id)
+    yield
+    db.session.flush()
+    after = _load_profiles(student_ids, school_id)
+    deltas = _count(Counter(), before.values(), -1)
+    _apply(_count(deltas, after.values(), 1))
+
+
+def rebuild_rollups(progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Recalcula todos os agregados a partir de alunos e interações.
+
+    `progress`, se informado, é chamado antes do commit; uma exceção lançada
+    por ele (p.ex. cancelamento da tarefa) desfaz a reconstrução.
+    """
+    totals: Counter = Counter()
+    rows = db.session.execute(
+        _profiles_stmt().execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for partition in rows.partitions():
+        _count(totals, _to_profiles(partition).values(), 1)
+
+    db.session.execute(delete(ProspectRollup))
+    params = [
+        {
+            "dimension": dimension,
+            "day": day,
+            "dimension_key": dimension_key,
+            "events_attended": events,
+            "students": students,
+        }
+        for (dimension, day, dimension_key, events), students in totals.items()
+    ]
+    for batch in chunked(params, ROLLUP_WRITE_BATCH_SIZE):
+        db.session.execute(insert(ProspectRollup), batch)
+    if progress:
+        progress(len(params), len(params))
+    db.session.commit()
+    return len(params)
+
+
+def _label(dimension: str, key: str) -> Optional[str]:
+    if not key:
+        return None
+    if dimension == "city":
+        return key
+    index = school_index if dimension == "school" else formation_index
+    return index.get_name(int(key))
+
+
+@read_only
+def get_funnel(
+    dimension: str,
+    min_events: int = 1,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    by_day: bool = False,
+) -> ServiceResult[List[Dict[str, Any]]]:
+    """Alunos por escola, formação ou cidade e quantos frequentaram `min_events`.
+
+    Lê apenas a tabela de agregados; `since`/`until` filtram pelo dia de
+    cadastro do aluno (UTC).
+    """
+    if dimension not in ROLLUP_DIMENSIONS:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"Dimensão inválida: use {', '.join(ROLLUP_DIMENSIONS)}.",
+        )
+    if not 0 <= min_events <= ROLLUP_MAX_EVENTS:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"'min_events' deve estar entre 0 e {ROLLUP_MAX_EVENTS}.",
+        )
+    if since and until and since > until:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="'since' deve ser anterior ou igual a 'until'.",
+        )
+
+    try:
+        group = [ProspectRollup.dimension_key]
+        if by_day:
+            group.append(ProspectRollup.day)
+        stmt = (
+            select(
+                *group,
+                func.sum(ProspectRollup.students),
+                func.sum(
+                    case(
+                        (
+                            ProspectRollup.events_attended >= min_events,
+                            ProspectRollup.students,
+                        ),
+                        else_=0,
+                    )
+                ),
+            )
+            .where(ProspectRollup.dimension == dimension)
+            .group_by(*group)
+            .having(func.sum(ProspectRollup.students) > 0)
+            .order_by(*reversed(group))
+        )
+        if since:
+            stmt = stmt.where(ProspectRollup.day >= since)
+        if until:
+            stmt = stmt.where(ProspectRollup.day <= until)
+
+        data = []
+        for row in db.session.execute(stmt):
+            key, students, attended = row[0], row[-2], row[-1]
+            data.append(
+                {
+                    "dimension": dimension,
+                    "key": key or None,
+                    "label": _label(dimension, key),
+                    "day": row[1] if by_day else None,
+                    "students": int(students),
+                    "attended": int(attended),
+                }
+            )
+        return ServiceResult(success=True, data=data)
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao consultar os agregados do funil.",
+        )
@@ -1,11 +1,19 @@
 from src.services import student_service
 from ..utils.service_utils import ServiceError, ServiceResult
+from ..utils.db_routing import read_only
+from ..utils.lookup_utils import check_lookup_ids, fetch_by_ids
+from sqlalchemy import select
 from .. import db
 from ..models import School
+from .reference_index import school_index
+from .version_service import bump_version
+from . import rollup_service
 from typing import Dict, Any, List
+from contextlib import nullcontext
 from datetime import datetime
 
 
+@read_only
 def get_all_schools() -> ServiceResult[List[School]]:
     try:
         schools = School.query.order_by(School.name).all()
@@ -18,6 +26,30 @@ def get_all_schools() -> ServiceResult[List[School]]:
         )
 
 
+@read_only
+def get_schools_by_ids(ids: List[int]) -> ServiceResult[Dict[str, Any]]:
+    """Busca várias escolas numa consulta, na ordem pedida, indicando as ausentes."""
+    checked = check_lookup_ids(ids)
+    if not checked.success:
+        return checked
+    try:
+        data = fetch_by_ids(
+            select(School),
+            School.id,
+            checked.data,
+            id_of=lambda school: school.id,
+            scalars=True,
+        )
+        return ServiceResult(success=True, data=data)
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar escolas.",
+        )
+
+
+@read_only
 def get_school_by_id(school_id: int) -> ServiceResult[School]:
     school = db.session.get(School, school_id)
     if not school:
@@ -29,24 +61,34 @@ def get_school_by_id(school_id: int) -> ServiceResult[School]:
     return ServiceResult(success=True, data=school)
 
 
-def create_school(data: Dict[str, Any]) -> ServiceResult[School]:
-    """Cria uma nova escola."""
-    if School.query.filter_by(name=data["name"]).first():
+def add_school(data: Dict[str, Any]) -> ServiceResult[School]:
+    """Valida e adiciona a escola à transação atual, sem commit."""
+    if school_index.has_name(data["name"]):
         return ServiceResult(
             success=False,
             error_type=ServiceError.ALREADY_EXISTS,
             message=f"Escola com o nome '{data['name']}' já existe.",
         )
 
-    try:
-        new_school = School()
-        new_school.name = data["name"]
-        new_school.city = data.get("city")
+    new_school = School()
+    new_school.name = data["name"]
+    new_school.city = data.get("city")
+
+    db.session.add(new_school)
+    db.session.flush()
+    bump_version("school")
+    school_index.invalidate()
+    return ServiceResult(success=True, data=new_school)
 
-        db.session.add(new_school)
+
+def create_school(data: Dict[str, Any]) -> ServiceResult[School]:
+    """Cria uma nova escola."""
+    try:
+        result = add_school(data)
+        if not result.success:
+            return result
         db.session.commit()
-        db.session.refresh(new_school)
-        return ServiceResult(success=True, data=new_school)
+        return result
     except Exception as e:
         db.session.rollback()
         return ServiceResult(
@@ -71,10 +113,18 @@ def update_school(school_id: int, data: Dict[str, Any]) -> ServiceResult[School]
                 message=f"Outra escola com o nome '{data['name']}' já existe.",
             )
 
-    school.name = data.get("name", school.name)
-    school.city = data.get("city", school.city)
-    school.updated_at = datetime.utcnow()
+    # Só a cidade da escola entra nos agregados do funil.
+    if "city" in data and data["city"] != school.city:
+        rollup_tracking = rollup_service.tracking(school_id=school_id)
+    else:
+        rollup_tracking = nullcontext()
     try:
+        with rollup_tracking:
+            school.name = data.get("name", school.name)
+            school.city = data.get("city", school.city)
+            school.updated_at = datetime.utcnow()
+        bump_version("school")
+        school_index.invalidate()
         db.session.commit()
         return ServiceResult(success=True, data=school)
     except Exception:
@@ -92,8 +142,7 @@ def delete_school(school_id: int) -> ServiceResult[None] | ServiceResult[School]
         return school_result
     school = school_result.data
 
-    school_students = student_service.get_all_students(school_id)
-    if not school_students.data or not len(school_students.data):
+    if student_service.has_students(school_id=school_id):
         return ServiceResult(
             success=False,
             error_type=ServiceError.DEPENDENCY_ERROR,
@@ -101,6 +150,8 @@ def delete_school(school_id: int) -> ServiceResult[None] | ServiceResult[School]
         )
     try:
         db.session.delete(school)
+        bump_version("school")
+        school_index.invalidate()
         db.session.commit()
         return ServiceResult(success=True)
     except Exception:
@@ -1,22 +1,124 @@
+import logging
+from contextlib import nullcontext
 from .. import db
 from datetime import datetime
-from ..models import Student, School, Formation
-from .school_service import create_school
-from .formation_service import create_formation
+from ..models import Job, Student, School, Formation
+from ..models.student import student_phone_digits
+from .school_service import add_school
+from .formation_service import add_formation
+from .event_service import discount_student_interactions
+from .reference_index import formation_index, normalize_name, school_index
+from .version_service import bump_version
+from . import job_service, rollup_service
+from sqlalchemy import case, func, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import joinedload
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Sequence
 from ..utils.service_utils import ServiceResult, ServiceError
-from src.services import school_service
+from ..utils.db_routing import read_only
+from ..utils.db_utils import chunked, fetch_in, select_row_columns
+from ..utils.export_utils import EXPORT_BATCH_SIZE, ExportRows
+from ..utils.lookup_utils import check_lookup_ids, fetch_by_ids
+from ..utils.pagination_utils import (
+    InvalidCursorError,
+    build_page,
+    clamp_limit,
+    decode_cursor,
+)
 
-from src.services import formation_service
+logger = logging.getLogger(__name__)
 
 
-def get_all_students(
+def has_students(
     school_id: Optional[int] = None, formation_id: Optional[int] = None
-) -> ServiceResult[List[Student]]:
+) -> bool:
+    """Indica se existe algum aluno ligado à escola/formação, sem carregá-los."""
+    stmt = select(Student.id)
+    if school_id:
+        stmt = stmt.where(Student.school_id == school_id)
+    if formation_id:
+        stmt = stmt.where(Student.main_formation_id == formation_id)
+    return db.session.execute(select(stmt.exists())).scalar()
+
+
+# Colunas da listagem, rotuladas com os nomes dos campos do DTO; os campos
+# aninhados usam o prefixo "<campo>__" (ver api/serializers.py).
+STUDENT_ROW_COLUMNS = {
+    "id": Student.id,
+    "full_name": Student.full_name,
+    "email": Student.email,
+    "phone_number": Student.phone_number,
+    "school_id": Student.school_id,
+    "school__id": School.id,
+    "school__name": School.name,
+    "main_formation_id": Student.main_formation_id,
+    "main_formation__id": Formation.id,
+    "main_formation__name": Formation.name,
+    "created_at": Student.created_at,
+    "updated_at": Student.updated_at,
+}
+
+
+def _rows_stmt(columns: Dict[str, Any]):
+    """SELECT das colunas pedidas, juntando escola e formação só se necessário."""
+    stmt = select(*(c.label(k) for k, c in columns.items()))
+    if "school__id" in columns:
+        stmt = stmt.outerjoin(School, Student.school_id == School.id)
+    if "main_formation__id" in columns:
+        stmt = stmt.outerjoin(Formation, Student.main_formation_id == Formation.id)
+    return stmt
+
+
+@read_only
+def get_students_by_ids(
+    ids: List[int], fields: Optional[Sequence[str]] = None
+) -> ServiceResult[Dict[str, Any]]:
+    """Busca vários alunos numa consulta, na ordem pedida, indicando os ausentes."""
+    checked = check_lookup_ids(ids)
+    if not checked.success:
+        return checked
     try:
-        stmt = Student.query.options(
-            joinedload(Student.school), joinedload(Student.main_formation)  # type: ignore
+        stmt = _rows_stmt(select_row_columns(STUDENT_ROW_COLUMNS, fields, ("id",)))
+        return ServiceResult(
+            success=True, data=fetch_by_ids(stmt, Student.id, checked.data)
+        )
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar alunos.",
+        )
+
+
+@read_only
+def get_students_page(
+    school_id: Optional[int] = None,
+    formation_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Lista alunos paginando por chave (full_name, id).
+
+    Devolve linhas com apenas as colunas de STUDENT_ROW_COLUMNS, sem montar
+    entidades do ORM. Com `fields`, lê só as colunas desses campos e junta
+    escola e formação apenas se forem pedidas.
+    """
+    page_size = clamp_limit(limit)
+    try:
+        after = decode_cursor(cursor, 2) if cursor else None
+    except InvalidCursorError:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="Cursor de paginação inválido.",
+        )
+
+    try:
+        stmt = _rows_stmt(
+            select_row_columns(
+                STUDENT_ROW_COLUMNS, fields, required=("full_name", "id")
+            )
         )
 
         if school_id:
@@ -25,10 +127,104 @@ def get_all_students(
         if formation_id:
             stmt = stmt.where(Student.main_formation_id == formation_id)
 
-        students = stmt.order_by(Student.full_name).all()
+        if after:
+            stmt = stmt.where(tuple_(Student.full_name, Student.id) > tuple_(*after))
+
+        stmt = stmt.order_by(Student.full_name, Student.id).limit(page_size + 1)
+        rows = db.session.execute(stmt).mappings().all()
+
+        return ServiceResult(
+            success=True,
+            data=build_page(rows, page_size, lambda r: (r["full_name"], r["id"])),
+        )
+    except Exception:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Erro ao buscar alunos.",
+        )
+
+
+SEARCH_MIN_LENGTH = 3
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _sqlite_phone_digits(column):
+    for char in (" ", "-", "(", ")", "+", "."):
+        column = func.replace(column, char, "")
+    return column
+
+
+@read_only
+def search_students(
+    q: str, limit: Optional[int] = None
+) -> ServiceResult[Dict[str, Any]]:
+    """Busca alunos por parte do nome, e-mail ou telefone, em ordem de relevância.
+
+    No PostgreSQL usa os índices de trigramas (pg_trgm) de full_name, email e
+    dos dígitos do telefone, ordenando por word_similarity, o que também tolera
+    pequenos erros de digitação no nome. Nos demais bancos (SQLite) faz LIKE
+    por substring, com prioridade para e-mail exato e início de nome.
+    """
+    term = " ".join((q or "").split())
+    if len(term) < SEARCH_MIN_LENGTH:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"A busca deve ter pelo menos {SEARCH_MIN_LENGTH} caracteres.",
+        )
+    size = clamp_limit(limit, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT)
+    digits = "".join(ch for ch in term if ch.isdigit())
+    escaped = _escape_like(term)
 
-        return ServiceResult(success=True, data=students)
+    try:
+        postgres = db.session.get_bind().dialect.name == "postgresql"
+        if postgres:
+            phone = student_phone_digits
+        else:
+            phone = _sqlite_phone_digits(Student.phone_number)
+
+        conditions = [
+            Student.full_name.ilike(f"%{escaped}%", escape="\\"),
+            Student.email.ilike(f"%{escaped}%", escape="\\"),
+        ]
+        if len(digits) >= SEARCH_MIN_LENGTH:
+            conditions.append(phone.like(f"%{digits}%"))
+
+        if postgres:
+            conditions.append(Student.full_name.op("%>")(term))
+            rank = func.greatest(
+                func.word_similarity(term, Student.full_name),
+                func.similarity(term, Student.email),
+                case((func.lower(Student.email) == term.lower(), 1.0), else_=0.0),
+            )
+            order = [rank.desc(), Student.full_name, Student.id]
+        else:
+            rank = case(
+                (func.lower(Student.email) == term.lower(), 0),
+                (Student.full_name.ilike(f"{escaped}%", escape="\\"), 1),
+                (Student.full_name.ilike(f"% {escaped}%", escape="\\"), 2),
+                else_=3,
+            )
+            order = [rank, Student.full_name, Student.id]
+
+        stmt = (
+            select(*(c.label(k) for k, c in STUDENT_ROW_COLUMNS.items()))
+            .outerjoin(School, Student.school_id == School.id)
+            .outerjoin(Formation, Student.main_formation_id == Formation.id)
+            .where(or_(*conditions))
+            .order_by(*order)
+            .limit(size)
+        )
+        rows = db.session.execute(stmt).mappings().all()
+        return ServiceResult(success=True, data={"items": rows})
     except Exception:
+        logger.exception("Erro na busca de alunos")
         return ServiceResult(
             success=False,
             error_type=ServiceError.INTERNAL_ERROR,
@@ -36,12 +232,67 @@ def get_all_students(
         )
 
 
-def get_student_by_id(id: int) -> ServiceResult[Student]:
+STUDENT_EXPORT_FIELDS = (
+    "id",
+    "full_name",
+    "email",
+    "phone_number",
+    "school_id",
+    "school_name",
+    "main_formation_id",
+    "main_formation_name",
+    "created_at",
+    "updated_at",
+)
+
+
+def iter_students_for_export(
+    school_id: Optional[int] = None, formation_id: Optional[int] = None
+) -> ServiceResult[ExportRows]:
+    """Percorre os alunos com cursor no servidor, em lotes, para exportação."""
+    stmt = (
+        select(
+            Student.id,
+            Student.full_name,
+            Student.email,
+            Student.phone_number,
+            Student.school_id,
+            School.name.label("school_name"),
+            Student.main_formation_id,
+            Formation.name.label("main_formation_name"),
+            Student.created_at,
+            Student.updated_at,
+        )
+        .outerjoin(School, Student.school_id == School.id)
+        .outerjoin(Formation, Student.main_formation_id == Formation.id)
+        .order_by(Student.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if school_id:
+        stmt = stmt.where(Student.school_id == school_id)
+    if formation_id:
+        stmt = stmt.where(Student.main_formation_id == formation_id)
+
+    return ServiceResult(success=True, data=ExportRows(stmt))
+
+
+@read_only
+def get_student_by_id(
+    id: int, include: Optional[Sequence[str]] = None
+) -> ServiceResult[Student]:
+    """Busca o aluno carregando as relações em `include` (todas se None)."""
+    relations = {
+        "school": Student.school,
+        "main_formation": Student.main_formation,
+    }
     student = (
         db.session.query(Student)
         .options(
-            joinedload(Student.school),  # type: ignore
-            joinedload(Student.main_formation),  # type: ignore
+            *(
+                joinedload(relation)  # type: ignore
+                for name, relation in relations.items()
+                if include is None or name in include
+            )
         )
         .where(Student.id == id)
         .first()
@@ -56,103 +307,401 @@ def get_student_by_id(id: int) -> ServiceResult[Student]:
     return ServiceResult(success=True, data=student)
 
 
-def create_student_with_relations(
-    data: Dict[str, Any],
-) -> ServiceResult[Student] | ServiceResult[School] | ServiceResult[Formation]:
-    print(data)
-    if Student.query.filter_by(email=data["email"]).first():
+def _resolve_school(
+    school_id: Optional[int], school_input: Optional[Dict[str, Any]]
+) -> ServiceResult[School]:
+    if school_input and not school_id:
+        existing = school_index.find_by_name(school_input["name"])
+        if existing:
+            return ServiceResult(success=True, data=existing)
+        return add_school(school_input)
+
+    school = school_index.get(school_id) if school_id else None
+    if not school:
         return ServiceResult(
             success=False,
-            error_type=ServiceError.ALREADY_EXISTS,
-            message=f"Aluno com o e-mail '{data['email']}' já existe.",
+            error_type=ServiceError.NOT_FOUND,
+            message=f"Escola com ID {school_id} não encontrada.",
         )
+    return ServiceResult(success=True, data=school)
 
-    school_id = data.get("school_id")
-    school = data.get("school")
 
-    if not school_id and not school:
+def _resolve_formation(
+    formation_id: Optional[int], formation_input: Optional[Dict[str, Any]]
+) -> ServiceResult[Formation]:
+    if formation_input and not formation_id:
+        existing = formation_index.find_by_name(formation_input["name"])
+        if existing:
+            return ServiceResult(success=True, data=existing)
+        return add_formation(formation_input)
+
+    formation = formation_index.get(formation_id) if formation_id else None
+    if not formation:
         return ServiceResult(
             success=False,
-            error_type=ServiceError.INVALID_INPUT,
-            message="Dados da Escola são obrigatórios para o cadastro",
+            error_type=ServiceError.NOT_FOUND,
+            message=f"Formação com ID {formation_id} não encontrada.",
         )
+    return ServiceResult(success=True, data=formation)
 
-    final_school_id = school_id
-    if school and not school_id:
-        school_result = create_school(school)
-        if not school_result.success:
-            return school_result
-        if school_result.data:
-            final_school_id = school_result.data.id
 
-    if not final_school_id:
+def add_student_with_relations(
+    data: Dict[str, Any],
+) -> ServiceResult[Student] | ServiceResult[School] | ServiceResult[Formation]:
+    """Adiciona o aluno (e a escola/formação aninhadas) à transação atual.
+
+    Nada é confirmado aqui: as entidades são enviadas com flush, que devolve
+    os IDs pelo próprio INSERT, e quem chama decide o commit ou o rollback.
+    """
+    if Student.query.filter_by(email=data["email"]).first():
         return ServiceResult(
             success=False,
-            error_type=ServiceError.NOT_FOUND,
-            message=f"Escola com ID {final_school_id} não encontrada.",
+            error_type=ServiceError.ALREADY_EXISTS,
+            message=f"Aluno com o e-mail '{data['email']}' já existe.",
         )
 
-    if not school_service.get_school_by_id(final_school_id).success:
+    if not data.get("school_id") and not data.get("school"):
         return ServiceResult(
             success=False,
-            error_type=ServiceError.NOT_FOUND,
-            message=f"Escola com ID {final_school_id} não encontrada.",
+            error_type=ServiceError.INVALID_INPUT,
+            message="Dados da Escola são obrigatórios para o cadastro",
         )
-
-    formation_id = data.get("main_formation_id")
-    formation = data.get("main_formation")
-
-    if not formation_id and not formation:
+    if not data.get("main_formation_id") and not data.get("main_formation"):
         return ServiceResult(
             success=False,
             error_type=ServiceError.INVALID_INPUT,
             message="Dados da Formação são obrigatórios para o cadastro.",
         )
 
-    final_formation_id = formation_id
-    if formation and not formation_id:
-        formation_result = create_formation(formation)
-        if not formation_result.success:
-            return formation_result
-        if formation_result.data:
-            final_formation_id = formation_result.data.id
+    school_result = _resolve_school(data.get("school_id"), data.get("school"))
+    if not school_result.success:
+        return school_result
+
+    formation_result = _resolve_formation(
+        data.get("main_formation_id"), data.get("main_formation")
+    )
+    if not formation_result.success:
+        return formation_result
+
+    new_student = Student()
+    new_student.full_name = data["full_name"]
+    new_student.email = data["email"]
+    new_student.phone_number = data.get("phone_number")
+    new_student.school = school_result.data
+    new_student.main_formation = formation_result.data
+
+    db.session.add(new_student)
+    db.session.flush()
+    rollup_service.record_new_students([new_student.id])
+    bump_version("student")
+    return ServiceResult(success=True, data=new_student)
 
-    if not final_formation_id:
+
+def create_student_with_relations(
+    data: Dict[str, Any],
+) -> ServiceResult[Student] | ServiceResult[School] | ServiceResult[Formation]:
+    try:
+        result = add_student_with_relations(data)
+        if not result.success:
+            db.session.rollback()
+            return result
+        db.session.commit()
+        return result
+    except Exception:
+        logger.exception("Erro ao criar aluno")
+        db.session.rollback()
         return ServiceResult(
             success=False,
-            error_type=ServiceError.NOT_FOUND,
-            message=f"Formação com ID {final_formation_id} não encontrada.",
+            error_type=ServiceError.INTERNAL_ERROR,
+            message="Não foi possível criar o aluno devido a um erro interno.",
         )
 
-    if not formation_service.get_formation_by_id(final_formation_id).success:
+
+BULK_MAX_ROWS = 50000
+BULK_INSERT_BATCH_SIZE = 1000
+# Acima disto, POST /students/bulk sempre importa em segundo plano.
+BULK_SYNC_MAX_ROWS = 1000
+
+
+def _nested_name(value: Any) -> Optional[str]:
+    if isinstance(value, dict) and isinstance(value.get("name"), str):
+        return value["name"].strip() or None
+    return None
+
+
+def _check_bulk_rows(rows: Any) -> Optional[ServiceResult]:
+    if not isinstance(rows, list) or not rows:
         return ServiceResult(
             success=False,
-            error_type=ServiceError.NOT_FOUND,
-            message=f"Formação com ID {final_formation_id} não encontrada.",
+            error_type=ServiceError.INVALID_INPUT,
+            message="Forneça a lista 'students' com ao menos um aluno.",
         )
+    if len(rows) > BULK_MAX_ROWS:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"O lote excede o limite de {BULK_MAX_ROWS} alunos.",
+        )
+    return None
+
+
+def enqueue_bulk_import(rows: List[Dict[str, Any]]) -> ServiceResult[Job]:
+    """Valida o formato do lote e agenda a importação em segundo plano."""
+    invalid = _check_bulk_rows(rows)
+    if invalid:
+        return invalid
+    return job_service.submit_job("students.bulk_import", rows=rows)
+
+
+def bulk_create_students(
+    rows: List[Dict[str, Any]],
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> ServiceResult[Dict[str, Any]]:
+    """Importa alunos em lote, com escolas e formações aninhadas.
+
+    E-mails e ids de escolas e formações são conferidos com uma consulta IN por
+    entidade, e os nomes de escolas e formações aninhadas pelo nome normalizado
+    (índice em memória, como no cadastro individual); as escolas, formações e
+    alunos novos são inseridos em lotes numa única transação. Cada linha recebe o seu próprio status no relatório.
+    `progress`, se informado, é chamado após cada lote de alunos inseridos;
+    uma exceção lançada por ele desfaz toda a importação.
+    """
+    invalid = _check_bulk_rows(rows)
+    if invalid:
+        return invalid
+
+    report: List[Dict[str, Any]] = []
+    pending: List[int] = []
+    first_index_by_email: Dict[str, int] = {}
+
+    for index, row in enumerate(rows):
+        entry: Dict[str, Any] = {
+            "index": index,
+            "email": None,
+            "status": "error",
+            "id": None,
+            "message": None,
+        }
+        report.append(entry)
+        if not isinstance(row, dict):
+            entry["message"] = "Linha inválida: esperado um objeto."
+            continue
+
+        email = row.get("email")
+        full_name = row.get("full_name")
+        if isinstance(email, str):
+            entry["email"] = email
+        if not isinstance(full_name, str) or not full_name.strip():
+            entry["message"] = "O campo 'full_name' é obrigatório."
+            continue
+        if not isinstance(email, str) or not email.strip():
+            entry["message"] = "O campo 'email' é obrigatório."
+            continue
+        if email in first_index_by_email:
+            entry["message"] = (
+                f"E-mail duplicado no lote (linha {first_index_by_email[email]})."
+            )
+            continue
+
+        if any(
+            row.get(key) is not None and not isinstance(row[key], int)
+            for key in ("school_id", "main_formation_id")
+        ):
+            entry["message"] = (
+                "Os campos 'school_id' e 'main_formation_id' devem ser inteiros."
+            )
+            continue
+        if not row.get("school_id") and not _nested_name(row.get("school")):
+            entry["message"] = "Dados da Escola são obrigatórios para o cadastro"
+            continue
+        if not row.get("main_formation_id") and not _nested_name(
+            row.get("main_formation")
+        ):
+            entry["message"] = "Dados da Formação são obrigatórios para o cadastro."
+            continue
+        first_index_by_email[email] = index
+        pending.append(index)
+
     try:
-        new_student = Student()
-        new_student.full_name = data["full_name"]
-        new_student.email = data["email"]
-        new_student.phone_number = data.get("phone_number")
-        new_student.school_id = final_school_id
-        new_student.main_formation_id = final_formation_id
-
-        db.session.add(new_student)
-        db.session.commit()
+        existing_emails = {
+            email
+            for (email,) in fetch_in(
+                select(Student.email),
+                Student.email,
+                [rows[i]["email"] for i in pending],
+            )
+        }
+
+        school_ids = {
+            school_id
+            for (school_id,) in fetch_in(
+                select(School.id),
+                School.id,
+                [rows[i]["school_id"] for i in pending if rows[i].get("school_id")],
+            )
+        }
+        # Escolas e formações aninhadas são resolvidas pelo nome normalizado,
+        # como no cadastro individual (reference_index).
+        school_ids_by_name = school_index.find_ids_by_names(
+            [
+                _nested_name(rows[i].get("school"))
+                for i in pending
+                if not rows[i].get("school_id")
+            ],
+        )
 
-        created_student = get_student_by_id(new_student.id)
+        formation_ids = {
+            formation_id
+            for (formation_id,) in fetch_in(
+                select(Formation.id),
+                Formation.id,
+                [
+                    rows[i]["main_formation_id"]
+                    for i in pending
+                    if rows[i].get("main_formation_id")
+                ],
+            )
+        }
+        formation_ids_by_name = formation_index.find_ids_by_names(
+            [
+                _nested_name(rows[i].get("main_formation"))
+                for i in pending
+                if not rows[i].get("main_formation_id")
+            ],
+        )
 
-        return ServiceResult(success=True, data=created_student.data)
-    except Exception as e:
-        print(e)
+        accepted: List[int] = []
+        new_schools: Dict[str, Dict[str, Any]] = {}
+        new_formations: Dict[str, Dict[str, Any]] = {}
+        now = datetime.utcnow()
+        for index in pending:
+            row, entry = rows[index], report[index]
+            if row["email"] in existing_emails:
+                entry["message"] = f"Aluno com o e-mail '{row['email']}' já existe."
+                continue
+
+            school_id = row.get("school_id")
+            if school_id and school_id not in school_ids:
+                entry["message"] = f"Escola com ID {school_id} não encontrada."
+                continue
+            formation_id = row.get("main_formation_id")
+            if formation_id and formation_id not in formation_ids:
+                entry["message"] = f"Formação com ID {formation_id} não encontrada."
+                continue
+
+            school_name = None if school_id else _nested_name(row.get("school"))
+            if school_name and normalize_name(school_name) not in school_ids_by_name:
+                new_schools.setdefault(
+                    normalize_name(school_name),
+                    {
+                        "name": school_name,
+                        "city": row["school"].get("city"),
+                        "created_at": now,
+                        "updated_at": now,
+                    },
+                )
+            formation_name = (
+                None if formation_id else _nested_name(row.get("main_formation"))
+            )
+            if (
+                formation_name
+                and normalize_name(formation_name) not in formation_ids_by_name
+            ):
+                new_formations.setdefault(
+                    normalize_name(formation_name),
+                    {
+                        "name": formation_name,
+                        "description": row["main_formation"].get("description"),
+                        "degree_level": row["main_formation"].get("degree_level"),
+                        "created_at": now,
+                        "updated_at": now,
+                    },
+                )
+            accepted.append(index)
+
+        for batch in chunked(new_schools.values(), BULK_INSERT_BATCH_SIZE):
+            school_ids_by_name.update(
+                (normalize_name(name), school_id)
+                for school_id, name in db.session.execute(
+                    insert(School).returning(School.id, School.name), batch
+                )
+            )
+        for batch in chunked(new_formations.values(), BULK_INSERT_BATCH_SIZE):
+            formation_ids_by_name.update(
+                (normalize_name(name), formation_id)
+                for formation_id, name in db.session.execute(
+                    insert(Formation).returning(Formation.id, Formation.name), batch
+                )
+            )
+
+        if new_schools:
+            bump_version("school")
+            school_index.invalidate()
+        if new_formations:
+            bump_version("formation")
+            formation_index.invalidate()
+        if accepted:
+            bump_version("student")
+
+        student_ids_by_email: Dict[str, int] = {}
+        for batch in chunked(accepted, BULK_INSERT_BATCH_SIZE):
+            params = []
+            for index in batch:
+                row = rows[index]
+                params.append(
+                    {
+                        "full_name": row["full_name"],
+                        "email": row["email"],
+                        "phone_number": row.get("phone_number"),
+                        "school_id": row.get("school_id")
+                        or school_ids_by_name[
+                            normalize_name(_nested_name(row.get("school")))
+                        ],
+                        "main_formation_id": row.get("main_formation_id")
+                        or formation_ids_by_name[
+                            normalize_name(_nested_name(row.get("main_formation")))
+                        ],
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                )
+            student_ids_by_email.update(
+                (email, student_id)
+                for student_id, email in db.session.execute(
+                    insert(Student).returning(Student.id, Student.email), params
+                )
+            )
+            if progress:
+                progress(len(student_ids_by_email), len(accepted))
+
+        rollup_service.record_new_students(list(student_ids_by_email.values()))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.ALREADY_EXISTS,
+            message="Conflito com registros criados simultaneamente. Reenvie o lote.",
+        )
+    except Exception:
         db.session.rollback()
         return ServiceResult(
             success=False,
             error_type=ServiceError.INTERNAL_ERROR,
-            message="Não foi possível criar o aluno devido a um erro interno.",
+            message="Não foi possível importar os alunos devido a um erro interno.",
         )
 
+    for index in accepted:
+        entry = report[index]
+        entry["status"] = "created"
+        entry["id"] = student_ids_by_email[rows[index]["email"]]
+
+    created = len(accepted)
+    return ServiceResult(
+        success=True,
+        data={"created": created, "failed": len(rows) - created, "rows": report},
+    )
+
 
 def update_student_with_relations(
     student_id: int, data: Dict[str, Any]
@@ -173,66 +722,44 @@ def update_student_with_relations(
                 message=f"O e-mail '{data['email']}' já está registrado por outro aluno.",
             )
 
-    if "school_id" in data or "school" in data:
-        school_id = data.get("school_id")
-        school_input = data.get("school")
-        final_school_id = school_id
-        if school_input and not final_school_id:
-            school_result = create_school(school_input)
+    try:
+        school = student.school
+        if "school_id" in data or "school" in data:
+            school_result = _resolve_school(data.get("school_id"), data.get("school"))
             if not school_result.success:
+                db.session.rollback()
                 return school_result
-            if school_result.data:
-                final_school_id = school_result.data.id
-        student.school_id = final_school_id
-
-        if not final_school_id:
-            return ServiceResult(
-                success=False,
-                error_type=ServiceError.NOT_FOUND,
-                message=f"Escola com ID {final_school_id} não encontrada.",
-            )
+            school = school_result.data
 
-        if not school_service.get_school_by_id(final_school_id).success:
-            return ServiceResult(
-                success=False,
-                error_type=ServiceError.NOT_FOUND,
-                message=f"Escola com ID {final_school_id} não encontrada.",
+        formation = student.main_formation
+        if "main_formation_id" in data or "main_formation" in data:
+            formation_result = _resolve_formation(
+                data.get("main_formation_id"), data.get("main_formation")
             )
-
-    if "main_formation_id" in data or "main_formation" in data:
-        formation_id = data.get("main_formation_id")
-        formation_input = data.get("main_formation")
-        final_formation_id = formation_id
-        if formation_input and not final_formation_id:
-            formation_result = create_formation(formation_input)
             if not formation_result.success:
+                db.session.rollback()
                 return formation_result
-            if formation_result.data:
-                final_formation_id = formation_result.data.id
-
-        if not final_formation_id:
-            return ServiceResult(
-                success=False,
-                error_type=ServiceError.NOT_FOUND,
-                message=f"Formação com ID {final_formation_id} não encontrada.",
-            )
-
-        if not formation_service.get_formation_by_id(final_formation_id).success:
-            return ServiceResult(
-                success=False,
-                error_type=ServiceError.NOT_FOUND,
-                message=f"Formação com ID {final_formation_id} não encontrada.",
-            )
-        student.main_formation_id = final_formation_id
-
-    student.full_name = data.get("full_name", student.full_name)
-    student.email = data.get("email", student.email)
-    student.phone_number = data.get("phone_number", student.phone_number)
-    student.updated_at = datetime.utcnow()
-
-    try:
+            formation = formation_result.data
+
+        # Os agregados só dependem de escola e formação: editar nome, e-mail
+        # ou telefone não precisa das consultas de antes/depois.
+        moved = school is not student.school or formation is not student.main_formation
+        tracking = (
+            rollup_service.tracking(student_ids=[student_id])
+            if moved
+            else nullcontext()
+        )
+        with tracking:
+            student.school = school
+            student.main_formation = formation
+            student.full_name = data.get("full_name", student.full_name)
+            student.email = data.get("email", student.email)
+            student.phone_number = data.get("phone_number", student.phone_number)
+            student.updated_at = datetime.utcnow()
+
+        bump_version("student")
         db.session.commit()
-        return get_student_by_id(student_id)
+        return ServiceResult(success=True, data=student)
     except Exception:
         db.session.rollback()
         return ServiceResult(
@@ -250,7 +777,10 @@ def delete_student(student_id: int) -> ServiceResult[None] | ServiceResult[Stude
     student = student_result.data
 
     try:
-        db.session.delete(student)
+        discount_student_interactions(student_id)
+        with rollup_service.tracking(student_ids=[student_id]):
+            db.session.delete(student)
+        bump_version("student", "interaction")
         db.session.commit()
         return ServiceResult(success=True)
     except Exception:
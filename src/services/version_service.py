@@ -0,0 +1,109 @@
+from .. import db
+from ..models import TableVersion
+from ..utils.db_utils import insert_ignoring_conflicts
+from ..utils.db_routing import read_only
+from datetime import datetime
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional, Tuple
+
+# Tabelas marcadas por bump_version, guardadas em Session.info até o commit.
+_PENDING_KEY = "pending_table_versions"
+# Marca, em Session.info, que a transação atual já enviou escritas ao banco.
+_WROTE_KEY = "wrote_in_transaction"
+
+
+def bump_version(*names: str) -> None:
+    """Marca as tabelas para terem o contador incrementado no commit da sessão.
+
+    O UPDATE só é executado em before_commit: a linha de cada tabela fica
+    travada apenas durante o commit, e não pela transação inteira, e as
+    escritas concorrentes na mesma tabela não se enfileiram atrás dela. A
+    alteração fica visível para os outros workers junto com os dados que a
+    motivaram.
+    """
+    db.session.info.setdefault(_PENDING_KEY, set()).update(names)
+
+
+def _write_versions(session: Session) -> None:
+    names = session.info.pop(_PENDING_KEY, None)
+    if not names:
+        return
+    now = datetime.utcnow()
+    # Ordem fixa entre transações, para não haver deadlock entre as linhas.
+    for name in sorted(names):
+        stmt = (
+            update(TableVersion)
+            .where(TableVersion.name == name)
+            .values(version=TableVersion.version + 1, updated_at=now)
+        )
+        if session.execute(stmt).rowcount:
+            continue
+        session.execute(
+            insert_ignoring_conflicts(
+                TableVersion.__table__, [TableVersion.name]
+            ).values(name=name, version=0, updated_at=now)
+        )
+        session.execute(stmt)
+
+
+def _discard_versions(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_WROTE_KEY, None)
+
+
+def _mark_flushed(session: Session, flush_context) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+def _mark_dml(orm_execute_state) -> None:
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+def _end_transaction(session: Session) -> None:
+    session.info.pop(_WROTE_KEY, None)
+
+
+def session_has_writes() -> bool:
+    """Indica se a transação da sessão atual tem alterações não confirmadas.
+
+    Inclui as entidades ainda não enviadas e as escritas já enviadas por
+    flush ou por INSERT/UPDATE/DELETE executados na sessão.
+    """
+    session = db.session
+    return bool(
+        session.new or session.deleted or session.dirty or session.info.get(_WROTE_KEY)
+    )
+
+
+event.listen(Session, "before_commit", _write_versions)
+event.listen(Session, "after_commit", _end_transaction)
+event.listen(Session, "after_rollback", _discard_versions)
+event.listen(Session, "after_flush", _mark_flushed)
+event.listen(Session, "do_orm_execute", _mark_dml)
+
+
+@read_only
+def get_versions(names: Iterable[str]) -> Dict[str, Tuple[int, Optional[datetime]]]:
+    """Lê as versões das tabelas com uma única consulta, pela sessão atual.
+
+    Como bump_version só grava no commit, a transação atual enxerga as
+    versões já confirmadas mesmo depois de escrever nas tabelas.
+    """
+    names = list(names)
+    stmt = select(
+        TableVersion.name, TableVersion.version, TableVersion.updated_at
+    ).where(TableVersion.name.in_(names))
+    with db.session.no_autoflush:
+        rows = db.session.execute(stmt).all()
+
+    versions: Dict[str, Tuple[int, Optional[datetime]]] = {
+        name: (0, None) for name in names
+    }
+    versions.update((name, (version, updated_at)) for name, version, updated_at in rows)
+    return versions
@@ -0,0 +1,116 @@
+import zlib
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from flask import Flask, Response, request
+
+try:  # zstd é opcional: só é oferecido com o pacote `zstandard` instalado
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/plain",
+}
+
+
+class _Compressor:
+    """Interface comum (compress/flush/finish) para gzip e zstd."""
+
+    def __init__(self, encoding: str, level: int):
+        self.encoding = encoding
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+            self._sync = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._sync = zlib.Z_SYNC_FLUSH
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        """Fecha o bloco atual, para o cliente já poder descomprimir o que chegou."""
+        return self._obj.flush(self._sync)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _negotiate(app: Flask) -> Optional[Callable[[], _Compressor]]:
+    accept = request.accept_encodings
+    options = []
+    if zstandard is not None and accept["zstd"]:
+        level = app.config.get("COMPRESSION_ZSTD_LEVEL", 3)
+        options.append((accept["zstd"], 1, "zstd", level))
+    if accept["gzip"]:
+        level = app.config.get("COMPRESSION_LEVEL", 6)
+        options.append((accept["gzip"], 0, "gzip", level))
+    if not options:
+        return None
+    _, _, encoding, level = max(options)
+    return lambda: _Compressor(encoding, level)
+
+
+def _compress_stream(chunks: Iterable[Any], compressor: _Compressor) -> Iterator[bytes]:
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush()
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def _compress_response(app: Flask, response: Response) -> Response:
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 304)
+        or response.direct_passthrough
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    new_compressor = _negotiate(app)
+    if new_compressor is None:
+        return response
+
+    min_size = app.config.get("COMPRESSION_MIN_SIZE", 1024)
+    if response.is_streamed:
+        # O tamanho de respostas em streaming só é conhecido no fim; elas são
+        # comprimidas a não ser que declarem um Content-Length pequeno.
+        length = response.content_length
+        if length is not None and length < min_size:
+            return response
+        compressor = new_compressor()
+        response.response = _compress_stream(response.response, compressor)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        compressor = new_compressor()
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers["Content-Encoding"] = compressor.encoding
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Comprime as respostas de texto conforme o Accept-Encoding do cliente.
+
+    Respostas menores que COMPRESSION_MIN_SIZE bytes seguem sem compressão,
+    pois o ganho não compensa o custo.
+    """
+    if not app.config.get("COMPRESSION_ENABLED", True):
+        return
+    app.after_request(lambda response: _compress_response(app, response))
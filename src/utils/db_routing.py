@@ -0,0 +1,100 @@
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+from flask import Flask, current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = "replica"
+
+# Cookie que mantém o cliente no banco principal logo depois de uma escrita,
+# enquanto a réplica pode ainda não ter recebido a alteração.
+PRIMARY_COOKIE = "db_primary_until"
+
+READ_METHODS = ("GET", "HEAD")
+
+_read_only: ContextVar[bool] = ContextVar("read_only", default=False)
+
+
+def read_only(fn):
+    """Marca uma função de serviço como somente leitura.
+
+    Em requisições GET/HEAD, as consultas feitas dentro dela vão para a réplica
+    (se configurada), exceto quando o mesmo request ou o mesmo cliente acabou
+    de escrever. Chamadas a partir de operações de escrita, tarefas e comandos
+    continuam no banco principal.
+    """
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+
+    return wrapper
+
+
+def _recent_write_cookie() -> bool:
+    try:
+        return time.time() < float(request.cookies.get(PRIMARY_COOKIE, 0))
+    except ValueError:
+        return False
+
+
+def _use_replica(engines) -> bool:
+    return (
+        _read_only.get()
+        and REPLICA_BIND in engines
+        and has_request_context()
+        and request.method in READ_METHODS
+        and not g.get("_db_wrote")
+        and not _recent_write_cookie()
+    )
+
+
+class RoutingSession(Session):
+    """Sessão que envia as leituras marcadas com @read_only para a réplica."""
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any):
+        if self._flushing or isinstance(clause, UpdateBase):
+            if has_request_context():
+                g._db_wrote = True
+        elif kwargs.get("bind") is None:
+            engines = self._db.engines
+            if _use_replica(engines):
+                return engines[REPLICA_BIND]
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def _remember_write(response):
+    if g.get("_db_wrote") and response.status_code < 400:
+        seconds = current_app.config.get("READ_YOUR_WRITES_SECONDS", 5)
+        response.set_cookie(
+            PRIMARY_COOKIE,
+            f"{time.time() + seconds:.3f}",
+            max_age=int(seconds) + 1,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Registra a réplica de leitura (DATABASE_REPLICA_URL), se houver.
+
+    A réplica usa as mesmas opções de engine (pool) do banco principal.
+    """
+    replica_url = app.config.get("DATABASE_REPLICA_URL")
+    if not replica_url:
+        return
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    binds[REPLICA_BIND] = {
+        **(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}),
+        "url": replica_url,
+    }
+    app.config["SQLALCHEMY_BINDS"] = binds
+    app.after_request(_remember_write)
@@ -0,0 +1,103 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TypeVar
+
+from flask import Flask
+from sqlalchemy import Select, Table
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .. import db
+
+T = TypeVar("T")
+
+# Quantidade máxima de parâmetros por cláusula IN. Mantém as consultas abaixo
+# do limite de variáveis do SQLite e com planos estáveis no PostgreSQL.
+IN_QUERY_CHUNK_SIZE = 5000
+
+# Bancos com INSERT ... ON CONFLICT, usado pelas inserções abaixo.
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+
+class UnsupportedDatabaseError(RuntimeError):
+    pass
+
+
+def chunked(values: Iterable[T], size: int) -> Iterator[List[T]]:
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def fetch_in(stmt: Select, column: Any, values: Sequence[Any]) -> List[Any]:
+    """Executa `stmt` filtrando `column IN values`, em blocos se necessário."""
+    rows: List[Any] = []
+    for chunk in chunked(dict.fromkeys(values), IN_QUERY_CHUNK_SIZE):
+        rows.extend(db.session.execute(stmt.where(column.in_(chunk))).all())
+    return rows
+
+
+def _dialect_insert(table: Table):
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise UnsupportedDatabaseError(f"Dialeto sem suporte a ON CONFLICT: {dialect}")
+
+
+def insert_ignoring_conflicts(table: Table, index_elements: Sequence[Any]):
+    """INSERT que descarta as linhas que violariam a restrição única informada.
+
+    As linhas descartadas não aparecem no RETURNING, o que permite saber
+    exatamente o que foi inserido mesmo com gravações concorrentes.
+    """
+    return _dialect_insert(table).on_conflict_do_nothing(index_elements=index_elements)
+
+
+def insert_accumulating(
+    table: Table, index_elements: Sequence[Any], columns: Sequence[str]
+):
+    """INSERT que, em caso de conflito, soma os valores de `columns` aos atuais.
+
+    A soma é feita pelo próprio banco, então incrementos concorrentes da mesma
+    linha não se perdem.
+    """
+    stmt = _dialect_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={name: table.c[name] + stmt.excluded[name] for name in columns},
+    )
+
+
+def select_row_columns(
+    row_columns: Dict[str, Any],
+    keys: Optional[Sequence[str]],
+    required: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Subconjunto de um dicionário *_ROW_COLUMNS para os campos `keys`.
+
+    Um campo aninhado leva todas as suas colunas "<campo>__*"; `required` são
+    colunas sempre lidas (p.ex. as da chave de paginação). Sem `keys`, todas.
+    """
+    if keys is None:
+        return dict(row_columns)
+    wanted = set(keys).union(required)
+    return {
+        key: column
+        for key, column in row_columns.items()
+        if key.split("__", 1)[0] in wanted
+    }
+
+
+def init_app(app: Flask) -> None:
+    """Recusa na inicialização bancos sem INSERT ... ON CONFLICT.
+
+    Sem isso, o erro só apareceria como 500 no primeiro check-in ou upsert.
+    """
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            dialect = engine.dialect.name
+            if dialect not in SUPPORTED_DIALECTS:
+                raise UnsupportedDatabaseError(
+                    f"Banco '{dialect}' ({bind or 'principal'}) não suportado; "
+                    f"use um destes: {', '.join(SUPPORTED_DIALECTS)}."
+                )
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from flask import Response, stream_with_context
+from sqlalchemy import Select, func, select
+
+from .. import db
+from .service_utils import ServiceResult
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_BATCH_SIZE = 1000
+
+_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+class ExportRows:
+    """Linhas de uma exportação, lidas com cursor no servidor ao iterar.
+
+    `count()` conta as mesmas linhas (mesmos filtros e junções) numa consulta
+    à parte, para o progresso das exportações em segundo plano.
+    """
+
+    def __init__(self, stmt: Select):
+        self._stmt = stmt
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        yield from db.session.execute(self._stmt).mappings()
+
+    def count(self) -> int:
+        subquery = self._stmt.order_by(None).subquery()
+        return db.session.execute(select(func.count()).select_from(subquery)).scalar()
+
+
+def _to_primitive(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def iter_ndjson(
+    rows: Iterable[Mapping[str, Any]], fieldnames: Sequence[str]
+) -> Iterator[str]:
+    buffer = []
+    for row in rows:
+        buffer.append(
+            json.dumps(
+                {name: _to_primitive(row[name]) for name in fieldnames},
+                ensure_ascii=False,
+            )
+        )
+        if len(buffer) >= EXPORT_BATCH_SIZE:
+            yield "\n".join(buffer) + "\n"
+            buffer.clear()
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+def iter_csv(
+    rows: Iterable[Mapping[str, Any]], fieldnames: Sequence[str]
+) -> Iterator[str]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(fieldnames)
+    pending = 0
+    for row in rows:
+        writer.writerow([_to_primitive(row[name]) for name in fieldnames])
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    yield output.getvalue()
+
+
+def to_export_response(
+    result: ServiceResult, fieldnames: Sequence[str], fmt: str, filename: str
+) -> ServiceResult:
+    """Converte o iterador de linhas do serviço numa resposta em streaming.
+
+    As linhas são escritas à medida que o cursor do banco as entrega, então o
+    consumo de memória não depende da quantidade de registros exportados.
+    """
+    if not result.success:
+        return result
+
+    encoder = iter_csv if fmt == "csv" else iter_ndjson
+    response = Response(
+        stream_with_context(encoder(result.data, fieldnames)),
+        mimetype=_MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+    return ServiceResult(success=True, data=response)
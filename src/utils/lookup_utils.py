@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, List, Sequence
+
+from sqlalchemy import Select
+
+from .. import db
+from .service_utils import ServiceError, ServiceResult
+
+# Quantidade máxima de ids por consulta em lote; cabe numa única cláusula IN.
+LOOKUP_MAX_IDS = 500
+
+
+def check_lookup_ids(ids: Any) -> ServiceResult[List[int]]:
+    """Valida a lista de ids e remove repetições, mantendo a ordem pedida."""
+    if (
+        not isinstance(ids, list)
+        or not ids
+        or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)
+    ):
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message="Envie 'ids' como uma lista não vazia de números inteiros.",
+        )
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > LOOKUP_MAX_IDS:
+        return ServiceResult(
+            success=False,
+            error_type=ServiceError.INVALID_INPUT,
+            message=f"No máximo {LOOKUP_MAX_IDS} ids por consulta.",
+        )
+    return ServiceResult(success=True, data=unique)
+
+
+def fetch_by_ids(
+    stmt: Select,
+    column: Any,
+    ids: Sequence[int],
+    id_of: Callable[[Any], int] = lambda row: row["id"],
+    scalars: bool = False,
+) -> Dict[str, List[Any]]:
+    """Busca os registros com uma única consulta IN, na ordem de `ids`.
+
+    Devolve {"items": [...], "missing": [...]}, com os ids não encontrados.
+    Com `scalars`, os itens são entidades do ORM em vez de linhas.
+    """
+    result = db.session.execute(stmt.where(column.in_(ids)))
+    found = {
+        id_of(item): item
+        for item in (result.scalars() if scalars else result.mappings())
+    }
+    return {
+        "items": [found[i] for i in ids if i in found],
+        "missing": [i for i in ids if i not in found],
+    }
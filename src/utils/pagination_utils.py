@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Gera um cursor opaco a partir dos valores da chave de ordenação."""
+    payload = json.dumps(
+        [_encode_value(v) for v in values], separators=(",", ":")
+    ).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Decodifica um cursor gerado por encode_cursor com `size` valores."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursorError(cursor)
+        return [_decode_value(v) for v in values]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise InvalidCursorError(cursor)
+
+
+def clamp_limit(
+    limit: Optional[int],
+    default: int = DEFAULT_PAGE_LIMIT,
+    maximum: int = MAX_PAGE_LIMIT,
+) -> int:
+    """Limite ausente ou menor que 1 vira `default`; acima de `maximum`, `maximum`."""
+    if not limit or limit < 1:
+        return default
+    return min(limit, maximum)
+
+
+def build_page(
+    rows: Sequence[Any], limit: int, key: Callable[[Any], Sequence[Any]]
+) -> Dict[str, Any]:
+    """Monta a página a partir de `limit + 1` linhas buscadas.
+
+    A linha excedente indica que existe uma próxima página; o cursor é
+    gerado a partir da chave da última linha retornada.
+    """
+    items = list(rows[:limit])
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(*key(items[-1]))
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,137 @@
+import hashlib
+import hmac
+import math
+import threading
+import time
+from typing import List, Optional
+
+from flask import Flask
+
+
+class TokenBucket:
+    """Balde de fichas: `rate` requisições por segundo, com rajadas de até `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> float:
+        """Consome uma ficha; devolve 0 ou os segundos até haver uma disponível."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class ApiKey:
+    """Chave de API com seu limite de taxa e de requisições simultâneas.
+
+    Sem `rate` a chave não tem limite algum (ver init_app).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        rate: Optional[float] = None,
+        burst: int = 0,
+        concurrency: int = 0,
+    ):
+        self.name = name
+        self.digest = hashlib.sha256(key.encode()).digest()
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.concurrency = concurrency
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return self.bucket is not None
+
+    def take(self) -> float:
+        return self.bucket.take() if self.bucket is not None else 0.0
+
+    def acquire(self) -> bool:
+        if not self.limited:
+            return True
+        with self._lock:
+            if self._in_flight >= self.concurrency:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self) -> None:
+        if not self.limited:
+            return
+        with self._lock:
+            self._in_flight -= 1
+
+
+class ApiKeyRegistry:
+    def __init__(self, keys: List[ApiKey]):
+        self.keys = keys
+
+    def find(self, provided: str) -> Optional[ApiKey]:
+        """Procura a chave comparando em tempo constante com todas as cadastradas."""
+        digest = hashlib.sha256(provided.encode()).digest()
+        found = None
+        for api_key in self.keys:
+            if hmac.compare_digest(digest, api_key.digest):
+                found = api_key
+        return found
+
+
+def retry_after(seconds: float) -> str:
+    """Valor do cabeçalho Retry-After (segundos inteiros, no mínimo 1)."""
+    return str(max(1, math.ceil(seconds)))
+
+
+def parse_api_keys(
+    value: str, rate: float, burst: int, concurrency: int
+) -> List[ApiKey]:
+    """Lê API_KEYS: entradas `nome:chave[:taxa:rajada:simultâneas]` separadas por vírgula.
+
+    Os limites omitidos usam os valores padrão passados.
+    """
+    keys = []
+    for entry in filter(None, (item.strip() for item in value.split(","))):
+        parts = entry.split(":")
+        if len(parts) not in (2, 5) or not all(parts[:2]):
+            raise ValueError(
+                f"Entrada inválida em API_KEYS: '{parts[0]}'. "
+                "Use nome:chave ou nome:chave:taxa:rajada:simultâneas."
+            )
+        name, key = parts[:2]
+        if len(parts) == 5:
+            limits = float(parts[2]), int(parts[3]), int(parts[4])
+        else:
+            limits = rate, burst, concurrency
+        keys.append(ApiKey(name, key, *limits))
+    return keys
+
+
+def init_app(app: Flask) -> None:
+    """Carrega as chaves de API uma única vez, na inicialização.
+
+    Sem API_KEYS, a SECRET_KEY continua valendo como chave única ("default"),
+    sem limites, como antes: ela costuma ser compartilhada por todos os
+    clientes. Os limites valem só para as chaves cadastradas em API_KEYS.
+    """
+    rate = app.config.get("RATE_LIMIT_PER_SECOND", 10)
+    burst = app.config.get("RATE_LIMIT_BURST", 20)
+    concurrency = app.config.get("RATE_LIMIT_CONCURRENCY", 4)
+
+    keys = parse_api_keys(app.config.get("API_KEYS") or "", rate, burst, concurrency)
+    secret_key = app.config.get("SECRET_KEY")
+    if not keys and secret_key:
+        keys = [ApiKey("default", secret_key)]
+    app.extensions["api_keys"] = ApiKeyRegistry(keys)
@@ -10,6 +10,7 @@ class ServiceError(Enum):
     INVALID_INPUT = auto()
     DEPENDENCY_ERROR = auto()
     INTERNAL_ERROR = auto()
+    UNAVAILABLE = auto()
 
 
 class ServiceResult(Generic[T]):
@@ -0,0 +1,27 @@
+import os
+
+# Precisa vir antes da importação de `src`: a Config lê o ambiente ao ser
+# importada.
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ["SLOW_QUERY_THRESHOLD_MS"] = "0"
+
+import pytest
+
+from src import create_app, db
+from src.services.reference_index import formation_index, school_index
+
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        # Os índices são globais ao processo: não podem guardar o banco do
+        # teste anterior.
+        school_index.invalidate()
+        formation_index.invalidate()
+        yield app
+        db.session.remove()
+        db.drop_all()
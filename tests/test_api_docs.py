@@ -0,0 +1,20 @@
+from src import create_app
+from src.config import Config
+
+
+def test_serves_the_spec_and_the_ui(app):
+    client = app.test_client()
+
+    spec = client.get("/api/v1/swagger.json")
+    assert spec.status_code == 200
+    assert "/students/" in spec.get_json()["paths"]
+    assert client.get("/api/v1/doc/").status_code == 200
+
+
+def test_hides_the_docs_when_disabled(monkeypatch):
+    monkeypatch.setattr(Config, "API_DOCS_ENABLED", False)
+    client = create_app().test_client()
+
+    assert client.get("/api/v1/swagger.json").status_code == 404
+    assert client.get("/api/v1/doc/").status_code == 404
+    assert client.get("/swaggerui/swagger-ui.css").status_code == 404
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+
+from src import db
+from src.models import TableVersion
+
+HEADERS = {"Authorization": "ApiKey test"}
+
+
+def backdate_versions(seconds=5):
+    for version in db.session.query(TableVersion):
+        version.updated_at -= timedelta(seconds=seconds)
+    db.session.commit()
+
+
+def test_write_changes_the_etag_and_the_version(app):
+    client = app.test_client()
+    first = client.get("/api/v1/schools/", headers=HEADERS)
+    etag = first.headers["ETag"]
+
+    created = client.post(
+        "/api/v1/schools/", headers=HEADERS, json={"name": "Escola A", "city": "Ijuí"}
+    )
+    assert created.status_code == 200
+    assert db.session.get(TableVersion, "school").version == 1
+
+    again = client.get("/api/v1/schools/", headers={**HEADERS, "If-None-Match": etag})
+    assert again.status_code == 200
+    assert again.headers["ETag"] != etag
+
+
+def test_failed_write_does_not_change_the_version(app):
+    client = app.test_client()
+    payload = {"name": "Escola A", "city": "Ijuí"}
+    client.post("/api/v1/schools/", headers=HEADERS, json=payload)
+
+    duplicate = client.post("/api/v1/schools/", headers=HEADERS, json=payload)
+    assert duplicate.status_code == 409
+    assert db.session.get(TableVersion, "school").version == 1
+
+
+def test_last_modified_waits_for_the_second_to_end(app):
+    client = app.test_client()
+    client.post(
+        "/api/v1/schools/", headers=HEADERS, json={"name": "Escola A", "city": "Ijuí"}
+    )
+
+    # Enquanto o segundo da alteração não termina, outra escrita ainda pode
+    # cair nele. A data vai 1 s à frente para o teste não depender do relógio.
+    backdate_versions(-1)
+    assert (
+        "Last-Modified" not in client.get("/api/v1/schools/", headers=HEADERS).headers
+    )
+
+    backdate_versions()
+    updated_at = db.session.get(TableVersion, "school").updated_at
+    response = client.get("/api/v1/schools/", headers=HEADERS)
+    last_modified = response.last_modified.replace(tzinfo=None)
+    assert updated_at < last_modified <= updated_at + timedelta(seconds=1)
+    assert last_modified <= datetime.utcnow()
+
+    cached = client.get(
+        "/api/v1/schools/",
+        headers={**HEADERS, "If-Modified-Since": response.headers["Last-Modified"]},
+    )
+    assert cached.status_code == 304
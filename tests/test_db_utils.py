@@ -0,0 +1,11 @@
+import pytest
+
+from src import create_app
+from src.utils import db_utils
+
+
+def test_rejects_databases_without_on_conflict_at_startup(monkeypatch):
+    monkeypatch.setattr(db_utils, "SUPPORTED_DIALECTS", ("postgresql",))
+
+    with pytest.raises(db_utils.UnsupportedDatabaseError, match="sqlite"):
+        create_app()
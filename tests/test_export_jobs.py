@@ -0,0 +1,40 @@
+from src import db
+from src.models import Formation, School, Student
+from src.services.job_handlers import run_export
+
+
+class RecordingContext:
+    job_id = "export-test"
+
+    def __init__(self):
+        self.calls = []
+
+    def progress(self, processed, total):
+        self.calls.append((processed, total))
+
+
+def test_export_progress_counts_only_the_filtered_rows(app, tmp_path):
+    app.config["JOB_EXPORT_DIR"] = str(tmp_path)
+    first, second = School(name="Escola A"), School(name="Escola B")
+    formation = Formation(name="Direito")
+    db.session.add_all([first, second, formation])
+    db.session.flush()
+    for index in range(5):
+        db.session.add(
+            Student(
+                full_name=f"Aluno {index}",
+                email=f"aluno{index}@exemplo.com",
+                school_id=first.id if index < 2 else second.id,
+                main_formation_id=formation.id,
+            )
+        )
+    db.session.commit()
+
+    context = RecordingContext()
+    result = run_export(context, "students", "ndjson", {"school_id": first.id})
+
+    assert result.success, result.message
+    assert context.calls[0] == (0, 2)
+    assert context.calls[-1] == (2, 2)
+    with open(tmp_path / "export-test.ndjson", encoding="utf-8") as exported:
+        assert len(exported.read().splitlines()) == 2
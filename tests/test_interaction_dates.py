@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta, timezone
+
+from src import db
+from src.models import Event, Formation, Interaction, School, Student
+from src.services.interaction_service import (
+    get_interactions_page,
+    iter_interactions_for_export,
+)
+from src.utils.service_utils import ServiceError
+
+BRT = timezone(timedelta(hours=-3))
+
+
+def add_interactions(*dates):
+    school = School(name="Escola A", city="Ijuí")
+    formation = Formation(name="Direito")
+    db.session.add_all([school, formation])
+    db.session.flush()
+    event = Event(event_name="Feira", event_date=date(2025, 5, 1))
+    db.session.add(event)
+    for index, interaction_date in enumerate(dates):
+        student = Student(
+            full_name=f"Aluno {index}",
+            email=f"aluno{index}@exemplo.com",
+            school_id=school.id,
+            main_formation_id=formation.id,
+        )
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(
+            Interaction(
+                student_id=student.id,
+                event_id=event.id,
+                interaction_date=interaction_date,
+            )
+        )
+    db.session.commit()
+
+
+def page_dates(**filters):
+    result = get_interactions_page(**filters)
+    assert result.success, result.message
+    return sorted(row["interaction_date"] for row in result.data["items"])
+
+
+def test_mixes_aware_and_naive_bounds(app):
+    add_interactions(datetime(2025, 5, 1, 11), datetime(2025, 5, 1, 13))
+
+    # 09:00 em Brasília são 12:00 UTC.
+    since = datetime(2025, 5, 1, 9, tzinfo=BRT)
+    until = datetime(2025, 5, 2)
+
+    assert page_dates(since=since, until=until) == [datetime(2025, 5, 1, 13)]
+    result = iter_interactions_for_export(since=since, until=until)
+    assert result.success, result.message
+    assert [row["interaction_date"] for row in result.data] == [
+        datetime(2025, 5, 1, 13)
+    ]
+
+
+def test_compares_bounds_in_utc(app):
+    # 23:00 em Brasília já é o dia seguinte em UTC.
+    since = datetime(2025, 5, 1, 23, tzinfo=BRT)
+    until = datetime(2025, 5, 2, 1)
+
+    result = get_interactions_page(since=since, until=until)
+    assert not result.success
+    assert result.error_type == ServiceError.INVALID_INPUT
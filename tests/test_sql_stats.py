@@ -0,0 +1,16 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src import db
+
+
+def test_failed_statements_do_not_leak_timing_entries(app):
+    with db.engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM tabela_inexistente"))
+        conn.execute(text("SELECT 1"))
+
+        assert not conn.info.get("_query_started_at")
+        assert not conn.info.get("_slow_query_started_at")
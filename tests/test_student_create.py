@@ -0,0 +1,69 @@
+from sqlalchemy import event
+
+from src import db
+from src.services.student_service import bulk_create_students
+
+HEADERS = {"Authorization": "ApiKey test"}
+
+
+def test_nested_school_and_formation_are_committed(app):
+    client = app.test_client()
+    # Índices já carregados, como num worker em uso.
+    assert client.get("/api/v1/schools/", headers=HEADERS).get_json() == []
+
+    created = client.post(
+        "/api/v1/students/",
+        headers=HEADERS,
+        json={
+            "full_name": "Ana Lima",
+            "email": "ana@exemplo.com",
+            "school": {"name": "Escola Nova", "city": "Ijuí"},
+            "main_formation": {"name": "Direito"},
+        },
+    )
+    assert created.status_code == 200, created.get_json()
+
+    schools = client.get("/api/v1/schools/", headers=HEADERS).get_json()
+    formations = client.get("/api/v1/formations/", headers=HEADERS).get_json()
+    assert [school["name"] for school in schools] == ["Escola Nova"]
+    assert [formation["name"] for formation in formations] == ["Direito"]
+
+    again = client.post(
+        "/api/v1/students/",
+        headers=HEADERS,
+        json={
+            "full_name": "Bruno Costa",
+            "email": "bruno@exemplo.com",
+            "school": {"name": "  escola  NOVA "},
+            "main_formation": {"name": "direito"},
+        },
+    )
+    assert again.get_json()["school"]["id"] == schools[0]["id"]
+    assert len(client.get("/api/v1/schools/", headers=HEADERS).get_json()) == 1
+
+
+def test_bulk_import_checks_the_index_version_once_per_batch(app):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    rows = [
+        {
+            "full_name": f"Aluno {i}",
+            "email": f"aluno{i}@exemplo.com",
+            "school": {"name": f"Escola {i % 25}"},
+            "main_formation": {"name": f"Formação {i % 25}"},
+        }
+        for i in range(100)
+    ]
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = bulk_create_students(rows)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert result.success, result.message
+    assert result.data["created"] == 100
+    version_reads = [s for s in statements if "FROM table_version" in s]
+    assert len(version_reads) <= 4
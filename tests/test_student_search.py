@@ -0,0 +1,98 @@
+import pytest
+
+from src import db
+from src.models import Formation, School, Student
+from src.services.student_service import (
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    search_students,
+)
+from src.utils.service_utils import ServiceError
+
+
+def add_students(*students):
+    school = School(name="Escola A", city="Ijuí")
+    formation = Formation(name="Direito")
+    db.session.add_all([school, formation])
+    db.session.flush()
+    for full_name, email, phone in students:
+        db.session.add(
+            Student(
+                full_name=full_name,
+                email=email,
+                phone_number=phone,
+                school_id=school.id,
+                main_formation_id=formation.id,
+            )
+        )
+    db.session.commit()
+
+
+def names(result):
+    assert result.success, result.message
+    return [row["full_name"] for row in result.data["items"]]
+
+
+def test_ranks_exact_email_then_name_prefix_then_word_then_substring(app):
+    add_students(
+        ("Carla Mariana", "carla@exemplo.com", None),
+        ("Zé Marianópolis", "ze@exemplo.com", None),
+        ("Mariana Souza", "souza@exemplo.com", None),
+        ("Ana Lima", "mariana@exemplo.com", None),
+        ("Pedro Amariano", "pedro@exemplo.com", None),
+    )
+
+    result = search_students("mariana@exemplo.com")
+    assert names(result) == ["Ana Lima"]
+
+    result = search_students("maria")
+    assert names(result) == [
+        "Mariana Souza",
+        "Carla Mariana",
+        "Zé Marianópolis",
+        "Ana Lima",
+        "Pedro Amariano",
+    ]
+
+
+def test_matches_phone_digits_ignoring_formatting(app):
+    add_students(
+        ("Ana Lima", "ana@exemplo.com", "(55) 99123-4567"),
+        ("Bruno Costa", "bruno@exemplo.com", "+55 55 98888.7777"),
+    )
+
+    assert names(search_students("991234567")) == ["Ana Lima"]
+    assert names(search_students("(55) 99123")) == ["Ana Lima"]
+    assert names(search_students("8888-7777")) == ["Bruno Costa"]
+
+
+def test_rejects_queries_shorter_than_the_minimum(app):
+    add_students(("Ana Lima", "ana@exemplo.com", None))
+
+    for q in ("", "an", "  an  "):
+        result = search_students(q)
+        assert not result.success
+        assert result.error_type == ServiceError.INVALID_INPUT
+
+    assert names(search_students("Ana")) == ["Ana Lima"]
+
+
+@pytest.mark.parametrize(
+    "limit, expected",
+    [
+        (None, SEARCH_DEFAULT_LIMIT),
+        (0, SEARCH_DEFAULT_LIMIT),
+        (-5, SEARCH_DEFAULT_LIMIT),
+        (3, 3),
+        (SEARCH_MAX_LIMIT + 50, SEARCH_MAX_LIMIT),
+    ],
+)
+def test_clamps_the_limit(app, limit, expected):
+    add_students(
+        *(
+            (f"Aluno {i:03d}", f"aluno{i}@exemplo.com", None)
+            for i in range(SEARCH_MAX_LIMIT + 10)
+        )
+    )
+
+    assert len(names(search_students("aluno", limit=limit))) == expected
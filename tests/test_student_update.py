@@ -0,0 +1,72 @@
+from sqlalchemy import event
+
+from src import db
+from src.models import Formation, ProspectRollup, School
+from src.services.student_service import (
+    create_student_with_relations,
+    update_student_with_relations,
+)
+
+
+def recorded_statements(fn):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert result.success, result.message
+    return statements
+
+
+def school_rollup(school_id):
+    return {
+        row.dimension_key: row.students
+        for row in ProspectRollup.query.filter_by(dimension="school")
+        if row.students
+    }.get(str(school_id), 0)
+
+
+def create_student():
+    first, second = School(name="Escola A"), School(name="Escola B")
+    formation = Formation(name="Direito")
+    db.session.add_all([first, second, formation])
+    db.session.commit()
+    result = create_student_with_relations(
+        {
+            "full_name": "Ana Lima",
+            "email": "ana@exemplo.com",
+            "school_id": first.id,
+            "main_formation_id": formation.id,
+        }
+    )
+    assert result.success, result.message
+    return result.data.id, first.id, second.id
+
+
+def test_contact_edit_skips_the_rollup_snapshots(app):
+    student_id, _, _ = create_student()
+
+    statements = recorded_statements(
+        lambda: update_student_with_relations(
+            student_id, {"phone_number": "55 99999-0000"}
+        )
+    )
+
+    assert not any("GROUP BY" in statement for statement in statements)
+
+
+def test_school_change_moves_the_student_in_the_rollups(app):
+    student_id, first_id, second_id = create_student()
+    assert (school_rollup(first_id), school_rollup(second_id)) == (1, 0)
+
+    statements = recorded_statements(
+        lambda: update_student_with_relations(student_id, {"school_id": second_id})
+    )
+
+    assert any("GROUP BY" in statement for statement in statements)
+    assert (school_rollup(first_id), school_rollup(second_id)) == (0, 1)